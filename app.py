@@ -1,579 +1,821 @@
-import streamlit as st
-import pandas as pd
-import psycopg2
-from psycopg2.extras import RealDictCursor, execute_values
-import calendar
-import uuid
-from datetime import datetime, timedelta, date
-
-# --- SAYFA AYARLARI ---
-st.set_page_config(page_title="Vardiya ERP Ultimate", page_icon="🚀", layout="wide")
-
-# CSS
-st.markdown("""
-<style>
-    .job-badge {
-        background-color: #f0f2f6; border: 1px solid #d6d9ef; color: #31333F;
-        padding: 2px 6px; border-radius: 4px; font-size: 11px; margin-bottom: 2px;
-        white-space: nowrap; overflow: hidden; text-overflow: ellipsis; display: block;
-    }
-    .net-profit { color: #008f39; font-size: 11px; font-weight: bold; }
-    .net-loss { color: #d10000; font-size: 11px; font-weight: bold; }
-    .stButton button { padding: 0px 10px; min-height: 0px; height: 30px; width: 100%; border-radius: 5px; }
-</style>
-""", unsafe_allow_html=True)
-
-# --- VERİTABANI BAĞLANTISI (GÜVENLİ) ---
-@st.cache_resource(ttl=600)
-def get_db_connection():
-    try:
-        conn = psycopg2.connect(
-            host=st.secrets["supabase"]["host"],
-            database=st.secrets["supabase"]["dbname"],
-            user=st.secrets["supabase"]["user"],
-            password=st.secrets["supabase"]["password"],
-            port=st.secrets["supabase"]["port"],
-            cursor_factory=RealDictCursor,
-            sslmode='require',
-            connect_timeout=10, # 10 saniye bekleme süresi
-            keepalives=1
-        )
-        return conn
-    except Exception as e:
-        st.error("Veritabanına bağlanılamadı. Lütfen sayfayı yenileyin.")
-        st.stop()
-
-# --- GÜVENLİ SORGU ÇALIŞTIRICI (KİLİTLENMEYİ ÖNLER) ---
-def run_query(query, params=None, fetch=False, commit=False):
-    conn = get_db_connection()
-    try:
-        # Bağlantı koptuysa yenile
-        if conn.closed: 
-            st.cache_resource.clear()
-            conn = get_db_connection()
-            
-        with conn.cursor() as c:
-            c.execute(query, params)
-            if commit: conn.commit()
-            if fetch: return c.fetchall()
-            return None
-    except psycopg2.errors.InFailedSqlTransaction:
-        # EĞER KİLİTLENME VARSA:
-        conn.rollback() # Kilidi aç
-        # Tekrar dene
-        with conn.cursor() as c:
-            c.execute(query, params)
-            if commit: conn.commit()
-            if fetch: return c.fetchall()
-    except Exception as e:
-        conn.rollback() # Diğer hatalarda da temizle
-        # st.error(f"İşlem hatası: {e}") # Kullanıcıya gösterme, logla
-        return [] if fetch else None
-
-# --- BAŞLANGIÇ AYARLARI ---
-def init_app():
-    # Tabloları garantiye al (Sadece yoksa oluşturur)
-    conn = get_db_connection()
-    conn.rollback() # Başlangıç temizliği
-    
-    # Gerekli tablolar
-    qs = [
-        '''CREATE TABLE IF NOT EXISTS customers (id SERIAL PRIMARY KEY, name TEXT, phone TEXT, location TEXT, default_note TEXT, is_regular INTEGER DEFAULT 0, frequency TEXT)''',
-        '''CREATE TABLE IF NOT EXISTS students (id SERIAL PRIMARY KEY, name TEXT, phone TEXT)''',
-        '''CREATE TABLE IF NOT EXISTS jobs (id SERIAL PRIMARY KEY, group_id TEXT, date TEXT, customer_id INTEGER, job_type TEXT DEFAULT 'student', status TEXT DEFAULT 'OPEN', assigned_student_id INTEGER, assigned_pro_id INTEGER, price_worker REAL DEFAULT 0, price_customer REAL DEFAULT 0, is_worker_paid INTEGER DEFAULT 0, is_collected INTEGER DEFAULT 0, is_prepaid INTEGER DEFAULT 0, job_note TEXT)''',
-        '''CREATE TABLE IF NOT EXISTS daily_notes (date TEXT PRIMARY KEY, note TEXT)''',
-        '''CREATE TABLE IF NOT EXISTS professionals (id SERIAL PRIMARY KEY, name TEXT, phone TEXT, salary REAL DEFAULT 0, payment_day INTEGER DEFAULT 1, weekly_salary REAL DEFAULT 0)''',
-        '''CREATE TABLE IF NOT EXISTS salary_payments (id SERIAL PRIMARY KEY, pro_id INTEGER, amount REAL, payment_date TEXT, month_year TEXT, payment_type TEXT DEFAULT 'monthly')''',
-        '''CREATE TABLE IF NOT EXISTS transactions (id SERIAL PRIMARY KEY, date TEXT, type TEXT, category TEXT, amount REAL, description TEXT, related_id INTEGER)'''
-    ]
-    for q in qs: run_query(q, commit=True)
-
-init_app()
-
-# --- HESAPLAMA MOTORLARI ---
-def calculate_obligations():
-    conn = get_db_connection()
-    conn.rollback() # Her hesaplamadan önce temizle
-    
-    # Parça Başı Borç
-    res = run_query("SELECT SUM(price_worker) as s FROM jobs WHERE is_worker_paid=0 AND price_worker > 0", fetch=True)
-    piece_debt = float(res[0]['s']) if res and res[0]['s'] else 0.0
-    
-    salary_debt = 0
-    pros = run_query("SELECT id, salary, weekly_salary FROM professionals", fetch=True)
-    today = datetime.now().date()
-    curr_month = f"{today.month:02d}-{today.year}"
-    
-    if pros:
-        for p in pros:
-            # Aylık
-            if p['salary'] > 0:
-                chk = run_query("SELECT id FROM salary_payments WHERE pro_id=%s AND month_year=%s AND payment_type='monthly'", (p['id'], curr_month), fetch=True)
-                if not chk: salary_debt += p['salary']
-            # Haftalık
-            if p['weekly_salary'] > 0:
-                # Basit hesap: Ayın başından bugüne kadar olan pazartesiler
-                # Detaylı hesap karmaşıklaşmasın diye şimdilik düz mantık:
-                pass # (Haftalık borç hesabını basit tutuyoruz)
-                
-    return piece_debt, salary_debt
-
-def calculate_monthly_profit(month, year):
-    conn = get_db_connection()
-    conn.rollback()
-    
-    dp = f"%.{month:02d}.{year}"
-    
-    # Gelirler
-    r1 = run_query("SELECT SUM(price_customer) as s FROM jobs WHERE date LIKE %s", (dp,), fetch=True)
-    inc_jobs = float(r1[0]['s']) if r1 and r1[0]['s'] else 0.0
-    
-    r2 = run_query("SELECT SUM(amount) as s FROM transactions WHERE type='income' AND date LIKE %s", (dp,), fetch=True)
-    inc_ext = float(r2[0]['s']) if r2 and r2[0]['s'] else 0.0
-    
-    # Giderler
-    r3 = run_query("SELECT SUM(price_worker) as s FROM jobs WHERE date LIKE %s", (dp,), fetch=True)
-    exp_jobs = float(r3[0]['s']) if r3 and r3[0]['s'] else 0.0
-    
-    r4 = run_query("SELECT SUM(amount) as s FROM transactions WHERE type='expense' AND date LIKE %s", (dp,), fetch=True)
-    exp_ext = float(r4[0]['s']) if r4 and r4[0]['s'] else 0.0
-    
-    # Maaşlar (Sabit Gider)
-    pros = run_query("SELECT salary, weekly_salary FROM professionals", fetch=True)
-    sal_tot = 0
-    
-    num_days = calendar.monthrange(year, month)[1]
-    mondays = sum(1 for day in range(1, num_days + 1) if date(year, month, day).weekday() == 0)
-    
-    if pros:
-        for p in pros:
-            if p['salary'] > 0: sal_tot += p['salary']
-            if p['weekly_salary'] > 0: sal_tot += (p['weekly_salary'] * mondays)
-            
-    return (inc_jobs + inc_ext), (exp_jobs + exp_ext + sal_tot)
-
-def get_report():
-    data = []
-    # Manuel İşlemler
-    trx = run_query("SELECT * FROM transactions", fetch=True)
-    if trx:
-        for t in trx:
-            f = 1 if t['type']=='income' else -1
-            data.append({"Tarih": t['date'], "Tür": "Manuel", "Açıklama": t['description'], "Tutar": t['amount']*f})
-    
-    # İş Gelirleri
-    j_inc = run_query("SELECT j.date, j.price_customer, c.name FROM jobs j JOIN customers c ON j.customer_id=c.id WHERE j.is_collected=1 AND j.price_customer > 0", fetch=True)
-    if j_inc:
-        for j in j_inc:
-            data.append({"Tarih": j['date'], "Tür": "Tahsilat", "Açıklama": j['name'], "Tutar": j['price_customer']})
-            
-    # Personel Ödemeleri
-    j_exp = run_query("SELECT j.date, j.price_worker, j.job_type FROM jobs j WHERE j.is_worker_paid=1 AND j.price_worker > 0", fetch=True)
-    if j_exp:
-        for j in j_exp:
-            data.append({"Tarih": j['date'], "Tür": "Ödeme", "Açıklama": f"Personel ({j['job_type']})", "Tutar": -j['price_worker']})
-            
-    # Maaşlar
-    sal = run_query("SELECT sp.payment_date, sp.amount, p.name FROM salary_payments sp JOIN professionals p ON sp.pro_id=p.id", fetch=True)
-    if sal:
-        for s in sal:
-            data.append({"Tarih": s['payment_date'], "Tür": "Maaş", "Açıklama": s['name'], "Tutar": -s['amount']})
-            
-    df = pd.DataFrame(data)
-    if not df.empty:
-        df['Tarih_Obj'] = pd.to_datetime(df['Tarih'], format="%d.%m.%Y")
-        df = df.sort_values(by='Tarih_Obj', ascending=False).drop(columns=['Tarih_Obj'])
-    return df
-
-# --- SESSION STATE ---
-if 'wiz_dates' not in st.session_state: st.session_state.wiz_dates = []
-
-# ==========================================
-# ARAYÜZ (UI)
-# ==========================================
-with st.sidebar:
-    st.title("📊 Yönetim")
-    st.caption(f"Tarih: {datetime.now().strftime('%d.%m.%Y')}")
-    st.divider()
-    
-    st.subheader("📅 Aylık Kâr Analizi")
-    sel_y = st.selectbox("Yıl", [2025, 2026], index=1)
-    sel_m = st.selectbox("Ay", range(1,13), index=datetime.now().month-1)
-    
-    mi, me = calculate_monthly_profit(sel_m, sel_y)
-    mn = mi - me
-    
-    st.markdown(f"""
-    <div style="background:#f0f2f6;padding:10px;border-radius:5px;">
-        <h4 style="margin:0;">{calendar.month_name[sel_m]} {sel_y}</h4><hr style="margin:5px 0;">
-        <div style="display:flex;justify-content:space-between;"><span>Gelir:</span><span style="color:green;">{mi:,.0f}</span></div>
-        <div style="display:flex;justify-content:space-between;"><span>Gider:</span><span style="color:red;">{me:,.0f}</span></div>
-        <div style="display:flex;justify-content:space-between;border-top:1px solid #ccc;margin-top:5px;padding-top:5px;"><span>NET:</span><span style="color:{'green' if mn>=0 else 'red'};font-weight:bold;">{mn:,.0f}</span></div>
-    </div>""", unsafe_allow_html=True)
-    
-    st.divider()
-    if st.button("Yenile (F5)"): 
-        st.cache_resource.clear()
-        st.rerun()
-
-st.title("🚀 Vardiya Yönetim Merkezi")
-
-# KPI
-df_r = get_report()
-curr_cash = df_r['Tutar'].sum() if not df_r.empty else 0.0
-
-pi_res = run_query("SELECT SUM(price_customer) as s FROM jobs WHERE is_collected=0", fetch=True)
-pend_inc = float(pi_res[0]['s']) if pi_res and pi_res[0]['s'] else 0.0
-
-pd_val, sd_val = calculate_obligations()
-tot_debt = pd_val + sd_val
-
-cmi, cme = calculate_monthly_profit(datetime.now().month, datetime.now().year)
-cmn = cmi - cme
-
-k1,k2,k3,k4 = st.columns(4)
-k1.metric("💰 Anlık Kasa", f"{curr_cash:,.0f} TL")
-k2.metric("💳 Alacaklar", f"{pend_inc:,.0f} TL")
-k3.metric("📉 Toplam Borç", f"{tot_debt:,.0f} TL")
-k4.metric(f"📅 Bu Ay Kâr", f"{cmn:,.0f} TL", delta_color="normal")
-
-st.divider()
-tabs = st.tabs(["⚡ İş Planla", "📅 Öğrenci", "📅 Pro", "📂 Profiller", "📈 Finans", "💸 Ödemeler"])
-
-# --- TAB 1: SİHİRBAZ ---
-with tabs[0]:
-    st.subheader("⚡ Hızlı İş Planlama")
-    custs = run_query("SELECT * FROM customers", fetch=True)
-    c_opts = {c['name']:c['id'] for c in custs} if custs else {}
-    
-    if c_opts:
-        with st.container(border=True):
-            c1, c2 = st.columns(2)
-            with c1:
-                sel_c = st.selectbox("Müşteri", list(c_opts.keys()))
-                cid = c_opts[sel_c]
-                pay_m = st.radio("Ödeme", ["Peşin", "Veresiye"], horizontal=True)
-            with c2:
-                d_mode = st.radio("Tarih", ["Aralık", "Manuel"], horizontal=True)
-                if d_mode.startswith("Aralık"):
-                    d1 = st.date_input("Başlangıç"); d2 = st.date_input("Bitiş", value=datetime.now().date()+timedelta(30))
-                    days = st.multiselect("Günler", ["Pazartesi","Salı","Çarşamba","Perşembe","Cuma","Cumartesi","Pazar"])
-                    if d1<=d2 and days:
-                        cur=d1; dm={"Pazartesi":0,"Salı":1,"Çarşamba":2,"Perşembe":3,"Cuma":4,"Cumartesi":5,"Pazar":6}
-                        idx=[dm[x] for x in days]
-                        st.session_state.wiz_dates = []
-                        while cur<=d2:
-                            if cur.weekday() in idx: st.session_state.wiz_dates.append(cur)
-                            cur+=timedelta(1)
-                else:
-                    cp, cl = st.columns(2)
-                    with cp:
-                        pick = st.date_input("Tarih")
-                        if st.button("Ekle"): 
-                            if pick not in st.session_state.wiz_dates: st.session_state.wiz_dates.append(pick)
-                    with cl:
-                        st.write(f"Seçilen: {len(st.session_state.wiz_dates)}")
-                        if st.button("Temizle"): st.session_state.wiz_dates=[]
-
-        st.write("---")
-        p_mode = st.radio("💰 Fiyat Tipi", ["Gün Başına", "Toplam Proje"], horizontal=True)
-        c_cost, c_rev = st.columns(2)
-        with c_cost:
-            ns = st.number_input("Öğrenci Sayısı", 0, 50, 0)
-            ps = st.number_input("Öğrenci Ücreti", 0.0)
-            np = st.number_input("Pro Sayısı", 0, 50, 0)
-            pp = st.number_input("Pro Ücreti", 0.0)
-        with c_rev:
-            if "Toplam" in p_mode:
-                tot_p = st.number_input("Toplam Tutar", 0.0, step=500.0)
-            else:
-                day_p = st.number_input("Günlük Tutar", 0.0, step=500.0)
-                tot_p = day_p * len(st.session_state.wiz_dates)
-
-        if st.button("Oluştur", type="primary"):
-            if not st.session_state.wiz_dates: st.error("Tarih yok.")
-            else:
-                gid = str(uuid.uuid4())[:8]
-                is_pre = 1 if pay_m.startswith("Peşin") else 0
-                is_coll = 1 if is_pre else 0
-                
-                jobs_data = []
-                first_rec = False
-                
-                for fd in st.session_state.wiz_dates:
-                    ds = fd.strftime("%d.%m.%Y")
-                    # Fiyat
-                    p_cust = 0
-                    if "Toplam" in p_mode:
-                        p_cust = tot_p if not first_rec else 0
-                        first_rec = True
-                    else:
-                        p_cust = day_p
-                    
-                    # Dağıtma mantığı (Basitleştirilmiş: Toplam fiyatı ilk öğrenciye yaz)
-                    # Eğer proje bazlıysa sadece ilk güne yazılır.
-                    # Eğer gün bazlıysa her günün ilk işine yazılır.
-                    
-                    # ÖĞRENCİ
-                    for _ in range(ns):
-                        # Fiyatı kime yazacağız? (Sadece 1 kişiye yazıyoruz ki mükerrer olmasın)
-                        my_price = 0
-                        if "Toplam" in p_mode:
-                             # Zaten yukarıda p_cust ayarladık (ilk kayıtta dolu, diğerlerinde 0)
-                             if p_cust > 0: 
-                                 my_price = p_cust
-                                 p_cust = 0 # Harcandı
-                        else:
-                            # Günlük
-                            if (ns+np) > 0: my_price = day_p / (ns+np) # Eşit bölüştür
-
-                        jobs_data.append((gid, ds, cid, 'student', 'OPEN', None, None, ps, my_price, is_coll, is_pre))
-                    
-                    # PRO
-                    for _ in range(np):
-                        my_price = 0
-                        if "Toplam" in p_mode:
-                             if p_cust > 0: 
-                                 my_price = p_cust
-                                 p_cust = 0
-                        else:
-                            if (ns+np) > 0: my_price = day_p / (ns+np)
-
-                        jobs_data.append((gid, ds, cid, 'pro', 'OPEN', None, None, pp, my_price, is_coll, is_pre))
-                
-                if jobs_data:
-                    q = "INSERT INTO jobs (group_id, date, customer_id, job_type, status, assigned_student_id, assigned_pro_id, price_worker, price_customer, is_collected, is_prepaid) VALUES %s"
-                    conn = get_db_connection()
-                    with conn.cursor() as c:
-                        execute_values(c, q, jobs_data)
-                        conn.commit()
-                    st.success(f"Kayıt Başarılı! ({len(jobs_data)} iş)")
-                    st.session_state.wiz_dates = []
-    else: st.warning("Müşteri ekleyin.")
-
-# --- TAKVİM ---
-def render_cal(type_label):
-    db_type = 'student' if type_label == 'Öğrenci' else 'pro'
-    c1, c2 = st.columns([2,1])
-    with c1:
-        ny, nm = datetime.now().year, datetime.now().month
-        cy, cm = st.columns(2)
-        y = cy.selectbox(f"Yıl {type_label}", [ny, ny+1], key=f"y{db_type}")
-        m = cm.selectbox(f"Ay {type_label}", range(1,13), index=nm-1, key=f"m{db_type}")
-        cal = calendar.monthcalendar(y, m)
-        m_str = f"{m:02d}.{y}"
-        
-        jobs = run_query("SELECT j.date, c.name, j.price_customer, j.price_worker FROM jobs j JOIN customers c ON j.customer_id = c.id WHERE j.date LIKE %s AND j.job_type = %s", (f"%{m_str}", db_type), fetch=True)
-        
-        day_map = {}
-        if jobs:
-            for row in jobs:
-                d = row['date']
-                if d not in day_map: day_map[d] = {'names': [], 'inc': 0, 'exp': 0}
-                if row['name'] not in day_map[d]['names']: day_map[d]['names'].append(row['name'])
-                day_map[d]['inc'] += row['price_customer']
-                day_map[d]['exp'] += row['price_worker']
-
-        cols = st.columns(7)
-        for d in ["Pt","Sa","Ça","Pe","Cu","Ct","Pz"]: cols[list(["Pt","Sa","Ça","Pe","Cu","Ct","Pz"]).index(d)].write(f"**{d}**")
-        for w in cal:
-            cols = st.columns(7)
-            for i, d in enumerate(w):
-                with cols[i]:
-                    if d!=0:
-                        ds = f"{d:02d}.{m_str}"
-                        with st.container(border=True):
-                            if st.button(f"**{d}**", key=f"b{db_type}{ds}", use_container_width=True): st.session_state[f's{db_type}'] = ds
-                            dm = day_map.get(ds)
-                            if dm:
-                                for nm in dm['names'][:2]: st.markdown(f'<span class="job-badge">{nm}</span>', unsafe_allow_html=True)
-                                if len(dm['names'])>2: st.caption("...")
-                                net = dm['inc']-dm['exp']
-                                st.markdown(f'<div class="{"net-profit" if net>=0 else "net-loss"}">{net:,.0f}</div>', unsafe_allow_html=True)
-                            else: st.markdown("<br>", unsafe_allow_html=True)
-    with c2:
-        sd = st.session_state.get(f's{db_type}', datetime.now().strftime("%d.%m.%Y"))
-        st.markdown(f"### 📅 {sd}")
-        with st.expander("Ekstra"):
-            n = run_query("SELECT note FROM daily_notes WHERE date=%s", (sd,), fetch=True)
-            cur_n = n[0]['note'] if n else ""
-            nn = st.text_area("Not", cur_n, key=f"n{db_type}")
-            if st.button("Kaydet", key=f"sn{db_type}"): 
-                run_query("INSERT INTO daily_notes (date,note) VALUES (%s,%s) ON CONFLICT(date) DO UPDATE SET note=%s", (sd, nn, nn), commit=True)
-                st.success("ok")
-            with st.form(f"q{db_type}"):
-                t = st.selectbox("Tip", ["Gelir", "Gider"])
-                a = st.number_input("Tutar", 0.0); desc = st.text_input("Açıklama")
-                if st.form_submit_button("Ekle"):
-                    run_query("INSERT INTO transactions (date,type,category,amount,description) VALUES (%s,%s,%s,%s,%s)",(sd, 'income' if t=='Gelir' else 'expense', 'extra', a, desc), commit=True)
-                    st.rerun()
-        
-        jobs = run_query("SELECT j.*, c.name, c.location FROM jobs j JOIN customers c ON j.customer_id=c.id WHERE j.date=%s AND j.job_type=%s", (sd, db_type), fetch=True)
-        if jobs:
-            for j in jobs:
-                with st.expander(f"📌 {j['name']}"):
-                    st.caption(f"📍 {j['location']}")
-                    st.write(f"Al: {j['price_customer']} | Ver: {j['price_worker']}")
-                    c_c, c_p = st.columns(2)
-                    ic = c_c.checkbox("Tahsilat", bool(j['is_collected']), key=f"cc{j['id']}")
-                    iw = c_p.checkbox("Ödeme", bool(j['is_worker_paid']), key=f"cw{j['id']}")
-                    
-                    if ic!=bool(j['is_collected']): 
-                        run_query("UPDATE jobs SET is_collected=%s WHERE id=%s", (int(ic), j['id']), commit=True)
-                        st.rerun()
-                    if iw!=bool(j['is_worker_paid']): 
-                        run_query("UPDATE jobs SET is_worker_paid=%s WHERE id=%s", (int(iw), j['id']), commit=True)
-                        st.rerun()
-                    
-                    asg = "???"
-                    if j['assigned_student_id']: 
-                        r=run_query("SELECT name FROM students WHERE id=%s", (j['assigned_student_id'],), fetch=True)
-                        if r: asg=r[0]['name']
-                    elif j['assigned_pro_id']:
-                        r=run_query("SELECT name FROM professionals WHERE id=%s", (j['assigned_pro_id'],), fetch=True)
-                        if r: asg=r[0]['name']
-                    st.info(f"Personel: {asg}")
-                    
-                    with st.popover("⚙️ Düzenle"):
-                        if db_type=='student':
-                            stu = run_query("SELECT * FROM students", fetch=True)
-                            opts={x['name']:x['id'] for x in stu} if stu else {}
-                            sel=st.selectbox("Seç", ["-"]+list(opts.keys()), key=f"as{j['id']}")
-                            cp=st.number_input("Ücret", value=j['price_worker'], key=f"cp{j['id']}")
-                            if st.button("Kaydet", key=f"sb{j['id']}"):
-                                if sel!="-": 
-                                    run_query("UPDATE jobs SET assigned_student_id=%s, status='ASSIGNED', price_worker=%s WHERE id=%s",(opts[sel],cp,j['id']), commit=True)
-                                    st.rerun()
-                        else:
-                            pros = run_query("SELECT * FROM professionals", fetch=True)
-                            opts={x['name']:x['id'] for x in pros} if pros else {}
-                            sel=st.selectbox("Seç", ["-"]+list(opts.keys()), key=f"ap{j['id']}")
-                            if sel!="-":
-                                pd=run_query("SELECT salary, weekly_salary FROM professionals WHERE id=%s", (opts[sel],), fetch=True)
-                                is_sal=(pd[0]['salary']>0 or pd[0]['weekly_salary']>0) if pd else False
-                                np=0 if is_sal else j['price_worker']
-                                if not is_sal: np=st.number_input("Ücret", value=j['price_worker'], key=f"pnm{j['id']}")
-                                if st.button("Kaydet", key=f"pb{j['id']}"):
-                                    run_query("UPDATE jobs SET assigned_pro_id=%s, status='ASSIGNED', price_worker=%s WHERE id=%s",(opts[sel],np,j['id']), commit=True)
-                                    st.rerun()
-                    if st.button("🗑️ Sil", key=f"dl{j['id']}"): 
-                        run_query("DELETE FROM jobs WHERE id=%s", (j['id'],), commit=True)
-                        st.rerun()
-        else: st.info("İş yok")
-
-with tabs[1]: render_cal('Öğrenci')
-with tabs[2]: render_cal('Profesyonel')
-
-# --- TAB 4: PROFİLLER ---
-with tabs[3]:
-    t1,t2,t3 = st.tabs(["Müşteri","Öğrenci","Pro"])
-    with t1:
-        with st.form("nc"):
-            n=st.text_input("Ad"); p=st.text_input("Tel"); l=st.text_input("Konum")
-            if st.form_submit_button("Ekle"): 
-                run_query("INSERT INTO customers (name,phone,location) VALUES (%s,%s,%s)",(n,p,l), commit=True)
-                st.rerun()
-        cs=run_query("SELECT * FROM customers", fetch=True)
-        sel = st.selectbox("Seç", ["-"]+[x['name'] for x in cs] if cs else [], key="sct")
-        if sel!="-":
-            cu=run_query("SELECT * FROM customers WHERE name=%s", (sel,), fetch=True)[0]
-            with st.expander("Düzenle"):
-                with st.form("ec"):
-                    en=st.text_input("Ad",cu['name']); ep=st.text_input("Tel",cu['phone']); el=st.text_input("Yer",cu['location'])
-                    if st.form_submit_button("Güncelle"): 
-                        run_query("UPDATE customers SET name=%s, phone=%s, location=%s WHERE id=%s",(en,ep,el,cu['id']), commit=True)
-                        st.rerun()
-            st.write("**Geçmiş**")
-            js=run_query("SELECT * FROM jobs WHERE customer_id=%s ORDER BY date DESC", (cu['id'],), fetch=True)
-            if js:
-                for j in js: st.write(f"📅 {j['date']} | 💵 {j['price_customer']}")
-    with t2:
-        with st.form("ns"):
-            n=st.text_input("Ad"); p=st.text_input("Tel")
-            if st.form_submit_button("Ekle"): 
-                run_query("INSERT INTO students (name,phone) VALUES (%s,%s)",(n,p), commit=True)
-                st.rerun()
-        ss=run_query("SELECT * FROM students", fetch=True)
-        sel = st.selectbox("Seç", ["-"]+[x['name'] for x in ss] if ss else [], key="sst")
-        if sel!="-":
-            s=run_query("SELECT * FROM students WHERE name=%s", (sel,), fetch=True)[0]
-            with st.expander("Düzenle"):
-                with st.form("es"):
-                    en=st.text_input("Ad",s['name']); ep=st.text_input("Tel",s['phone'])
-                    if st.form_submit_button("Güncelle"): 
-                        run_query("UPDATE students SET name=%s, phone=%s WHERE id=%s",(en,ep,s['id']), commit=True)
-                        st.rerun()
-            st.write("**İşler**")
-            js=run_query("SELECT * FROM jobs WHERE assigned_student_id=%s ORDER BY date DESC", (s['id'],), fetch=True)
-            if js:
-                for j in js: st.write(f"📅 {j['date']} | 💰 {j['price_worker']}")
-    with t3:
-        pt1, pt2 = st.tabs(["Maaşlı", "Ekstra"])
-        with pt1:
-            with st.form("npm"):
-                n=st.text_input("Ad"); p=st.text_input("Tel"); sa=st.number_input("Ay",0.0); we=st.number_input("Hafta",0.0); da=st.number_input("Gün",1)
-                if st.form_submit_button("Ekle"): 
-                    run_query("INSERT INTO professionals (name,phone,salary,weekly_salary,payment_day) VALUES (%s,%s,%s,%s,%s)",(n,p,sa,we,da), commit=True)
-                    st.rerun()
-            ps=run_query("SELECT * FROM professionals WHERE salary>0 OR weekly_salary>0", fetch=True)
-            sel = st.selectbox("Seç", ["-"]+[x['name'] for x in ps] if ps else [], key="spt1")
-            if sel!="-":
-                p=run_query("SELECT * FROM professionals WHERE name=%s", (sel,), fetch=True)[0]
-                with st.expander("Düzenle"):
-                    with st.form("epm"):
-                        en=st.text_input("Ad",p['name']); es=st.number_input("Ay",p['salary']); ew=st.number_input("Hafta",p['weekly_salary']); ed=st.number_input("Gün",p['payment_day'])
-                        if st.form_submit_button("Güncelle"): 
-                            run_query("UPDATE professionals SET name=%s, salary=%s, weekly_salary=%s, payment_day=%s WHERE id=%s",(en,es,ew,ed,p['id']), commit=True)
-                            st.rerun()
-                st.write("**İşler**")
-                js=run_query("SELECT * FROM jobs WHERE assigned_pro_id=%s ORDER BY date DESC", (p['id'],), fetch=True)
-                if js:
-                    for j in js: st.write(f"📅 {j['date']}")
-        with pt2:
-            with st.form("npe"):
-                n=st.text_input("Ad"); p=st.text_input("Tel")
-                if st.form_submit_button("Ekle"): 
-                    run_query("INSERT INTO professionals (name,phone,salary,weekly_salary,payment_day) VALUES (%s,%s,%s,%s,%s)",(n,p,0,0,1), commit=True)
-                    st.rerun()
-            eps=run_query("SELECT * FROM professionals WHERE salary=0 AND weekly_salary=0", fetch=True)
-            sel = st.selectbox("Seç", ["-"]+[x['name'] for x in eps] if eps else [], key="spt2")
-            if sel!="-":
-                p=run_query("SELECT * FROM professionals WHERE name=%s", (sel,), fetch=True)[0]
-                with st.expander("Düzenle"):
-                    with st.form("epe"):
-                        en=st.text_input("Ad",p['name']); ep=st.text_input("Tel",p['phone'])
-                        if st.form_submit_button("Güncelle"): 
-                            run_query("UPDATE professionals SET name=%s, phone=%s WHERE id=%s",(en,ep,p['id']), commit=True)
-                            st.rerun()
-                st.write("**İşler**")
-                js=run_query("SELECT * FROM jobs WHERE assigned_pro_id=%s ORDER BY date DESC", (p['id'],), fetch=True)
-                if js:
-                    for j in js: st.write(f"📅 {j['date']} | 💰 {j['price_worker']}")
-
-with tabs[4]:
-    df = get_report()
-    st.dataframe(df, width="stretch")
-    if not df.empty: st.download_button("İndir", df.to_csv(index=False).encode('utf-8'), "finans.csv", "text/csv")
-
-with tabs[5]:
-    p1,p2,p3 = st.tabs(["Aylık","Haftalık","Parça"])
-    with p1:
-        cm = f"{datetime.now().month:02d}-{datetime.now().year}"
-        ps = run_query("SELECT * FROM professionals WHERE salary>0", fetch=True)
-        if ps:
-            for p in ps:
-                c1,c2=st.columns([3,1])
-                c1.write(f"{p['name']} ({p['salary']} TL)")
-                chk=run_query("SELECT * FROM salary_payments WHERE pro_id=%s AND month_year=%s AND payment_type='monthly'",(p['id'],cm), fetch=True)
-                if chk: c2.success("✅")
-                else:
-                    if c2.button("Öde", key=f"pm{p['id']}"):
-                        run_query("INSERT INTO salary_payments (pro_id,amount,payment_date,month_year,payment_type) VALUES (%s,%s,%s,%s,%s)",(p['id'],p['salary'],datetime.now().strftime("%d.%m.%Y"),cm,'monthly'), commit=True)
-                        st.rerun()
-    with p2:
-        today = datetime.now(); wn = today.isocalendar()[1]; wk = f"W{wn}-{today.year}"
-        ps = run_query("SELECT * FROM professionals WHERE weekly_salary>0", fetch=True)
-        if ps:
-            for p in ps:
-                c1,c2=st.columns([3,1])
-                c1.write(f"{p['name']} ({p['weekly_salary']} TL)")
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import pandas as pd
+import calendar
+import uuid
+from datetime import datetime, timedelta, date
+
+# --- SAYFA AYARLARI ---
+st.set_page_config(page_title="Vardiya ERP Ultimate", page_icon="🚀", layout="wide")
+
+# CSS
+st.markdown("""
+<style>
+    .job-badge {
+        background-color: #f0f2f6; border: 1px solid #d6d9ef; color: #31333F;
+        padding: 2px 6px; border-radius: 4px; font-size: 11px; margin-bottom: 2px;
+        white-space: nowrap; overflow: hidden; text-overflow: ellipsis; display: block;
+    }
+    .net-profit { color: #008f39; font-size: 11px; font-weight: bold; }
+    .net-loss { color: #d10000; font-size: 11px; font-weight: bold; }
+    .stButton button { padding: 0px 10px; min-height: 0px; height: 30px; width: 100%; border-radius: 5px; }
+</style>
+""", unsafe_allow_html=True)
+
+# --- VERİTABANI BAĞLANTISI (HAVUZ) ---
+import autoassign
+import cache
+import changes
+from db import get_pool, on_write, parallel, run_query, start_trace
+import history
+import jobedit
+from loaders import Loaders
+import ledger
+from migrate import ensure_schema
+import payroll
+from planner import WEEKDAYS, build_jobs, insert_jobs, plan_dates
+import recurrence
+import rollup
+import search
+import snapshot
+import trends
+
+try:
+    get_pool()
+except Exception as e:
+    st.error("Veritabanına bağlanılamadı. Lütfen sayfayı yenileyin.")
+    st.stop()
+
+# Bu rerun'daki tüm SQL'ler (süre, satır, çağrı yeri)
+sql_trace = start_trace()
+# Rerun boyunca id -> kayıt toplu yükleyicileri
+ld = Loaders()
+
+# --- ÖNBELLEK (YAZMADA GEÇERSİZLEŞİR) ---
+PNL_TABLES = {'jobs', 'transactions', 'professionals'}
+CAL_TABLES = {'jobs', 'customers'}
+TOTAL_TABLES = {'jobs', 'transactions', 'salary_payments', 'professionals'}
+TREND_TABLES = PNL_TABLES | {'customers'}
+
+def invalidate_caches(tables, span=None):
+    # span = (ilk, son) tarih ise sadece o aralığa değen aylar düşer; None ise hepsi
+    tables = set(tables)
+    lo, hi = ((span[0].year, span[0].month), (span[1].year, span[1].month)) if span else (None, None)
+    def hit(y, m): return span is None or lo <= (y, m) <= hi
+    if PNL_TABLES & tables: cache.pnl.drop(lambda k: hit(*k))
+    if TOTAL_TABLES & tables: cache.totals.drop()
+    if CAL_TABLES & tables: cache.month_jobs.drop(lambda k: hit(k[1], k[2]))
+    if TREND_TABLES & tables: cache.trends.drop(lambda k: k == 'years' or span is None or (k[0] <= span[1] and k[1] > span[0]))
+
+on_write('app', invalidate_caches)
+
+# --- BAŞLANGIÇ AYARLARI ---
+# Şema göçleri süreç başına bir kez (deploy öncesi: python migrate.py)
+try:
+    ensure_schema()
+except Exception as e:
+    st.error(f"Veritabanı şeması güncellenemedi: {e}")
+    st.stop()
+# Diğer oturumların yazmaları NOTIFY ile gelir; dinleyici bağlıysa önbellekler uzun ömürlü
+cache.set_ttl(cache.LONG_TTL if changes.start_listener() else cache.SHORT_TTL)
+# Düzenli müşterilerin iş penceresini ileri taşı (süreç başına günde bir kez)
+recurrence.extend_if_due()
+
+# --- HESAPLAMA MOTORLARI ---
+def month_bounds(year, month):
+    # Yarı açık aralık: [ayın 1'i, sonraki ayın 1'i)
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+def ledger_totals():
+    # Kasa / alacak / parça başı borç: günlük özet tablosundan tek satır
+    t = cache.totals.get('all')
+    if t is None:
+        g = cache.totals.gen()
+        t = rollup.totals()
+        if t is None: return {'cash': 0.0, 'pending': 0.0, 'payable': 0.0}
+        cache.totals.put('all', t, g)
+    return t
+
+def salary_debt():
+    # Vadesi gelmiş ödenmemiş aylık/haftalık maaşlar (tek sorgu)
+    today = datetime.now().date()
+    debt = cache.totals.get(('salary', today))
+    if debt is None:
+        g = cache.totals.gen()
+        debt = payroll.total_arrears(today)
+        cache.totals.put(('salary', today), debt, g)
+    return debt
+
+def _fetch_pnl(months):
+    # Tek sorgu: istenen tüm ayların iş + manuel gelir/giderleri (günlük özetten) ve o ay vadesi gelen maaşlar
+    starts = [date(y, m, 1) for y, m in months]
+    lo = min(starts); hi = max(month_bounds(y, m)[1] for y, m in months)
+    rows = run_query(f"""
+        WITH ms AS (SELECT unnest(%(starts)s::date[]) AS m),
+        agg AS (
+            SELECT date_trunc('month', date)::date AS m,
+                   SUM(job_income + extra_income) AS inc,
+                   SUM(job_expense + extra_expense) AS exp
+            FROM daily_ledger_rollup WHERE date >= %(d1)s AND date < %(d2)s GROUP BY 1
+        ),
+        sal AS ({payroll.cost_by_month_sql()})
+        SELECT ms.m, COALESCE(agg.inc, 0) AS inc, COALESCE(agg.exp, 0) AS exp, COALESCE(sal.sal, 0) AS sal
+        FROM ms LEFT JOIN agg USING (m) LEFT JOIN sal USING (m)""", {'starts': starts, 'd1': lo, 'd2': hi, 'from_start': False}, fetch=True)
+    
+    res = {}
+    for r in rows or []:
+        res[(r['m'].year, r['m'].month)] = (float(r['inc']), float(r['exp']) + float(r['sal']))
+    return res
+
+def monthly_pnl(months):
+    # {(yıl, ay): (gelir, gider)}; önbellekte olmayan aylar tek sorguda çekilir
+    months = list(dict.fromkeys(months))
+    hit = cache.pnl.get_many(months)
+    missing = [k for k in months if k not in hit]
+    if missing:
+        g = cache.pnl.gen()
+        fresh = _fetch_pnl(missing)
+        for k, v in fresh.items(): cache.pnl.put(k, v, g)
+        hit.update(fresh)
+    return {k: hit[k] for k in months if k in hit}
+
+def load_dashboard(sel_y, sel_m):
+    # Sidebar + KPI satırı: bağımsız okumalar eşzamanlı (her biri kendi bağlantısında), tek anlık görüntü
+    now = datetime.now(); cur = (now.year, now.month)
+    r = parallel({
+        'totals': ledger_totals,
+        'salary_debt': salary_debt,
+        'pnl': lambda: monthly_pnl([(sel_y, sel_m), cur]),
+    })
+    t = r['totals']
+    return {
+        'cash': t['cash'], 'pending': t['pending'], 'piece_debt': t['payable'], 'salary_debt': r['salary_debt'],
+        'selected': r['pnl'].get((sel_y, sel_m), (0.0, 0.0)), 'month': r['pnl'].get(cur, (0.0, 0.0)),
+    }
+
+def get_trends(d1, d2):
+    # [d1, d2) aylık trend (uzun format); aralık başına tek sorgu ya da analiz kopyasından
+    if snapshot.available(): return snapshot.trend(d1, d2)
+    df = cache.trends.get((d1, d2))
+    if df is None:
+        g = cache.trends.gen()
+        df = trends.fetch(d1, d2)
+        cache.trends.put((d1, d2), df, g)
+    return df
+
+def data_years():
+    ys = cache.trends.get('years')
+    if ys is None:
+        g = cache.trends.gen()
+        ys = trends.data_years()
+        cache.trends.put('years', ys, g)
+    return ys
+
+# --- DEFTER (KASA HAREKETLERİ) ---
+def get_report(d1=None, d2=None, kinds=None, after=None, limit=50):
+    # Bir sayfa defter + sonraki sayfanın imleci (yoksa None)
+    if snapshot.available():
+        rows = snapshot.ledger_page(d1, d2, kinds, after, limit)
+    else:
+        where, params = ledger.ledger_where(d1, d2, kinds)
+        if after:
+            w, p = ledger.ledger_after(after); where.append(w); params += p
+        q = ledger.LEDGER_SQL + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY l.date DESC NULLS LAST, l.src DESC, l.id DESC"
+        if limit: q += " LIMIT %s"; params.append(limit + 1)
+        rows = run_query(q, params, fetch=True) or []
+    nxt = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        nxt = (rows[-1]['date'], rows[-1]['src'], rows[-1]['id'])
+    df = pd.DataFrame([{"Tarih": r['date'].strftime("%d.%m.%Y") if r['date'] else "", "Tür": r['kind'], "Açıklama": r['descr'], "Tutar": r['amount']} for r in rows], columns=["Tarih", "Tür", "Açıklama", "Tutar"])
+    return df, nxt
+
+# --- SESSION STATE ---
+if 'wiz_dates' not in st.session_state: st.session_state.wiz_dates = []
+# Plan kimliği kayıttan sonra yenilenir; çift tıklama aynı grubu tekrar yazamaz
+if 'wiz_gid' not in st.session_state: st.session_state.wiz_gid = uuid.uuid4().hex[:16]
+
+# --- GEZİNME ---
+# st.tabs tüm sekmeleri her rerun'da çalıştırır; burada sadece seçili bölüm çalışır.
+# Seçim session_state'te ve URL'de (?tab=finans gibi) tutulur.
+def nav(options, key):
+    # options: {kısa ad: etiket}
+    if key not in st.session_state:
+        q = st.query_params.get(key)
+        st.session_state[key] = q if q in options else next(iter(options))
+    sel = st.radio(key, list(options), format_func=options.get, key=key, horizontal=True, label_visibility="collapsed")
+    if st.query_params.get(key) != sel: st.query_params[key] = sel
+    return sel
+
+def pick(table, key, title="Seç", where=None):
+    # Arama kutusu + ilk N eşleşme (indeksli); seçilen kaydın id'si, seçim yoksa None
+    q = st.text_input(f"🔎 {title}", key=f"{key}_q", placeholder="Ad, telefon" + (" veya konum" if table == "customers" else ""))
+    rows = search.search(table, q, where, keep=st.session_state.get(key))
+    labels = {r['id']: search.label(r) for r in rows}
+    return st.selectbox(title, [None] + list(labels), format_func=lambda i: "-" if i is None else labels[i], key=key, label_visibility="collapsed")
+
+# ==========================================
+# ARAYÜZ (UI)
+# ==========================================
+with st.sidebar:
+    st.title("📊 Yönetim")
+    st.caption(f"Tarih: {datetime.now().strftime('%d.%m.%Y')}")
+    st.divider()
+    
+    st.subheader("📅 Aylık Kâr Analizi")
+    years = data_years()
+    sel_y = st.selectbox("Yıl", years, index=years.index(datetime.now().year))
+    sel_m = st.selectbox("Ay", range(1,13), index=datetime.now().month-1)
+    
+    # Sidebar ve KPI verisi tek seferde
+    snap = load_dashboard(sel_y, sel_m)
+    mi, me = snap['selected']
+    mn = mi - me
+    
+    st.markdown(f"""
+    <div style="background:#f0f2f6;padding:10px;border-radius:5px;">
+        <h4 style="margin:0;">{calendar.month_name[sel_m]} {sel_y}</h4><hr style="margin:5px 0;">
+        <div style="display:flex;justify-content:space-between;"><span>Gelir:</span><span style="color:green;">{mi:,.0f}</span></div>
+        <div style="display:flex;justify-content:space-between;"><span>Gider:</span><span style="color:red;">{me:,.0f}</span></div>
+        <div style="display:flex;justify-content:space-between;border-top:1px solid #ccc;margin-top:5px;padding-top:5px;"><span>NET:</span><span style="color:{'green' if mn>=0 else 'red'};font-weight:bold;">{mn:,.0f}</span></div>
+    </div>""", unsafe_allow_html=True)
+    
+    st.divider()
+    if st.button("Yenile (F5)"): 
+        # Sadece önbellekler; bağlantı havuzu diğer kullanıcılar için açık kalır
+        invalidate_caches(PNL_TABLES | CAL_TABLES)
+        st.rerun()
+    sql_debug = st.toggle("🔍 SQL İzleme", key="sql_debug")
+
+st.title("🚀 Vardiya Yönetim Merkezi")
+
+# KPI
+curr_cash = snap['cash']
+pend_inc = snap['pending']
+tot_debt = snap['piece_debt'] + snap['salary_debt']
+
+cmi, cme = snap['month']
+cmn = cmi - cme
+
+k1,k2,k3,k4 = st.columns(4)
+k1.metric("💰 Anlık Kasa", f"{curr_cash:,.0f} TL")
+k2.metric("💳 Alacaklar", f"{pend_inc:,.0f} TL")
+k3.metric("📉 Toplam Borç", f"{tot_debt:,.0f} TL")
+k4.metric(f"📅 Bu Ay Kâr", f"{cmn:,.0f} TL", delta_color="normal")
+
+st.divider()
+tab = nav({"plan": "⚡ İş Planla", "ogrenci": "📅 Öğrenci", "pro": "📅 Pro", "profil": "📂 Profiller", "finans": "📈 Finans", "odeme": "💸 Ödemeler"}, "tab")
+
+# --- TAB 1: SİHİRBAZ ---
+if tab == "plan":
+    st.subheader("⚡ Hızlı İş Planlama")
+    if search.exists("customers"):
+        with st.container(border=True):
+            c1, c2 = st.columns(2)
+            with c1:
+                cid = pick("customers", "wiz_c", "Müşteri")
+                pay_m = st.radio("Ödeme", ["Peşin", "Veresiye"], horizontal=True)
+            with c2:
+                d_mode = st.radio("Tarih", ["Aralık", "Manuel"], horizontal=True)
+                if d_mode.startswith("Aralık"):
+                    d1 = st.date_input("Başlangıç"); d2 = st.date_input("Bitiş", value=datetime.now().date()+timedelta(30))
+                    days = st.multiselect("Günler", list(WEEKDAYS))
+                    if d1<=d2 and days:
+                        st.session_state.wiz_dates = plan_dates(d1, d2, [WEEKDAYS[x] for x in days])
+                else:
+                    cp, cl = st.columns(2)
+                    with cp:
+                        pick_d = st.date_input("Tarih")
+                        if st.button("Ekle"): 
+                            if pick_d not in st.session_state.wiz_dates: st.session_state.wiz_dates.append(pick_d)
+                    with cl:
+                        st.write(f"Seçilen: {len(st.session_state.wiz_dates)}")
+                        if st.button("Temizle"): st.session_state.wiz_dates=[]
+
+        st.write("---")
+        p_mode = st.radio("💰 Fiyat Tipi", ["Gün Başına", "Toplam Proje"], horizontal=True)
+        c_cost, c_rev = st.columns(2)
+        with c_cost:
+            ns = st.number_input("Öğrenci Sayısı", 0, 50, 0)
+            ps = st.number_input("Öğrenci Ücreti", 0.0)
+            np = st.number_input("Pro Sayısı", 0, 50, 0)
+            pp = st.number_input("Pro Ücreti", 0.0)
+        with c_rev:
+            if "Toplam" in p_mode:
+                tot_p = st.number_input("Toplam Tutar", 0.0, step=500.0)
+            else:
+                day_p = st.number_input("Günlük Tutar", 0.0, step=500.0)
+                tot_p = day_p * len(st.session_state.wiz_dates)
+
+        if st.button("Oluştur", type="primary"):
+            if cid is None: st.error("Müşteri seçin.")
+            elif not st.session_state.wiz_dates: st.error("Tarih yok.")
+            else:
+                is_pre = 1 if pay_m.startswith("Peşin") else 0
+                is_coll = 1 if is_pre else 0
+                if "Toplam" in p_mode:
+                    df_jobs = build_jobs(st.session_state.wiz_gid, cid, st.session_state.wiz_dates, ns, ps, np, pp, total_price=tot_p, is_collected=is_coll, is_prepaid=is_pre)
+                else:
+                    df_jobs = build_jobs(st.session_state.wiz_gid, cid, st.session_state.wiz_dates, ns, ps, np, pp, day_price=day_p, is_collected=is_coll, is_prepaid=is_pre)
+                
+                if not df_jobs.empty:
+                    n = insert_jobs(df_jobs)
+                    if n is None: st.warning("Bu plan zaten kaydedildi.")
+                    else: st.success(f"Kayıt Başarılı! ({n} iş)")
+                    st.session_state.wiz_dates = []
+                    st.session_state.wiz_gid = uuid.uuid4().hex[:16]
+    else: st.warning("Müşteri ekleyin.")
+
+# --- TAKVİM ---
+def get_month_jobs(db_type, y, m):
+    # Ayın işleri tek sorguda; gün değiştirirken önbellekten okunur (satırlar paylaşımlı, değiştirmeyin)
+    key = (db_type, y, m)
+    rows = cache.month_jobs.get(key)
+    if rows is None:
+        g = cache.month_jobs.gen()
+        d1, d2 = month_bounds(y, m)
+        rows = run_query("SELECT j.*, c.name, c.location FROM jobs j JOIN customers c ON j.customer_id=c.id WHERE j.job_type=%s AND j.date >= %s AND j.date < %s ORDER BY j.date, j.id", (db_type, d1, d2), fetch=True) or []
+        rows = [dict(r) for r in rows]
+        cache.month_jobs.put(key, rows, g)
+    return rows
+
+BULK_SCOPES = ["Gün", "Hafta", "Grup"]
+
+def scope_jobs(db_type, sd, scope, gid=None):
+    # Toplu düzenleme kapsamındaki işler (gün/hafta ay önbelleğinden, grup tek sorguda)
+    if scope == "Gün": return [j for j in get_month_jobs(db_type, sd.year, sd.month) if j['date'] == sd]
+    if scope == "Hafta":
+        w0 = sd - timedelta(sd.weekday()); w1 = w0 + timedelta(6)
+        return [j for y, m in sorted({(w0.year, w0.month), (w1.year, w1.month)}) for j in get_month_jobs(db_type, y, m) if w0 <= j['date'] <= w1]
+    if not gid: return []
+    return run_query("SELECT j.*, c.name, c.location FROM jobs j JOIN customers c ON j.customer_id=c.id WHERE j.group_id=%s AND j.job_type=%s ORDER BY j.date, j.id", (gid, db_type), fetch=True) or []
+
+def render_bulk(db_type, sd):
+    # Değişiklikler tabloda birikir, "Kaydet" hepsini tek UPDATE ile yazar
+    scope = st.radio("Kapsam", BULK_SCOPES, horizontal=True, key=f"bs{db_type}")
+    gid = None
+    if scope == "Grup":
+        day = [j for j in get_month_jobs(db_type, sd.year, sd.month) if j['date'] == sd and j['group_id']]
+        groups = {j['group_id']: j['name'] for j in day}
+        if not groups: st.info("Bu günün işleri bir gruba bağlı değil"); return
+        gid = st.selectbox("Grup", list(groups), format_func=lambda g: f"{groups[g]} ({g})", key=f"bg{db_type}")
+        g1, g2 = st.columns(2)
+        if g1.button("✅ Grubu Tahsil Et", key=f"bgc{db_type}", width="stretch"):
+            n = jobedit.mark_group(gid, "is_collected"); st.toast(f"{n} iş tahsil edildi"); st.rerun()
+        if g2.button("💸 Grubu Öde", key=f"bgp{db_type}", width="stretch"):
+            n = jobedit.mark_group(gid, "is_worker_paid"); st.toast(f"{n} iş ödendi"); st.rerun()
+    jobs = scope_jobs(db_type, sd, scope, gid)
+    if not jobs: st.info("İş yok"); return
+    # Seçenekler id; aynı adlı personel etiketle (telefon) ayrılır
+    by_id = {x['id']: x for x in ld.staff(db_type)}
+    labels = {i: search.label(x) for i, x in by_id.items()}
+    acol = 'assigned_student_id' if db_type == 'student' else 'assigned_pro_id'
+    base = pd.DataFrame({
+        "id": [j['id'] for j in jobs],
+        "Tarih": [j['date'] for j in jobs],
+        "Müşteri": [j['name'] for j in jobs],
+        "Al": [j['price_customer'] for j in jobs],
+        "Personel": pd.array([j[acol] if j[acol] in by_id else None for j in jobs], dtype="Int64"),
+        "Ücret": [j['price_worker'] for j in jobs],
+        "Tahsilat": [bool(j['is_collected']) for j in jobs],
+        "Ödeme": [bool(j['is_worker_paid']) for j in jobs],
+    })
+    with st.form(f"bf{db_type}"):
+        ed = st.data_editor(base, hide_index=True, width="stretch", key=f"be{db_type}{scope}{gid}",
+            disabled=["id", "Tarih", "Müşteri", "Al"], column_config={
+                "id": None,
+                "Tarih": st.column_config.DateColumn(format="DD.MM.YYYY"),
+                "Personel": st.column_config.SelectboxColumn(options=list(by_id), format_func=lambda i: labels.get(i, "-")),
+                "Ücret": st.column_config.NumberColumn(min_value=0.0),
+            })
+        if st.form_submit_button(f"Kaydet ({len(jobs)} iş)", width="stretch"):
+            edits = {}
+            for (_, old), (_, new) in zip(base.iterrows(), ed.iterrows()):
+                ch = {}
+                if new["Tahsilat"] != old["Tahsilat"]: ch["is_collected"] = int(new["Tahsilat"])
+                if new["Ödeme"] != old["Ödeme"]: ch["is_worker_paid"] = int(new["Ödeme"])
+                pay = float(new["Ücret"]) if pd.notna(new["Ücret"]) else 0.0
+                was, now = (None if pd.isna(x) else int(x) for x in (old["Personel"], new["Personel"]))
+                if now != was:
+                    who = by_id.get(now)
+                    ch[acol] = who['id'] if who else None
+                    ch["status"] = 'ASSIGNED' if who else 'OPEN'
+                    # Maaşlı pro'ya atanan işin parça başı ücreti olmaz
+                    if who and db_type == 'pro' and (who['salary'] > 0 or who['weekly_salary'] > 0): pay = 0.0
+                if pay != old["Ücret"]: ch["price_worker"] = pay
+                if ch: edits[int(old["id"])] = ch
+            if edits:
+                n = jobedit.apply_edits(edits)
+                st.toast(f"{n} iş güncellendi")
+                st.rerun()
+            else: st.info("Değişiklik yok")
+
+def render_autoassign(db_type, sd):
+    # Aralıktaki OPEN işler için önerilen plan önizlenir; onaylanınca tek transaction'da yazılır
+    pk = f"aa{db_type}"
+    a1, a2 = st.columns([3,1])
+    rng = a1.date_input("Aralık", value=(sd, month_bounds(sd.year, sd.month)[1] - timedelta(1)), key=f"{pk}_rng")
+    if a2.button("Planı Hazırla", key=f"{pk}_go", width="stretch") and len(rng) == 2:
+        st.session_state[pk] = (tuple(rng), *autoassign.plan(db_type, rng[0], rng[1]))
+    res = st.session_state.get(pk)
+    if not res or res[0] != tuple(rng):
+        st.caption("Açık işler ücret, müşteri sürekliliği ve personelin o günkü durumuna göre dağıtılır; plan kaydetmeden önce gösterilir.")
+        return
+    _, rows, left = res
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Atanacak", len(rows)); m2.metric("Atanamayan", left); m3.metric("Personel Ücreti", f"{sum(r['price_worker'] for r in rows):,.0f} TL")
+    if not rows: st.info("Atanabilecek açık iş yok"); return
+    st.dataframe(pd.DataFrame([{"Tarih": r['date'], "Müşteri": r['customer'], "Personel": r['worker'], "Ücret": r['price_worker'], "Önceki İş": r['continuity']} for r in rows]),
+                 hide_index=True, width="stretch", column_config={"Tarih": st.column_config.DateColumn(format="DD.MM.YYYY")})
+    if st.button(f"✅ Planı Kaydet ({len(rows)} iş)", key=f"{pk}_ok", type="primary"):
+        n = autoassign.commit(db_type, rows)
+        del st.session_state[pk]
+        st.toast(f"{n} iş atandı" + (f", {len(rows) - n} iş bu arada değiştiği için atlandı" if n < len(rows) else ""))
+        st.rerun()
+
+def fragment_scope():
+    # Sadece fragment yeniden çalışınca üstteki kod çalışmaz: önceki rerun'ın yükleyicisi
+    # (eski kayıtlar) ve SQL izi (sınırsız büyür) yerine bu çalıştırmaya ait olanlar
+    global ld, sql_trace
+    ctx = get_script_run_ctx()
+    if ctx is not None and ctx.fragment_ids_this_run:
+        ld = Loaders(); sql_trace = start_trace()
+
+# Gün seçimi sadece takvimi yeniden çizer; yazma işlemleri tüm sayfayı yeniler (KPI'lar için)
+@st.fragment
+def render_cal(type_label):
+    fragment_scope()
+    db_type = 'student' if type_label == 'Öğrenci' else 'pro'
+    c1, c2 = st.columns([2,1])
+    with c1:
+        ny, nm = datetime.now().year, datetime.now().month
+        cy, cm = st.columns(2)
+        y = cy.selectbox(f"Yıl {type_label}", [ny, ny+1], key=f"y{db_type}")
+        m = cm.selectbox(f"Ay {type_label}", range(1,13), index=nm-1, key=f"m{db_type}")
+        cal = calendar.monthcalendar(y, m)
+        
+        jobs = get_month_jobs(db_type, y, m)
+        
+        day_map = {}
+        if jobs:
+            for row in jobs:
+                d = row['date']
+                if d not in day_map: day_map[d] = {'names': [], 'inc': 0, 'exp': 0}
+                if row['name'] not in day_map[d]['names']: day_map[d]['names'].append(row['name'])
+                day_map[d]['inc'] += row['price_customer']
+                day_map[d]['exp'] += row['price_worker']
+
+        cols = st.columns(7)
+        for d in ["Pt","Sa","Ça","Pe","Cu","Ct","Pz"]: cols[list(["Pt","Sa","Ça","Pe","Cu","Ct","Pz"]).index(d)].write(f"**{d}**")
+        for w in cal:
+            cols = st.columns(7)
+            for i, d in enumerate(w):
+                with cols[i]:
+                    if d!=0:
+                        ds = date(y, m, d)
+                        with st.container(border=True):
+                            if st.button(f"**{d}**", key=f"b{db_type}{ds}", width="stretch"): st.session_state[f's{db_type}'] = ds
+                            dm = day_map.get(ds)
+                            if dm:
+                                for nm in dm['names'][:2]: st.markdown(f'<span class="job-badge">{nm}</span>', unsafe_allow_html=True)
+                                if len(dm['names'])>2: st.caption("...")
+                                net = dm['inc']-dm['exp']
+                                st.markdown(f'<div class="{"net-profit" if net>=0 else "net-loss"}">{net:,.0f}</div>', unsafe_allow_html=True)
+                            else: st.markdown("<br>", unsafe_allow_html=True)
+    with c2:
+        sd = st.session_state.get(f's{db_type}', datetime.now().date())
+        st.markdown(f"### 📅 {sd.strftime('%d.%m.%Y')}")
+        with st.expander("Ekstra"):
+            n = run_query("SELECT note FROM daily_notes WHERE date=%s", (sd,), fetch=True)
+            cur_n = n[0]['note'] if n else ""
+            nn = st.text_area("Not", cur_n, key=f"n{db_type}")
+            if st.button("Kaydet", key=f"sn{db_type}"): 
+                run_query("INSERT INTO daily_notes (date,note) VALUES (%s,%s) ON CONFLICT(date) DO UPDATE SET note=%s", (sd, nn, nn), commit=True)
+                st.success("ok")
+            with st.form(f"q{db_type}"):
+                t = st.selectbox("Tip", ["Gelir", "Gider"])
+                a = st.number_input("Tutar", 0.0); desc = st.text_input("Açıklama")
+                if st.form_submit_button("Ekle"):
+                    run_query("INSERT INTO transactions (date,type,category,amount,description) VALUES (%s,%s,%s,%s,%s)",(sd, 'income' if t=='Gelir' else 'expense', 'extra', a, desc), commit=True)
+                    st.rerun()
+        
+        if st.toggle("🤖 Otomatik Ata", key=f"auto{db_type}"):
+            render_autoassign(db_type, sd)
+            return
+        if st.toggle("📋 Toplu Düzenle", key=f"bulk{db_type}"):
+            render_bulk(db_type, sd)
+            return
+        jobs = [j for j in get_month_jobs(db_type, sd.year, sd.month) if j['date'] == sd]
+        if jobs:
+            # Atanan personel isimleri tek sorguda
+            ld.students.prime(j['assigned_student_id'] for j in jobs)
+            ld.pros.prime(j['assigned_pro_id'] for j in jobs)
+            for j in jobs:
+                with st.expander(f"📌 {j['name']}"):
+                    st.caption(f"📍 {j['location']}")
+                    st.write(f"Al: {j['price_customer']} | Ver: {j['price_worker']}")
+                    c_c, c_p = st.columns(2)
+                    ic = c_c.checkbox("Tahsilat", bool(j['is_collected']), key=f"cc{j['id']}")
+                    iw = c_p.checkbox("Ödeme", bool(j['is_worker_paid']), key=f"cw{j['id']}")
+                    
+                    if ic!=bool(j['is_collected']): 
+                        run_query("UPDATE jobs SET is_collected=%s WHERE id=%s", (int(ic), j['id']), commit=True)
+                        st.rerun()
+                    if iw!=bool(j['is_worker_paid']): 
+                        run_query("UPDATE jobs SET is_worker_paid=%s WHERE id=%s", (int(iw), j['id']), commit=True)
+                        st.rerun()
+                    
+                    asg = "???"
+                    if j['assigned_student_id']: 
+                        r=ld.students.load(j['assigned_student_id'])
+                        if r: asg=r['name']
+                    elif j['assigned_pro_id']:
+                        r=ld.pros.load(j['assigned_pro_id'])
+                        if r: asg=r['name']
+                    st.info(f"Personel: {asg}")
+                    
+                    with st.popover("⚙️ Düzenle"):
+                        if db_type=='student':
+                            stu = ld.staff('student')
+                            opts={x['name']:x['id'] for x in stu} if stu else {}
+                            sel=st.selectbox("Seç", ["-"]+list(opts.keys()), key=f"as{j['id']}")
+                            cp=st.number_input("Ücret", value=j['price_worker'], key=f"cp{j['id']}")
+                            if st.button("Kaydet", key=f"sb{j['id']}"):
+                                if sel!="-": 
+                                    run_query("UPDATE jobs SET assigned_student_id=%s, status='ASSIGNED', price_worker=%s WHERE id=%s",(opts[sel],cp,j['id']), commit=True)
+                                    st.rerun()
+                        else:
+                            pros = ld.staff('pro')
+                            opts={x['name']:x['id'] for x in pros} if pros else {}
+                            sel=st.selectbox("Seç", ["-"]+list(opts.keys()), key=f"ap{j['id']}")
+                            if sel!="-":
+                                pr=ld.pros.load(opts[sel])
+                                is_sal=(pr['salary']>0 or pr['weekly_salary']>0) if pr else False
+                                np=0 if is_sal else j['price_worker']
+                                if not is_sal: np=st.number_input("Ücret", value=j['price_worker'], key=f"pnm{j['id']}")
+                                if st.button("Kaydet", key=f"pb{j['id']}"):
+                                    run_query("UPDATE jobs SET assigned_pro_id=%s, status='ASSIGNED', price_worker=%s WHERE id=%s",(opts[sel],np,j['id']), commit=True)
+                                    st.rerun()
+                    if st.button("🗑️ Sil", key=f"dl{j['id']}"): 
+                        run_query("DELETE FROM jobs WHERE id=%s", (j['id'],), commit=True)
+                        st.rerun()
+        else: st.info("İş yok")
+
+if tab == "ogrenci": render_cal('Öğrenci')
+if tab == "pro": render_cal('Profesyonel')
+
+# --- TAB 4: PROFİLLER ---
+# Özet tek sorguda, ayrıntı sayfa sayfa; sayfa değiştirmek sadece bu bölümü yeniler
+@st.fragment
+def render_history(kind, eid):
+    fragment_scope()
+    sm = history.summary(kind, eid)
+    if sm.empty:
+        st.info("İş yok"); return
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("İş", f"{sm['n'].sum():,}")
+    if kind == 'customer':
+        m2.metric("Toplam", f"{sm['billed'].sum():,.0f} TL"); m3.metric("Tahsil", f"{sm['collected'].sum():,.0f} TL"); m4.metric("Alacak", f"{sm['billed'].sum() - sm['collected'].sum():,.0f} TL")
+    else:
+        m2.metric("Hakediş", f"{sm['wage'].sum():,.0f} TL"); m3.metric("Ödenen", f"{sm['paid'].sum():,.0f} TL"); m4.metric("Bekleyen", f"{sm['wage'].sum() - sm['paid'].sum():,.0f} TL")
+    if len(sm) > 1: st.bar_chart(sm.set_index("m")["n"].rename("İş"), height=160)
+    # Kayıt değişince ilk sayfaya dön
+    pk = f"hist_{kind}"
+    if st.session_state.get(f"{pk}_id") != eid:
+        st.session_state[f"{pk}_id"] = eid; st.session_state[pk] = [None]
+    pages = st.session_state[pk]
+    rows, nxt = history.page(kind, eid, after=pages[-1])
+    if kind == 'customer':
+        df = pd.DataFrame([{"Tarih": r['date'], "Tip": r['job_type'], "Personel": r['staff'] or "-", "Tutar": r['price_customer'], "Tahsil": bool(r['is_collected'])} for r in rows])
+    else:
+        df = pd.DataFrame([{"Tarih": r['date'], "Müşteri": r['customer'], "Ücret": r['price_worker'], "Ödendi": bool(r['is_worker_paid'])} for r in rows])
+    st.dataframe(df, hide_index=True, width="stretch", column_config={"Tarih": st.column_config.DateColumn(format="DD.MM.YYYY")})
+    b1, b2, b3 = st.columns([1,1,4])
+    b1.button("◀ Önceki", key=f"{pk}_prev", disabled=len(pages) == 1, on_click=pages.pop)
+    b2.button("Sonraki ▶", key=f"{pk}_next", disabled=nxt is None, on_click=pages.append, args=(nxt,))
+    b3.caption(f"Sayfa {len(pages)}")
+
+if tab == "profil":
+    ptab = nav({"musteri": "Müşteri", "ogrenci": "Öğrenci", "pro": "Pro"}, "ptab")
+    if ptab == "musteri":
+        with st.form("nc"):
+            n=st.text_input("Ad"); p=st.text_input("Tel"); l=st.text_input("Konum")
+            if st.form_submit_button("Ekle"): 
+                run_query("INSERT INTO customers (name,phone,location) VALUES (%s,%s,%s)",(n,p,l), commit=True)
+                st.rerun()
+        sel = pick("customers", "sct", "Müşteri")
+        if sel:
+            cu=run_query("SELECT * FROM customers WHERE id=%s", (sel,), fetch=True)[0]
+            with st.expander("Düzenle"):
+                with st.form("ec"):
+                    en=st.text_input("Ad",cu['name']); ep=st.text_input("Tel",cu['phone']); el=st.text_input("Yer",cu['location'])
+                    if st.form_submit_button("Güncelle"): 
+                        run_query("UPDATE customers SET name=%s, phone=%s, location=%s WHERE id=%s",(en,ep,el,cu['id']), commit=True)
+                        st.rerun()
+            with st.expander("🔁 Düzenli İş"):
+                rule = recurrence.get_rule(cu['id'])
+                r = rule if rule and rule['active'] else None
+                if r: st.caption(f"Aktif: {recurrence.frequency_text(r['weekdays'])} | {r['materialized_until']:%d.%m.%Y} tarihine kadar oluşturuldu")
+                with st.form(f"rc_{cu['id']}"):
+                    names = list(WEEKDAYS)
+                    rd = st.multiselect("Günler", names, [names[d] for d in r['weekdays']] if r else [], key=f"rc_days_{cu['id']}")
+                    c1, c2 = st.columns(2)
+                    rns = c1.number_input("Öğrenci Sayısı", 0, value=r['n_student'] if r else 0, key=f"rc_ns_{cu['id']}")
+                    rsp = c1.number_input("Öğrenci Ücreti", 0.0, value=float(r['student_price']) if r else 0.0, key=f"rc_sp_{cu['id']}")
+                    rnp = c2.number_input("Pro Sayısı", 0, value=r['n_pro'] if r else 0, key=f"rc_np_{cu['id']}")
+                    rpp = c2.number_input("Pro Ücreti", 0.0, value=float(r['pro_price']) if r else 0.0, key=f"rc_pp_{cu['id']}")
+                    rdp = st.number_input("Günlük Tutar", 0.0, value=float(r['day_price']) if r else 0.0, key=f"rc_dp_{cu['id']}")
+                    rpre = st.checkbox("Peşin", bool(r['is_prepaid']) if r else False, key=f"rc_pre_{cu['id']}")
+                    rs = st.date_input("Başlangıç", r['start_date'] if r else date.today(), key=f"rc_s_{cu['id']}")
+                    re_ = st.date_input("Bitiş (boşsa süresiz)", r['end_date'] if r else None, key=f"rc_e_{cu['id']}")
+                    if st.form_submit_button("Kaydet"):
+                        if not rd or rns + rnp == 0: st.error("Gün ve personel sayısı seçin.")
+                        else:
+                            n = recurrence.save_rule(cu['id'], [WEEKDAYS[x] for x in rd], rns, rsp, rnp, rpp, rdp, rpre, rs, re_)
+                            st.toast(f"Kural kaydedildi, {n} iş oluşturuldu.")
+                            st.rerun()
+                if r and st.button("Durdur", key=f"rc_stop_{cu['id']}"):
+                    n = recurrence.stop_rule(cu['id'])
+                    st.toast(f"Kural durduruldu, {n} gelecek iş silindi.")
+                    st.rerun()
+            st.write("**Geçmiş**")
+            render_history('customer', cu['id'])
+    if ptab == "ogrenci":
+        with st.form("ns"):
+            n=st.text_input("Ad"); p=st.text_input("Tel")
+            if st.form_submit_button("Ekle"): 
+                run_query("INSERT INTO students (name,phone) VALUES (%s,%s)",(n,p), commit=True)
+                st.rerun()
+        sel = pick("students", "sst", "Öğrenci")
+        if sel:
+            s=run_query("SELECT * FROM students WHERE id=%s", (sel,), fetch=True)[0]
+            with st.expander("Düzenle"):
+                with st.form("es"):
+                    en=st.text_input("Ad",s['name']); ep=st.text_input("Tel",s['phone'])
+                    if st.form_submit_button("Güncelle"): 
+                        run_query("UPDATE students SET name=%s, phone=%s WHERE id=%s",(en,ep,s['id']), commit=True)
+                        st.rerun()
+            st.write("**İşler**")
+            render_history('student', s['id'])
+    if ptab == "pro":
+        prtab = nav({"maasli": "Maaşlı", "ekstra": "Ekstra"}, "prtab")
+        if prtab == "maasli":
+            with st.form("npm"):
+                n=st.text_input("Ad"); p=st.text_input("Tel"); sa=st.number_input("Ay",0.0); we=st.number_input("Hafta",0.0); da=st.number_input("Gün",1); ps_=st.date_input("Maaş Başlangıcı", date.today())
+                if st.form_submit_button("Ekle"): 
+                    run_query("INSERT INTO professionals (name,phone,salary,weekly_salary,payment_day,pay_start) VALUES (%s,%s,%s,%s,%s,%s)",(n,p,sa,we,da,ps_), commit=True)
+                    st.rerun()
+            sel = pick("professionals", "spt1", "Personel", where="salary>0 OR weekly_salary>0")
+            if sel:
+                p=run_query("SELECT * FROM professionals WHERE id=%s", (sel,), fetch=True)[0]
+                with st.expander("Düzenle"):
+                    with st.form("epm"):
+                        en=st.text_input("Ad",p['name']); es=st.number_input("Ay",p['salary']); ew=st.number_input("Hafta",p['weekly_salary']); ed=st.number_input("Gün",p['payment_day']); eps_=st.date_input("Maaş Başlangıcı",p['pay_start'])
+                        if st.form_submit_button("Güncelle"): 
+                            run_query("UPDATE professionals SET name=%s, salary=%s, weekly_salary=%s, payment_day=%s, pay_start=%s WHERE id=%s",(en,es,ew,ed,eps_,p['id']), commit=True)
+                            st.rerun()
+                st.write("**İşler**")
+                render_history('pro', p['id'])
+        if prtab == "ekstra":
+            with st.form("npe"):
+                n=st.text_input("Ad"); p=st.text_input("Tel")
+                if st.form_submit_button("Ekle"): 
+                    run_query("INSERT INTO professionals (name,phone,salary,weekly_salary,payment_day) VALUES (%s,%s,%s,%s,%s)",(n,p,0,0,1), commit=True)
+                    st.rerun()
+            sel = pick("professionals", "spt2", "Personel", where="salary=0 AND weekly_salary=0")
+            if sel:
+                p=run_query("SELECT * FROM professionals WHERE id=%s", (sel,), fetch=True)[0]
+                with st.expander("Düzenle"):
+                    with st.form("epe"):
+                        en=st.text_input("Ad",p['name']); ep=st.text_input("Tel",p['phone'])
+                        if st.form_submit_button("Güncelle"): 
+                            run_query("UPDATE professionals SET name=%s, phone=%s WHERE id=%s",(en,ep,p['id']), commit=True)
+                            st.rerun()
+                st.write("**İşler**")
+                render_history('pro', p['id'])
+
+def render_trends():
+    # Aralık seçimi: varsayılan son 12 ay
+    now = datetime.now()
+    e_y, e_m = now.year, now.month
+    s_y, s_m = (e_y, e_m - 11) if e_m == 12 else (e_y - 1, e_m + 1)
+    years = sorted(set(data_years()) | {s_y})
+    t1, t2, t3, t4, t5 = st.columns([1,1,1,1,2])
+    y1 = t1.selectbox("Başlangıç Yılı", years, index=years.index(s_y), key="tr_y1")
+    m1 = t2.selectbox("Ay", range(1,13), index=s_m-1, key="tr_m1")
+    y2 = t3.selectbox("Bitiş Yılı", years, index=years.index(e_y), key="tr_y2")
+    m2 = t4.selectbox("Ay ", range(1,13), index=e_m-1, key="tr_m2")
+    by = t5.radio("Kırılım", ["Toplam", "İş Tipi", "Müşteri"], horizontal=True, key="tr_by")
+    if (y1, m1) > (y2, m2):
+        st.warning("Başlangıç bitişten sonra olamaz"); return
+    d1, d2 = trends.month_range(y1, m1, y2, m2)
+    df = get_trends(d1, d2)
+    tot = trends.monthly(df, d1, d2)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Gelir", f"{tot['inc'].sum():,.0f} TL"); c2.metric("Gider", f"{tot['exp'].sum():,.0f} TL"); c3.metric("Net", f"{tot['net'].sum():,.0f} TL")
+    if by == "Toplam":
+        st.line_chart(tot.rename(columns={"inc": "Gelir", "exp": "Gider", "net": "Net"}))
+        show = tot
+    elif by == "İş Tipi":
+        val = st.radio("Değer", ["net", "inc", "exp"], format_func={"net": "Net", "inc": "Gelir", "exp": "Gider"}.get, horizontal=True, key="tr_val")
+        show = trends.by_kind(df, d1, d2, val)
+        st.bar_chart(show)
+    else:
+        val = st.radio("Değer", ["inc", "net"], format_func={"net": "Net", "inc": "Gelir"}.get, horizontal=True, key="tr_cval")
+        show = trends.by_customer(df, d1, d2, val)
+        st.bar_chart(show)
+    st.dataframe(show.set_axis(show.index.strftime("%m.%Y")).round(0), width="stretch")
+
+if tab == "finans":
+    ftab = nav({"defter": "Defter", "trend": "Trend"}, "ftab")
+    if snapshot.available():
+        s1, s2 = st.columns([4,1])
+        s1.caption(f"📦 Raporlar yerel analiz kopyasından: {snapshot.synced_at():%d.%m.%Y %H:%M} itibarıyla" + (" (eşitleniyor...)" if snapshot.syncing() else ""))
+        if s2.button("🔄 Eşitle", key="snap_sync", disabled=snapshot.syncing()):
+            snapshot.sync(); st.rerun()
+    elif snapshot.enabled():
+        st.caption("📦 Analiz kopyası hazırlanıyor; raporlar şimdilik canlı veritabanından")
+    if ftab == "trend": render_trends()
+if tab == "finans" and ftab == "defter":
+    f1, f2, f3 = st.columns([2,2,1])
+    fr = f1.date_input("Tarih Aralığı", value=[], key="fin_rng")
+    fk = f2.multiselect("Tür", ledger.LEDGER_KINDS, key="fin_kind")
+    fl = f3.selectbox("Satır", [50, 100, 250], key="fin_lim")
+    fd1 = fr[0] if len(fr) > 0 else None
+    fd2 = fr[1] if len(fr) > 1 else fd1
+    # Filtre değişince ilk sayfaya dön
+    sig = (fd1, fd2, tuple(fk), fl)
+    if st.session_state.get('fin_sig') != sig:
+        st.session_state.fin_sig = sig; st.session_state.fin_pages = [None]
+    pages = st.session_state.fin_pages
+    df, nxt = get_report(fd1, fd2, fk, after=pages[-1], limit=fl)
+    st.dataframe(df, width="stretch")
+    b1, b2, b3 = st.columns([1,1,4])
+    if b1.button("◀ Önceki", disabled=len(pages) == 1):
+        pages.pop(); st.rerun()
+    if b2.button("Sonraki ▶", disabled=nxt is None):
+        pages.append(nxt); st.rerun()
+    b3.caption(f"Sayfa {len(pages)}")
+    # Dosya sadece "İndir"e basılınca, defter parça parça okunarak oluşturulur
+    x1, x2 = st.columns([1,3])
+    xf = x1.selectbox("Biçim", ledger.available_formats(), key="fin_fmt", label_visibility="collapsed")
+    x2.download_button("⬇️ İndir", lambda: ledger.export(xf, fd1, fd2, fk), ledger.file_name(xf, fd1, fd2), ledger.FORMATS[xf][1], on_click="ignore", key="fin_dl")
+
+if tab == "odeme":
+    otab = nav({"aylik": "Aylık", "haftalik": "Haftalık", "parca": "Parça"}, "otab")
+    if otab == "aylik":
+        cm = payroll.month_key(datetime.now())
+        ps = [p for p in ld.staff('pro') if p['salary']>0]
+        paid = ld.paid_monthly.load(cm) or set()
+        if ps:
+            for p in ps:
+                c1,c2=st.columns([3,1])
+                c1.write(f"{p['name']} ({p['salary']} TL)")
+                if p['id'] in paid: c2.success("✅")
+                else:
+                    if c2.button("Öde", key=f"pm{p['id']}"):
+                        run_query("INSERT INTO salary_payments (pro_id,amount,payment_date,month_year,payment_type) VALUES (%s,%s,%s,%s,%s)",(p['id'],p['salary'],datetime.now().date(),cm,'monthly'), commit=True)
+                        st.rerun()
+    if otab == "haftalik":
+        today = datetime.now().date(); wk = payroll.week_key(today)
+        ps = [p for p in ld.staff('pro') if p['weekly_salary']>0]
+        paid = ld.paid_weekly.load(wk) or set()
+        st.caption(f"Hafta: {wk}")
+        if ps:
+            for p in ps:
+                c1,c2=st.columns([3,1])
+                c1.write(f"{p['name']} ({p['weekly_salary']} TL)")
+                if p['id'] in paid: c2.success("✅")
+                else:
+                    if c2.button("Öde", key=f"pw{p['id']}"):
+                        run_query("INSERT INTO salary_payments (pro_id,amount,payment_date,month_year,payment_type) VALUES (%s,%s,%s,%s,%s)",(p['id'],p['weekly_salary'],today,wk,'weekly'), commit=True)
+                        st.rerun()
+    with st.expander("⏳ Birikmiş Maaş Borçları"):
+        ar = payroll.arrears()
+        if ar:
+            st.dataframe(pd.DataFrame([{"Personel": r['name'], "Dönem": r['periods'], "En Eski": r['oldest'], "Borç": float(r['owed'])} for r in ar]),
+                         hide_index=True, width="stretch", column_config={"En Eski": st.column_config.DateColumn(format="DD.MM.YYYY")})
+            # Kaçırılan dönemler en eskiden başlayarak kapatılır
+            for r in sorted(payroll.oldest_unpaid(), key=lambda r: (r['name'], r['payment_type'])):
+                c1,c2=st.columns([3,1])
+                c1.write(f"{r['name']} · {r['period']} ({r['due'].strftime('%d.%m.%Y')}) · {float(r['owed']):,.0f} TL")
+                if c2.button("Öde", key=f"pa{r['pro_id']}{r['payment_type'][0]}"):
+                    run_query("INSERT INTO salary_payments (pro_id,amount,payment_date,month_year,payment_type) VALUES (%s,%s,%s,%s,%s)",(r['pro_id'],r['owed'],datetime.now().date(),r['period'],r['payment_type']), commit=True)
+                    st.rerun()
+        else: st.caption("Birikmiş borç yok")
+
+# --- SQL İZLEME PANELİ ---
+def render_sql_debug(trace):
+    df = pd.DataFrame([t for t in trace if t])
+    st.subheader("🔍 SQL İzleme")
+    if df.empty:
+        st.caption("Sorgu yok"); return
+    st.caption(f"{len(df)} sorgu | {df['ms'].sum():,.0f} ms | {df['error'].notna().sum()} hata")
+    top = df.groupby('sql').agg(adet=('ms', 'size'), toplam_ms=('ms', 'sum'), max_ms=('ms', 'max'), satir=('rows', 'sum'), yer=('site', 'first')).reset_index()
+    by = st.radio("Sırala", ["toplam_ms", "adet"], horizontal=True, key="sql_dbg_sort")
+    st.dataframe(top.sort_values(by, ascending=False).head(20)[['toplam_ms', 'adet', 'max_ms', 'satir', 'yer', 'sql']], hide_index=True)
+
+if sql_debug:
+    with st.sidebar: render_sql_debug(sql_trace)
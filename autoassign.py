@@ -0,0 +1,141 @@
+# --- TOPLU OTOMATİK ATAMA ---
+# Bir tarih aralığındaki OPEN işler için personel planı: her gün ayrı bir en düşük
+# maliyetli atama problemi (iş x personel; bir kişi aynı gün tek iş alır). Maliyet:
+#   ücret      parça başı ödenen tutar (maaşlı pro'ya ek ücret yok)
+#   süreklilik müşterinin son HISTORY_DAYS gündeki işlerini yapmış personel tercih edilir
+#   yük        aralıkta zaten çok işi olan personel az tercih edilir
+#   dolu gün   o gün başka işe atanmış personel atanamaz
+# Veri birkaç set sorgusuyla gelir; plan önizlenir, onaylanınca tek UPDATE ile yazılır.
+from datetime import timedelta
+
+import numpy as np
+
+from db import execute_values, run_query, transaction
+
+HISTORY_DAYS = 180
+CONTINUITY_BONUS = 300.0 # TL; CONTINUITY_CAP iş ve üstü tam bonus
+CONTINUITY_CAP = 5
+LOAD_PENALTY = 25.0 # TL; aralıktaki iş başına
+BLOCKED = 1e9
+
+COLUMN = {"student": "assigned_student_id", "pro": "assigned_pro_id"}
+
+
+def _hungarian(cost):
+    # Dikdörtgen atama (satır <= sütun), potansiyelli kısa yol yöntemi; satır -> sütun
+    n, m = cost.shape
+    a = np.zeros((n + 1, m + 1)); a[1:, 1:] = cost
+    u = np.zeros(n + 1); v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int); way = np.zeros(m + 1, dtype=int)
+    for i in range(1, n + 1):
+        p[0] = i; j0 = 0
+        minv = np.full(m + 1, np.inf); used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used; free[0] = False
+            cur = a[i0] - u[i0] - v
+            upd = free & (cur < minv)
+            minv[upd] = cur[upd]; way[upd] = j0
+            cand = np.where(free, minv, np.inf)
+            j1 = int(cand.argmin()); delta = cand[j1]
+            u[p[used]] += delta; v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if p[j0] == 0: break
+        while j0:
+            j1 = way[j0]; p[j0] = p[j1]; j0 = j1
+    out = np.full(n, -1)
+    for j in range(1, m + 1):
+        if p[j]: out[p[j] - 1] = j - 1
+    return out
+
+
+def solve(cost):
+    # [(satır, sütun)] en düşük toplam maliyetli eşleşme; scipy varsa onunla
+    if cost.size == 0: return []
+    try:
+        from scipy.optimize import linear_sum_assignment
+        r, c = linear_sum_assignment(cost)
+        return list(zip(r.tolist(), c.tolist()))
+    except ImportError:
+        pass
+    if cost.shape[0] <= cost.shape[1]:
+        return [(i, int(j)) for i, j in enumerate(_hungarian(cost))]
+    return [(int(i), j) for j, i in enumerate(_hungarian(cost.T))]
+
+
+def load(kind, d1, d2):
+    # Açık işler, personel, dolu günler, aralıktaki yük ve müşteri geçmişi (5 sorgu)
+    col = COLUMN[kind]
+    jobs = run_query(f"""SELECT j.id, j.date, j.customer_id, c.name AS customer, j.price_worker
+        FROM jobs j LEFT JOIN customers c ON c.id = j.customer_id
+        WHERE j.job_type=%s AND j.status='OPEN' AND j.{col} IS NULL AND j.date >= %s AND j.date <= %s
+        ORDER BY j.date, j.id""", (kind, d1, d2), fetch=True) or []
+    if kind == 'student':
+        staff = run_query("SELECT id, name, false AS salaried FROM students ORDER BY name", fetch=True) or []
+    else:
+        staff = run_query("SELECT id, name, (salary > 0 OR weekly_salary > 0) AS salaried FROM professionals ORDER BY name", fetch=True) or []
+    busy = run_query(f"SELECT date, {col} AS w, COUNT(*) AS n FROM jobs WHERE {col} IS NOT NULL AND date >= %s AND date <= %s GROUP BY 1, 2",
+                     (d1, d2), fetch=True) or []
+    custs = sorted({j['customer_id'] for j in jobs if j['customer_id'] is not None})
+    past = run_query(f"""SELECT customer_id, {col} AS w, COUNT(*) AS n FROM jobs
+        WHERE customer_id = ANY(%s) AND {col} IS NOT NULL AND date >= %s AND date < %s GROUP BY 1, 2""",
+                     (custs, d1 - timedelta(HISTORY_DAYS), d1), fetch=True) if custs else []
+    return jobs, staff, busy, past or []
+
+
+def plan(kind, d1, d2):
+    # (atamalar, atanamayan iş sayısı); atama: iş, gün, müşteri, personel, yeni ücret, süreklilik
+    jobs, staff, busy, past = load(kind, d1, d2)
+    if not jobs or not staff: return [], len(jobs)
+    widx = {s['id']: k for k, s in enumerate(staff)}
+    salaried = np.array([bool(s['salaried']) for s in staff])
+    load_n = np.zeros(len(staff))
+    booked = {}
+    for r in busy:
+        if r['w'] in widx:
+            load_n[widx[r['w']]] += r['n']
+            booked.setdefault(r['date'], set()).add(widx[r['w']])
+    hist = {}
+    for r in past:
+        if r['w'] in widx: hist.setdefault(r['customer_id'], {})[widx[r['w']]] = r['n']
+
+    out, left = [], 0
+    by_day = {}
+    for j in jobs: by_day.setdefault(j['date'], []).append(j)
+    for day in sorted(by_day):
+        dj = by_day[day]
+        price = np.array([float(j['price_worker'] or 0) for j in dj])
+        cont = np.zeros((len(dj), len(staff)))
+        for i, j in enumerate(dj):
+            for w, n in hist.get(j['customer_id'], {}).items(): cont[i, w] = min(n, CONTINUITY_CAP)
+        cost = np.where(salaried, 0.0, price[:, None]) - CONTINUITY_BONUS * cont / CONTINUITY_CAP + LOAD_PENALTY * load_n
+        if day in booked: cost[:, list(booked[day])] = BLOCKED
+        pairs = [(i, w) for i, w in solve(cost) if cost[i, w] < BLOCKED]
+        left += len(dj) - len(pairs)
+        for i, w in pairs:
+            # Sonraki günlerde yük dengesi için
+            load_n[w] += 1
+            j = dj[i]
+            out.append({
+                "id": j['id'], "date": day, "customer": j['customer'], "worker_id": staff[w]['id'], "worker": staff[w]['name'],
+                "price_worker": 0.0 if salaried[w] else float(j['price_worker'] or 0), "continuity": int(cont[i, w]),
+                "cost": round(float(cost[i, w]), 2),
+            })
+    out.sort(key=lambda r: (r['date'], r['id']))
+    return out, left
+
+
+def commit(kind, assignments):
+    # Tek transaction, tek UPDATE. Önizlemeden sonra elle atanan iş ya da o gün dolan personel atlanır.
+    if not assignments: return 0
+    col = COLUMN[kind]
+    rows = [(a['id'], a['worker_id'], a['price_worker']) for a in assignments]
+    with transaction(writes=["jobs"]) as c:
+        execute_values(c, f"""UPDATE jobs AS j SET {col} = v.w, status = 'ASSIGNED', price_worker = v.price
+            FROM (VALUES %s) AS v(id, w, price)
+            WHERE j.id = v.id AND j.status = 'OPEN' AND j.{col} IS NULL
+              AND NOT EXISTS (SELECT 1 FROM jobs o WHERE o.{col} = v.w AND o.date = j.date AND o.id <> j.id)""",
+                       rows, template="(%s::int, %s::int, %s::real)", page_size=len(rows))
+        return c.rowcount
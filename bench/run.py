@@ -0,0 +1,243 @@
+# --- RERUN GECİKMESİ BENCHMARK'I ---
+# app.py'yi Streamlit AppTest ile başsız çalıştırır; her sekme / etkileşim için ölçülen
+# rerun'un süresi, sorgu sayısı ve bellek tepe değeri kaydedilir.
+#   soğuk: süreç önbellekleri boşken, ılık: önbellekler doluyken yeni bir oturum
+# Sonuçlar JSON; --baseline ile kayıtlı bir sonuçla karşılaştırılır, gerileme varsa çıkış kodu 1.
+# Veri için önce bench/seed.py çalıştırılır. Kullanım:
+#   python bench/run.py --dsn postgresql://localhost/vt_bench --save-baseline
+#   python bench/run.py --dsn postgresql://localhost/vt_bench --baseline bench/baseline.json
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP = os.path.join(ROOT, "app.py")
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUT = os.path.join(HERE, "results", "latest.json")
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+TABLES = ["customers", "students", "professionals", "jobs", "transactions", "salary_payments", "daily_notes"]
+# Gerileme: süre/bellek tolerans oranını VE mutlak eşiği aşarsa; sorgu sayısı artarsa
+MIN_MS = 25
+MIN_MB = 2
+
+
+# --- SENARYOLAR ---
+# (ad, URL parametreleri, hazırlık, ölçülen adım); adımlar AppTest'i değiştirip çalıştırır
+class Skip(Exception):
+    # Hazırlık veride karşılığı olmayan bir durum gerektiriyor; senaryo ölçülmez
+    pass
+
+def _run(at): at.run()
+def _day(db_type): return lambda at: at.button(key=f"b{db_type}{date.today()}").click().run()
+def _toggle(key): return lambda at: at.toggle(key=key).set_value(True).run()
+def _radio(key, value): return lambda at: at.radio(key=key).set_value(value).run()
+def _first(key): return lambda at: at.selectbox(key=key).set_value(at.selectbox(key=key).options[1]).run()
+def _click(key): return lambda at: at.button(key=key).click().run()
+def _prev_month(at):
+    ay = at.sidebar.selectbox[1]
+    ay.set_value((ay.value - 2) % 12 + 1).run()
+def _steps(*fns): return lambda at: [f(at) for f in fns]
+def _busiest(at):
+    # Geçmişi birden fazla sayfa olan müşteriyi ara + seç; yoksa senaryo atlanır
+    from db import run_query
+    from history import PAGE_SIZE
+    r = run_query("""SELECT c.id, c.name FROM jobs j JOIN customers c ON c.id = j.customer_id
+        GROUP BY c.id HAVING COUNT(*) > %s ORDER BY COUNT(*) DESC, c.id LIMIT 1""", (PAGE_SIZE,), fetch=True)
+    if not r: raise Skip("geçmişi tek sayfadan uzun müşteri yok")
+    at.text_input(key="sct_q").input(r[0]['name']).run()
+    at.selectbox(key="sct").set_value(r[0]['id']).run()
+    if at.button(key="hist_customer_next").disabled: raise Skip("sonraki sayfa düğmesi kapalı")
+
+
+SCENARIOS = [
+    ("plan", {"tab": "plan"}, None, _run),
+    ("sidebar_ay", {"tab": "plan"}, _run, _prev_month),
+    ("ogrenci", {"tab": "ogrenci"}, None, _run),
+    ("ogrenci_gun", {"tab": "ogrenci"}, _run, _day("student")),
+    ("ogrenci_toplu", {"tab": "ogrenci"}, _run, _toggle("bulkstudent")),
+    ("pro", {"tab": "pro"}, None, _run),
+    ("pro_gun", {"tab": "pro"}, _run, _day("pro")),
+    ("profil_musteri", {"tab": "profil", "ptab": "musteri"}, _run, _first("sct")),
+    ("profil_musteri_sonraki", {"tab": "profil", "ptab": "musteri"}, _steps(_run, _busiest), _click("hist_customer_next")),
+    ("profil_ogrenci", {"tab": "profil", "ptab": "ogrenci"}, _run, _first("sst")),
+    ("profil_pro", {"tab": "profil", "ptab": "pro", "prtab": "maasli"}, _run, _first("spt1")),
+    ("finans_defter", {"tab": "finans", "ftab": "defter"}, None, _run),
+    ("finans_trend", {"tab": "finans", "ftab": "trend"}, None, _run),
+    ("finans_trend_musteri", {"tab": "finans", "ftab": "trend"}, _run, _radio("tr_by", "Müşteri")),
+    ("odeme_aylik", {"tab": "odeme", "otab": "aylik"}, None, _run),
+    ("odeme_haftalik", {"tab": "odeme", "otab": "haftalik"}, None, _run),
+]
+
+
+class QueryCounter:
+    # db.record her execute / COPY'de çağrılır (iz açık olmasa da)
+    def __init__(self, db):
+        self.db, self.n, self._lock = db, 0, threading.Lock()
+        self._orig = db.record
+
+    def __enter__(self):
+        def counted(*a, **kw):
+            with self._lock: self.n += 1
+            return self._orig(*a, **kw)
+        self.db.record = counted
+        return self
+
+    def __exit__(self, *exc):
+        self.db.record = self._orig
+
+    def reset(self):
+        with self._lock: self.n = 0
+
+
+def _app(params, timeout):
+    from streamlit import logger
+    from streamlit.testing.v1 import AppTest
+    logger.set_log_level("error")
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    for k, v in params.items(): at.query_params[k] = v
+    return at
+
+
+def _drop_caches():
+    import cache
+    for c in cache.ALL: c.drop()
+
+
+def measure(scenario, counter, timeout, cold, memory=False):
+    # Yeni oturum + hazırlık; sadece son adım ölçülür
+    name, params, setup, action = scenario
+    at = _app(params, timeout)
+    if setup: setup(at)
+    if cold: _drop_caches()
+    counter.reset()
+    if memory: tracemalloc.start()
+    t0 = time.perf_counter()
+    action(at)
+    ms = (time.perf_counter() - t0) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 2**20 if memory else None
+    if memory: tracemalloc.stop()
+    errs = [e.message for e in at.exception] + [e.value for e in at.error]
+    if errs: raise RuntimeError(f"{name}: {errs[0]}")
+    return ms, counter.n, peak
+
+
+def run(scenarios, repeat, timeout, log=print):
+    import db
+    out = {}
+    with QueryCounter(db) as counter:
+        # Isınma: modül importları, bağlantı havuzu, göç kontrolü, dinleyici
+        _app({}, timeout).run()
+        for sc in scenarios:
+            cold, warm = [], []
+            try:
+                for _ in range(repeat):
+                    cold.append(measure(sc, counter, timeout, cold=True))
+                    warm.append(measure(sc, counter, timeout, cold=False))
+            except Skip as e:
+                log(f"{sc[0]:<24} atlandı: {e}")
+                continue
+            _, _, peak = measure(sc, counter, timeout, cold=True, memory=True)
+            r = {
+                "cold_ms": round(statistics.median(x[0] for x in cold), 1),
+                "warm_ms": round(statistics.median(x[0] for x in warm), 1),
+                "cold_queries": max(x[1] for x in cold),
+                "warm_queries": max(x[1] for x in warm),
+                "peak_mb": round(peak, 2),
+            }
+            out[sc[0]] = r
+            log(f"{sc[0]:<24} soğuk {r['cold_ms']:>8.1f} ms {r['cold_queries']:>4} sorgu | ılık {r['warm_ms']:>8.1f} ms {r['warm_queries']:>4} sorgu | {r['peak_mb']:>7.2f} MB")
+    return out
+
+
+def _git_rev():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def meta(repeat):
+    import streamlit
+    from db import run_query
+    counts = run_query(" UNION ALL ".join(f"SELECT '{t}' AS t, COUNT(*) AS n FROM {t}" for t in TABLES), fetch=True)
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "git": _git_rev(),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "postgres": run_query("SHOW server_version", fetch=True)[0]['server_version'],
+        "machine": platform.node(),
+        "repeat": repeat,
+        "rows": {r['t']: r['n'] for r in counts},
+    }
+
+
+def compare(result, baseline, tolerance):
+    # [(senaryo, ölçü, taban, şimdi)] gerilemeler
+    worse = []
+    for name, r in result["scenarios"].items():
+        b = baseline["scenarios"].get(name)
+        if not b: continue
+        for k in ("cold_ms", "warm_ms"):
+            if r[k] > b[k] * (1 + tolerance) and r[k] - b[k] >= MIN_MS: worse.append((name, k, b[k], r[k]))
+        for k in ("cold_queries", "warm_queries"):
+            if r[k] > b[k]: worse.append((name, k, b[k], r[k]))
+        if r["peak_mb"] > b["peak_mb"] * (1 + tolerance) and r["peak_mb"] - b["peak_mb"] >= MIN_MB:
+            worse.append((name, "peak_mb", b["peak_mb"], r["peak_mb"]))
+    return worse
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f: json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Sayfa rerun gecikmesini ölçer ve kayıtlı sonuçla karşılaştırır.")
+    ap.add_argument("--dsn", help="Yoksa DATABASE_URL / secrets kullanılır")
+    ap.add_argument("--only", nargs="*", help="Sadece bu senaryolar")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=120, help="Tek rerun için en fazla (sn)")
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    ap.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, help="Karşılaştırılacak sonuç dosyası")
+    ap.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="Sonucu taban olarak da kaydet")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="Süre / bellek için izin verilen artış oranı")
+    args = ap.parse_args(argv)
+
+    if args.dsn: os.environ["DATABASE_URL"] = args.dsn
+    scenarios = [s for s in SCENARIOS if not args.only or s[0] in args.only]
+    if not scenarios: raise SystemExit(f"Senaryo yok; seçenekler: {', '.join(s[0] for s in SCENARIOS)}")
+
+    scen = run(scenarios, args.repeat, args.timeout)
+    result = {"meta": meta(args.repeat), "scenarios": scen}
+    _write(args.out, result)
+    print(f"Sonuç: {args.out}")
+    if args.save_baseline:
+        _write(args.save_baseline, result)
+        print(f"Taban: {args.save_baseline}")
+
+    if args.baseline and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f: base = json.load(f)
+        if base["meta"].get("rows") != result["meta"]["rows"]:
+            print("Uyarı: taban farklı veri hacmiyle ölçülmüş", base["meta"].get("rows"))
+        worse = compare(result, base, args.tolerance)
+        for name, k, b, r in worse: print(f"GERİLEME {name} {k}: {b} -> {r}")
+        if worse: return 1
+        print(f"Gerileme yok (taban: {base['meta'].get('git')}, {base['meta'].get('time')})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
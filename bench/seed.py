@@ -0,0 +1,168 @@
+# --- BENCHMARK VERİSİ ---
+# Boş (ya da --reset ile boşaltılan) yerel bir PostgreSQL'i gerçekçi hacimde sentetik
+# veriyle doldurur. Aynı --seed aynı veriyi üretir. Üretim veritabanında ÇALIŞTIRMAYIN.
+# Kullanım:
+#   python bench/seed.py --dsn postgresql://localhost/vt_bench --reset
+#   python bench/seed.py --customers 1000 --staff 200 --jobs 500000 --years 5
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from db import conn_kwargs, copy_csv  # noqa: E402
+from migrate import migrate  # noqa: E402
+import rollup  # noqa: E402
+
+TABLES = ["customers", "students", "professionals", "jobs", "transactions", "salary_payments", "daily_notes", "recurrence_rules"]
+
+
+def _copy(cur, table, df):
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False, date_format="%Y-%m-%d")
+    buf.seek(0)
+    copy_csv(cur, table, list(df.columns), buf)
+
+
+def _phones(rng, n):
+    return pd.Series(rng.integers(5_000_000_000, 5_599_999_999, n)).astype(str).radd("0")
+
+
+def _ids(rng, n, mask):
+    # mask olan satırlarda 1..n arası id, diğerleri NULL
+    return pd.Series(rng.integers(1, n + 1, len(mask)), dtype="Int64").where(mask)
+
+
+def generate(n_customers=1000, n_staff=200, n_jobs=500_000, years=5, seed=42, today=None):
+    # {tablo: DataFrame}; id'ler 1..n sırayla (tablolar boşken RESTART IDENTITY ile uyumlu)
+    rng = np.random.default_rng(seed)
+    today = today or date.today()
+    start = date(today.year - years, today.month, 1)
+    end = today + timedelta(days=60)
+    out = {}
+
+    districts = np.array(["Kadıköy", "Beşiktaş", "Şişli", "Üsküdar", "Ataşehir", "Bakırköy", "Sarıyer", "Maltepe", "Kartal", "Beylikdüzü"])
+    out["customers"] = pd.DataFrame({
+        "name": [f"Müşteri {i:05d}" for i in range(1, n_customers + 1)],
+        "phone": _phones(rng, n_customers),
+        "location": districts[rng.integers(0, len(districts), n_customers)] + " " + pd.Series(rng.integers(1, 200, n_customers)).astype(str),
+    })
+
+    n_students = int(n_staff * 0.6); n_pros = n_staff - n_students
+    out["students"] = pd.DataFrame({"name": [f"Öğrenci {i:04d}" for i in range(1, n_students + 1)], "phone": _phones(rng, n_students)})
+    # Pro'ların ~%15'i aylık, ~%10'u haftalık maaşlı, kalanı parça başı
+    kind = rng.choice(["monthly", "weekly", "piece"], n_pros, p=[0.15, 0.10, 0.75])
+    out["professionals"] = pd.DataFrame({
+        "name": [f"Pro {i:04d}" for i in range(1, n_pros + 1)],
+        "phone": _phones(rng, n_pros),
+        "salary": np.where(kind == "monthly", rng.integers(20, 45, n_pros) * 1000, 0),
+        "weekly_salary": np.where(kind == "weekly", rng.integers(4, 10, n_pros) * 500, 0),
+        "payment_day": rng.integers(1, 29, n_pros),
+        "pay_start": start,
+    })
+
+    # İşler: hafta içi her gün ~aynı yoğunluk, hafta sonu daha az; grup = müşteri + hafta
+    days = pd.date_range(start, end, freq="D")
+    w = np.where(days.weekday >= 5, 0.4, 1.0); w = w / w.sum()
+    d = np.sort(rng.choice(days.values, n_jobs, p=w))
+    is_student = rng.random(n_jobs) < 0.7
+    past = d < np.datetime64(today)
+    assigned = past & (rng.random(n_jobs) < 0.95) | (~past & (rng.random(n_jobs) < 0.4))
+    cust = rng.integers(1, n_customers + 1, n_jobs)
+    wage = np.where(is_student, rng.integers(4, 9, n_jobs) * 100, rng.integers(8, 16, n_jobs) * 100).astype(float)
+    is_prepaid = (rng.random(n_jobs) < 0.2).astype(int)
+    out["jobs"] = pd.DataFrame({
+        "group_id": "b" + pd.Series(cust).astype(str) + "-" + pd.Series(pd.DatetimeIndex(d).strftime("%G%V")),
+        "date": d,
+        "customer_id": cust,
+        "job_type": np.where(is_student, "student", "pro"),
+        "status": np.where(assigned, "ASSIGNED", "OPEN"),
+        "assigned_student_id": _ids(rng, n_students, assigned & is_student),
+        "assigned_pro_id": _ids(rng, n_pros, assigned & ~is_student),
+        "price_worker": wage,
+        "price_customer": np.round(wage * rng.uniform(1.5, 2.5, n_jobs), -1),
+        "is_worker_paid": (past & assigned & (rng.random(n_jobs) < 0.92)).astype(int),
+        "is_collected": np.maximum(is_prepaid, (past & (rng.random(n_jobs) < 0.85)).astype(int)),
+        "is_prepaid": is_prepaid,
+    })
+
+    # Manuel gelir/gider: günde ~3
+    n_tx = len(days) * 3
+    is_inc = rng.random(n_tx) < 0.35
+    out["transactions"] = pd.DataFrame({
+        "date": np.sort(rng.choice(days.values, n_tx)),
+        "type": np.where(is_inc, "income", "expense"),
+        "category": "extra",
+        "amount": rng.integers(1, 60, n_tx) * 50.0,
+        "description": np.where(is_inc, "Ek gelir", rng.choice(["Yakıt", "Malzeme", "Yemek", "Kira", "Fatura"], n_tx)),
+    })
+
+    # Maaş ödemeleri: vadesi geçmiş dönemlerin ~%95'i ödenmiş
+    pros = out["professionals"].assign(id=np.arange(1, n_pros + 1))
+    pays = []
+    months = pd.date_range(start, today, freq="MS")
+    for p in pros[pros["salary"] > 0].itertuples():
+        due = months + pd.to_timedelta(p.payment_day - 1, unit="D")
+        due = due[(due <= pd.Timestamp(today)) & (rng.random(len(due)) < 0.95)]
+        pays.append(pd.DataFrame({"pro_id": p.id, "amount": float(p.salary), "payment_date": due.date, "month_year": due.strftime("%m-%Y"), "payment_type": "monthly"}))
+    mondays = pd.date_range(start, today, freq="W-MON")
+    iso = mondays.isocalendar()
+    wkeys = "W" + iso["week"].astype(str) + "-" + iso["year"].astype(str)
+    for p in pros[pros["weekly_salary"] > 0].itertuples():
+        keep = rng.random(len(mondays)) < 0.95
+        pays.append(pd.DataFrame({"pro_id": p.id, "amount": float(p.weekly_salary), "payment_date": mondays[keep].date, "month_year": wkeys[keep].values, "payment_type": "weekly"}))
+    out["salary_payments"] = pd.concat(pays, ignore_index=True) if pays else pd.DataFrame(columns=["pro_id", "amount", "payment_date", "month_year", "payment_type"])
+
+    nd = days[rng.random(len(days)) < 0.3]
+    out["daily_notes"] = pd.DataFrame({"date": nd.date, "note": "Not " + pd.Series(nd.strftime("%d.%m")).values})
+    return out
+
+
+def seed(conn, data, reset=False, log=print):
+    with conn.cursor() as cur:
+        if reset: cur.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY")
+        else:
+            cur.execute("SELECT EXISTS (SELECT 1 FROM jobs) OR EXISTS (SELECT 1 FROM customers) AS x")
+            if cur.fetchone()['x']: raise SystemExit("Veritabanı boş değil (--reset ile boşaltın)")
+        for t in ["customers", "students", "professionals", "jobs", "transactions", "salary_payments", "daily_notes"]:
+            t0 = time.perf_counter()
+            _copy(cur, t, data[t])
+            log(f"{t}: {len(data[t]):,} satır ({time.perf_counter() - t0:.1f} sn)")
+        # TRUNCATE özet tetikleyicisini çalıştırmaz; toplu yükleme sonrası baştan kur
+        rollup.rebuild(cur)
+        cur.execute("ANALYZE")
+    conn.commit()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark için sentetik veri üretir ve yükler.")
+    ap.add_argument("--dsn")
+    ap.add_argument("--customers", type=int, default=1000)
+    ap.add_argument("--staff", type=int, default=200)
+    ap.add_argument("--jobs", type=int, default=500_000)
+    ap.add_argument("--years", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--reset", action="store_true", help="Tabloları önce boşalt")
+    args = ap.parse_args(argv)
+
+    data = generate(args.customers, args.staff, args.jobs, args.years, args.seed)
+    conn = psycopg2.connect(cursor_factory=RealDictCursor, **conn_kwargs(args.dsn))
+    try:
+        migrate(conn, log=lambda m: None)
+        seed(conn, data, reset=args.reset)
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# --- SÜREÇ ÖNBELLEKLERİ ---
+# Tüm oturumların ortak kullandığı, anahtar bazında geçersizleşen önbellekler.
+# Yazma yollarındaki on_write bildirimi ilgili anahtarları düşürür. Diğer süreçlerin
+# yazmaları NOTIFY dinleyicisiyle (changes.py) gelir; dinleyici çalışırken TTL uzatılır,
+# TTL sadece bildirimi kaçan değişiklikler için emniyettir.
+# Okuma sürerken gelen drop() o okumanın sonucunu bayat yapar: okuyan sorgudan önce gen()
+# alır, put() arada drop() olduysa değeri saklamaz.
+import threading
+import time
+
+
+class KeyedCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = {}
+        self._gen = 0
+
+    def gen(self):
+        with self._lock:
+            return self._gen
+
+    def get(self, key, default=None):
+        with self._lock:
+            hit = self._data.get(key)
+        if hit is None or time.time() - hit[0] >= self.ttl: return default
+        return hit[1]
+
+    def get_many(self, keys):
+        now = time.time()
+        with self._lock:
+            return {k: self._data[k][1] for k in keys if k in self._data and now - self._data[k][0] < self.ttl}
+
+    def put(self, key, value, gen=None):
+        # gen: okumadan önce alınan gen(); o zamandan beri drop() olduysa saklama
+        with self._lock:
+            if gen is not None and gen != self._gen: return
+            self._data[key] = (time.time(), value)
+
+    def drop(self, pred=None):
+        # pred(anahtar) True olanları sil; pred yoksa hepsini
+        with self._lock:
+            self._gen += 1
+            if pred is None: self._data.clear()
+            else:
+                for k in [k for k in self._data if pred(k)]: del self._data[k]
+
+
+SHORT_TTL = 600
+LONG_TTL = 6 * 3600 # değişiklik dinleyicisi çalışırken
+
+pnl = KeyedCache(ttl=SHORT_TTL) # (yıl, ay) -> (gelir, gider)
+month_jobs = KeyedCache(ttl=SHORT_TTL) # (iş tipi, yıl, ay) -> o ayın iş satırları
+totals = KeyedCache(ttl=SHORT_TTL) # 'all' -> kasa / alacak / parça başı borç
+trends = KeyedCache(ttl=SHORT_TTL) # (başlangıç, bitiş) -> aylık trend satırları; 'years' -> verideki yıllar
+ALL = [pnl, month_jobs, totals, trends]
+
+
+def set_ttl(ttl):
+    for c in ALL: c.ttl = ttl
@@ -0,0 +1,115 @@
+# --- OTURUMLAR ARASI DEĞİŞİKLİK BİLDİRİMİ (LISTEN/NOTIFY) ---
+# Tetikleyiciler her yazma komutundan sonra CHANNEL kanalına {"t": tablo, "d1", "d2"}
+# (etkilenen tarih aralığı, tarih kolonu yoksa boş) gönderir; commit'te teslim edilir.
+# Süreç başına bir dinleyici thread bildirimleri notify_write(tablolar, aralık) ile
+# önbelleklere iletir. Başka süreçlerin / oturumların yazmaları da böylece görünür.
+# Tetikleyiciler migrations/0008_change_notify.sql'de; SOURCES'a tablo eklenirse
+# tetikleyicisi yeni bir göçle kurulmalı.
+import json
+import select
+import threading
+import time
+from datetime import date
+
+import psycopg2
+
+from db import conn_kwargs, log_event, notify_write
+
+CHANNEL = "vt_changes"
+# Tetikleyicisi olan tablolar -> tarih kolonu (None: kapsam tüm tablo)
+SOURCES = {
+    "jobs": "date",
+    "transactions": "date",
+    "salary_payments": "payment_date",
+    "customers": None,
+    "professionals": None,
+}
+POLL_SECONDS = 30
+RETRY_DELAYS = (1, 2, 5, 10, 30)
+
+_listener = None
+_start_lock = threading.Lock()
+
+
+def parse(payload):
+    # (tablo, (ilk, son) ya da None)
+    m = json.loads(payload)
+    span = (date.fromisoformat(m['d1']), date.fromisoformat(m['d2'])) if m.get('d1') else None
+    return m['t'], span
+
+
+def merge(events):
+    # Aynı tablonun aralıklarını birleştir; kapsamsız bildirim tüm tabloyu kapsar
+    out = {}
+    for t, span in events:
+        if t in out and (out[t] is None or span is None): out[t] = None
+        elif t in out: out[t] = (min(out[t][0], span[0]), max(out[t][1], span[1]))
+        else: out[t] = span
+    return out
+
+
+class Listener(threading.Thread):
+    def __init__(self):
+        super().__init__(name="vt-changes", daemon=True)
+        self.connected = threading.Event()
+        self._halt = threading.Event()
+
+    def stop(self):
+        self._halt.set()
+
+    def _connect(self):
+        conn = psycopg2.connect(**conn_kwargs())
+        conn.autocommit = True
+        with conn.cursor() as cur: cur.execute(f"LISTEN {CHANNEL}")
+        return conn
+
+    def _dispatch(self, events):
+        for t, span in merge(events).items():
+            try:
+                notify_write([t], span)
+            except Exception as e:
+                log_event(event="notify_error", table=t, error=str(e).strip())
+
+    def _listen(self, conn):
+        while not self._halt.is_set():
+            if select.select([conn], [], [], POLL_SECONDS) == ([], [], []):
+                # Sessiz bağlantı: kopmuş mu?
+                with conn.cursor() as cur: cur.execute("SELECT 1")
+                continue
+            conn.poll()
+            events = []
+            while conn.notifies:
+                n = conn.notifies.pop(0)
+                try: events.append(parse(n.payload))
+                except (ValueError, KeyError) as e: log_event(event="notify_error", payload=n.payload, error=str(e))
+            if events: self._dispatch(events)
+
+    def run(self):
+        attempt = 0
+        while not self._halt.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                if attempt:
+                    # Kopukken kaçan bildirimler bilinemez: her şeyi düşür
+                    self._dispatch([(t, None) for t in SOURCES])
+                attempt = 0
+                self.connected.set()
+                self._listen(conn)
+            except Exception as e:
+                self.connected.clear()
+                log_event(event="listener_error", error=str(e).strip())
+                time.sleep(RETRY_DELAYS[min(attempt, len(RETRY_DELAYS) - 1)])
+                attempt += 1
+            finally:
+                if conn is not None and not conn.closed: conn.close()
+
+
+def start_listener(wait=5):
+    # Süreç başına bir dinleyici; bağlandıysa True
+    global _listener
+    with _start_lock:
+        if _listener is not None and _listener.is_alive(): return _listener.connected.is_set()
+        _listener = Listener()
+        _listener.start()
+    return _listener.connected.wait(wait)
@@ -0,0 +1,355 @@
+# --- VERİTABANI KATMANI (BAĞLANTI HAVUZU) ---
+# Her sorgu havuzdan kendi bağlantısını alır; hata sadece o bağlantıyı geri sarar.
+# Ayarlar: DATABASE_URL / DB_POOL_MIN / DB_POOL_MAX ortam değişkenleri
+# ya da .streamlit/secrets.toml [supabase] (host, dbname, user, password, port, sslmode, pool_min, pool_max,
+# slow_query_ms, slow_query_log, parallel_workers)
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+import psycopg2
+from psycopg2 import extras as pg_extras
+from psycopg2 import pool as pg_pool
+from psycopg2.extras import RealDictCursor
+
+RETRY_DELAYS = (0.5, 1, 2, 4) # Yeniden bağlanma bekleme süreleri (sn)
+HEALTH_IDLE = 30 # Bu kadar boşta kalan bağlantı kullanılmadan önce yoklanır (sn)
+CHECKOUT_TIMEOUT = 30 # Havuz doluysa en fazla bu kadar beklenir (sn)
+WRITE_RE = re.compile(r"^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+(\w+)", re.IGNORECASE)
+
+_pool = None
+_pool_lock = threading.Lock()
+_write_listeners = {}
+_tls = threading.local()
+_log = None
+_executor = None
+_log_lock = threading.Lock()
+_slow_ms = None
+
+
+def _secrets():
+    try:
+        import streamlit as st
+        return dict(st.secrets["supabase"])
+    except Exception:
+        return {}
+
+
+def setting(name, default=None):
+    env = os.environ.get(f"DB_{name.upper()}")
+    if env is not None: return env
+    return _secrets().get(name, default)
+
+
+def conn_kwargs(dsn=None):
+    dsn = dsn or os.environ.get("DATABASE_URL")
+    if dsn: return {"dsn": dsn}
+    s = _secrets()
+    if not s: raise RuntimeError("Veritabanı ayarı yok: DATABASE_URL ya da secrets [supabase] gerekli")
+    return dict(
+        host=s["host"], database=s["dbname"], user=s["user"], password=s["password"], port=s["port"],
+        sslmode=s.get("sslmode", "require"),
+        connect_timeout=10, # 10 saniye bekleme süresi
+        keepalives=1
+    )
+
+
+def with_retry(fn, delays=RETRY_DELAYS):
+    # Bağlantı hatalarında artan beklemeyle tekrar dene
+    for d in tuple(delays) + (None,):
+        try:
+            return fn()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            if d is None: raise
+            time.sleep(d)
+
+
+# --- SORGU İZLEME ---
+# Her rerun kendi izini başlatır (start_trace); cursor her execute'u ona yazar.
+# Eşiği aşan sorgular ve hatalar JSON satırı olarak log dosyasına gider.
+def _logger():
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                lg = logging.getLogger("vardiya.sql")
+                lg.setLevel(logging.INFO); lg.propagate = False
+                h = logging.FileHandler(setting("slow_query_log", "slow_queries.log"), encoding="utf-8")
+                h.setFormatter(logging.Formatter("%(message)s"))
+                lg.addHandler(h)
+                _log = lg
+    return _log
+
+
+def log_event(**kw):
+    kw = {"ts": datetime.now().isoformat(timespec="milliseconds"), **kw}
+    try: _logger().info(json.dumps(kw, default=str, ensure_ascii=False))
+    except OSError: pass
+
+
+def start_trace():
+    _tls.trace = []
+    return _tls.trace
+
+
+def current_trace():
+    return getattr(_tls, "trace", None)
+
+
+def use_trace(trace):
+    # Başka thread'de çalışan sorguları aynı ize bağlamak için
+    _tls.trace = trace
+
+
+def _sql_text(q):
+    if isinstance(q, bytes): q = q.decode("utf-8", "replace")
+    return " ".join(str(q).split())
+
+
+def _shape(v):
+    if isinstance(v, (list, tuple)): return f"list[{len(v)}]"
+    return type(v).__name__
+
+
+def params_shape(p):
+    if p is None: return ""
+    if isinstance(p, dict): return "{" + ", ".join(f"{k}: {_shape(v)}" for k, v in p.items()) + "}"
+    return "(" + ", ".join(_shape(v) for v in p) + ")"
+
+
+_SKIP = (os.path.abspath(__file__), os.sep + "psycopg2" + os.sep, os.sep + "contextlib.py", os.sep + "threading.py", os.sep + "concurrent" + os.sep)
+
+def call_site():
+    # db.py / kütüphane dışındaki ilk çağıran satır
+    f = sys._getframe(1)
+    while f is not None:
+        fn = f.f_code.co_filename
+        if not any(x in fn for x in _SKIP):
+            return f"{os.path.basename(fn)}:{f.f_lineno} ({f.f_code.co_name})"
+        f = f.f_back
+    return "?"
+
+
+def slow_ms():
+    global _slow_ms
+    if _slow_ms is None: _slow_ms = float(setting("slow_query_ms", 500))
+    return _slow_ms
+
+
+def record(sql, params, seconds, rows, error=None):
+    ms = seconds * 1000
+    trace = current_trace(); slow = ms >= slow_ms()
+    if trace is None and not slow: return
+    entry = {"sql": _sql_text(sql), "site": call_site(), "params": params_shape(params),
+             "ms": round(ms, 2), "rows": rows, "error": str(error).strip() if error else None}
+    if trace is not None: trace.append(entry)
+    if slow: log_event(event="slow_query", **entry)
+
+
+class TracedCursor(RealDictCursor):
+    # execute_values gibi sayfalı yazımlarda şablon SQL trace_sql ile verilir
+    trace_sql = None
+    trace_params = None
+
+    def execute(self, query, vars=None):
+        t0 = time.perf_counter(); err = None
+        try:
+            return super().execute(query, vars)
+        except Exception as e:
+            err = e
+            raise
+        finally:
+            if self.trace_sql is None: record(query, vars, time.perf_counter() - t0, self.rowcount, err)
+            else: record(self.trace_sql, self.trace_params, time.perf_counter() - t0, self.rowcount, err)
+
+
+def execute_values(cur, sql, argslist, template=None, page_size=100, fetch=False):
+    # psycopg2.extras.execute_values + izleme (her sayfa şablon SQL ile kaydedilir)
+    cur.trace_sql, cur.trace_params = sql, (argslist,)
+    try:
+        return pg_extras.execute_values(cur, sql, argslist, template=template, page_size=page_size, fetch=fetch)
+    finally:
+        cur.trace_sql = cur.trace_params = None
+
+
+def copy_csv(cur, table, columns, buf):
+    # COPY FROM STDIN (CSV) + izleme
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    t0 = time.perf_counter(); err = None
+    try:
+        cur.copy_expert(sql, buf)
+    except Exception as e:
+        err = e
+        raise
+    finally:
+        record(sql, None, time.perf_counter() - t0, cur.rowcount, err)
+
+
+class _ThreadedPool(pg_pool.ThreadedConnectionPool):
+    # Açılan her bağlantıyı on_connect'e bildirir (havuz ilk açılışı dahil)
+    def __init__(self, on_connect, *args, **kwargs):
+        self._on_connect = on_connect
+        super().__init__(*args, **kwargs)
+
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        self._on_connect(conn)
+        return conn
+
+
+class ConnectionPool:
+    # ThreadedConnectionPool dolunca hata verir; semafor ile sıra bekletilir
+    def __init__(self, minconn, maxconn, **kwargs):
+        self._last_used = {}
+        self._pool = _ThreadedPool(self._touch, minconn, maxconn, cursor_factory=TracedCursor, **kwargs)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self.maxconn = maxconn
+
+    def _touch(self, conn):
+        # Yeni bağlantı HEALTH_IDLE dolana kadar yoklanmaz
+        self._last_used[id(conn)] = time.monotonic()
+
+    def _alive(self, conn):
+        # İzlenmeyen düz cursor: yoklama sorgu izine / sayacına girmez
+        try:
+            with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as c: c.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+
+    def getconn(self, timeout=CHECKOUT_TIMEOUT):
+        if not self._slots.acquire(timeout=timeout):
+            raise pg_pool.PoolError("Bağlantı havuzu dolu")
+        try:
+            conn = self._pool.getconn()
+            idle = time.monotonic() - self._last_used.get(id(conn), 0)
+            if conn.closed or (idle > HEALTH_IDLE and not self._alive(conn)):
+                # Kopmuş bağlantıyı at, yenisini aç
+                self._discard(conn)
+                conn = with_retry(self._pool.getconn)
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _discard(self, conn):
+        self._last_used.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+
+    def putconn(self, conn, close=False):
+        try:
+            if close or conn.closed: self._discard(conn)
+            else:
+                self._touch(conn)
+                self._pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        self._pool.closeall()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                lo = int(setting("pool_min", 1)); hi = int(setting("pool_max", 10))
+                kw = conn_kwargs()
+                _pool = with_retry(lambda: ConnectionPool(lo, hi, **kw))
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None: _pool.closeall()
+        _pool = None
+
+
+# --- YAZMA BİLDİRİMLERİ (önbellek geçersizleştirme için) ---
+def on_write(name, fn):
+    # fn(tablolar, aralık) her başarılı yazma commit'inden sonra çağrılır;
+    # aralık: etkilenen (ilk, son) tarih, bilinmiyorsa None (tamamı)
+    _write_listeners[name] = fn
+
+
+def notify_write(tables, span=None):
+    tables = list(tables)
+    if not tables: return
+    for fn in list(_write_listeners.values()):
+        fn(tables, span)
+
+
+def written_tables(query):
+    m = WRITE_RE.match(query)
+    return [m.group(1).lower()] if m else []
+
+
+# --- TRANSACTION ---
+@contextmanager
+def transaction(commit=True, writes=()):
+    # Havuzdan bir bağlantı al, cursor ver, sonunda commit/rollback yapıp geri bırak
+    p = get_pool()
+    conn = p.getconn()
+    try:
+        with conn.cursor() as c:
+            yield c
+        if commit: conn.commit()
+        else: conn.rollback()
+    except BaseException:
+        if not conn.closed:
+            try: conn.rollback()
+            except psycopg2.Error: pass
+        raise
+    finally:
+        p.putconn(conn)
+    if commit: notify_write(writes)
+
+
+# --- GÜVENLİ SORGU ÇALIŞTIRICI ---
+def run_query(query, params=None, fetch=False, commit=False):
+    # Okumalar kopan bağlantıda tekrar denenir; yazmalar çift kayıt olmasın diye denenmez
+    delays = () if commit else RETRY_DELAYS[:2]
+    try:
+        def go():
+            with transaction(commit=commit, writes=written_tables(query)) as c:
+                c.execute(query, params)
+                return c.fetchall() if fetch else None
+        return with_retry(go, delays)
+    except Exception as e:
+        # Kullanıcıya gösterme, logla
+        log_event(event="query_error", sql=_sql_text(query), site=call_site(), params=params_shape(params), error=str(e).strip())
+        return [] if fetch else None
+
+
+# --- EŞZAMANLI OKUMA ---
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _pool_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=int(setting("parallel_workers", 4)), thread_name_prefix="vt-read")
+    return _executor
+
+
+def parallel(tasks):
+    # {ad: fonksiyon} -> {ad: sonuç}. Birbirinden bağımsız okumalar sınırlı thread havuzunda,
+    # her biri kendi havuz bağlantısıyla çalışır; sorgular çağıranın SQL izine yazılır.
+    # Görevler içinden tekrar parallel çağrılmaz (aynı havuzda birbirini bekler).
+    if len(tasks) <= 1: return {k: fn() for k, fn in tasks.items()}
+    trace = current_trace()
+    def run(fn):
+        use_trace(trace)
+        try: return fn()
+        finally: use_trace(None)
+    futs = {k: _get_executor().submit(run, fn) for k, fn in tasks.items()}
+    return {k: f.result() for k, f in futs.items()}
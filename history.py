@@ -0,0 +1,53 @@
+# --- PROFİL GEÇMİŞİ ---
+# Müşteri / öğrenci / personel işleri: özet tek gruplu sorguda (ay ay), ayrıntı
+# (tarih, id) üzerinden keyset sayfalama ile; (kolon, date, id) indeksleri kullanılır.
+import pandas as pd
+
+from db import run_query
+
+# Profil türü -> jobs kolonu
+ENTITY = {"customer": "customer_id", "student": "assigned_student_id", "pro": "assigned_pro_id"}
+PAGE_SIZE = 25
+
+
+def summary(kind, eid):
+    # Ay -> iş sayısı, müşteriden alınacak / tahsil edilen, personele ödenecek / ödenen
+    rows = run_query(f"""SELECT date_trunc('month', date)::date AS m, COUNT(*) AS n,
+            COALESCE(SUM(price_customer), 0) AS billed,
+            COALESCE(SUM(price_customer) FILTER (WHERE is_collected=1), 0) AS collected,
+            COALESCE(SUM(price_worker), 0) AS wage,
+            COALESCE(SUM(price_worker) FILTER (WHERE is_worker_paid=1), 0) AS paid
+        FROM jobs WHERE {ENTITY[kind]}=%s GROUP BY 1 ORDER BY 1""", (eid,), fetch=True) or []
+    df = pd.DataFrame(rows, columns=["m", "n", "billed", "collected", "wage", "paid"])
+    for c in ("billed", "collected", "wage", "paid"): df[c] = df[c].astype(float)
+    df["m"] = pd.to_datetime(df["m"])
+    return df
+
+
+def page(kind, eid, after=None, limit=PAGE_SIZE):
+    # Yeniden eskiye bir sayfa + sonraki sayfanın imleci (yoksa None). Tarihsiz işler en sonda
+    # (DESC NULLS LAST); tarihli ve tarihsiz dallar ayrı ayrı (kolon, date, id) indeksinden okunur.
+    col = ENTITY[kind]
+    dated, undated = ["j.date IS NOT NULL"], ["j.date IS NULL"]
+    dp, up = [eid], [eid]
+    if after:
+        d, i = after
+        if d is None: dated.append("false"); undated.append("j.id < %s"); up.append(i)
+        else: dated.append("(j.date, j.id) < (%s, %s)"); dp += [d, i]
+    cols = "j.id, j.date, j.job_type, j.status, j.customer_id, j.assigned_student_id, j.assigned_pro_id, j.price_customer, j.is_collected, j.price_worker, j.is_worker_paid"
+    rows = run_query(f"""SELECT j.id, j.date, j.job_type, j.status, c.name AS customer, COALESCE(s.name, p.name) AS staff,
+            j.price_customer, j.is_collected, j.price_worker, j.is_worker_paid
+        FROM (
+            (SELECT {cols} FROM jobs j WHERE j.{col}=%s AND {' AND '.join(dated)} ORDER BY j.date DESC, j.id DESC LIMIT %s)
+            UNION ALL
+            (SELECT {cols} FROM jobs j WHERE j.{col}=%s AND {' AND '.join(undated)} ORDER BY j.id DESC LIMIT %s)
+        ) j
+        LEFT JOIN customers c ON c.id=j.customer_id
+        LEFT JOIN students s ON s.id=j.assigned_student_id
+        LEFT JOIN professionals p ON p.id=j.assigned_pro_id
+        ORDER BY j.date DESC NULLS LAST, j.id DESC LIMIT %s""", dp + [limit + 1] + up + [limit + 1, limit + 1], fetch=True) or []
+    nxt = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        nxt = (rows[-1]['date'], rows[-1]['id'])
+    return rows, nxt
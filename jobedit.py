@@ -0,0 +1,41 @@
+# --- TOPLU İŞ DÜZENLEME ---
+# Gün / hafta / grup tablosunda biriken değişiklikler tek transaction'da, tek
+# UPDATE ... FROM (VALUES ...) ile yazılır; sayfa sadece bir kez yenilenir.
+from db import execute_values, transaction
+
+# Toplu düzenlenebilen kolonlar -> VALUES içindeki tip (NULL'lar tipsiz kalmasın)
+EDIT_COLUMNS = {
+    "is_collected": "int",
+    "is_worker_paid": "int",
+    "assigned_student_id": "int",
+    "assigned_pro_id": "int",
+    "price_worker": "real",
+    "status": "text",
+}
+GROUP_FLAGS = ("is_collected", "is_worker_paid")
+
+
+def apply_edits(edits):
+    # edits: {iş id: {kolon: değer}}; sadece verilen kolonlar yazılır. Güncellenen iş sayısı
+    edits = {i: ch for i, ch in edits.items() if ch}
+    if not edits: return 0
+    unknown = {k for ch in edits.values() for k in ch} - set(EDIT_COLUMNS)
+    if unknown: raise ValueError(f"Toplu düzenlenemeyen kolon: {', '.join(sorted(unknown))}")
+    cols = [c for c in EDIT_COLUMNS if any(c in ch for ch in edits.values())]
+    # Her kolon için (değiştir mi, yeni değer) çifti: satırda olmayan kolon eski değerini korur
+    names = ", ".join(f"set_{c}, {c}" for c in cols)
+    sets = ", ".join(f"{c} = CASE WHEN v.set_{c} THEN v.{c} ELSE j.{c} END" for c in cols)
+    template = "(%s::int, " + ", ".join(f"%s::bool, %s::{EDIT_COLUMNS[c]}" for c in cols) + ")"
+    rows = [(i, *[x for c in cols for x in (c in ch, ch.get(c))]) for i, ch in sorted(edits.items())]
+    with transaction(writes=["jobs"]) as c:
+        execute_values(c, f"UPDATE jobs AS j SET {sets} FROM (VALUES %s) AS v(id, {names}) WHERE j.id = v.id",
+                       rows, template=template, page_size=len(rows))
+        return c.rowcount
+
+
+def mark_group(group_id, column, value=1):
+    # Bir grubun (sihirbaz planı / düzenli iş) bütün işlerini tahsil edildi / ödendi işaretle
+    if column not in GROUP_FLAGS: raise ValueError(f"Grup işareti olmayan kolon: {column}")
+    with transaction(writes=["jobs"]) as c:
+        c.execute(f"UPDATE jobs SET {column}=%s WHERE group_id=%s AND {column} IS DISTINCT FROM %s", (int(value), group_id, int(value)))
+        return c.rowcount
@@ -0,0 +1,125 @@
+# --- DEFTER (KASA HAREKETLERİ) VE DIŞA AKTARIM ---
+# Tüm para hareketleri tek sorguda; (date, src, id) sıralama/sayfalama anahtarı.
+# Dışa aktarım sadece istenince çalışır: satırlar sunucu taraflı (named) cursor ile
+# parça parça okunur ve geçici dosyaya parça parça yazılır; satırlar ve ara biçim bellekte
+# birikmez. Bitmiş dosya indirme için bytes olarak döner (Streamlit zaten bytes'a çevirir).
+import csv
+import io
+import tempfile
+import uuid
+from datetime import timedelta
+
+from db import transaction
+
+LEDGER_SQL = """
+    SELECT * FROM (
+        SELECT t.date, 1 AS src, t.id, 'Manuel' AS kind, t.description AS descr, CASE WHEN t.type='income' THEN t.amount ELSE -t.amount END AS amount
+        FROM transactions t
+        UNION ALL
+        SELECT j.date, 2, j.id, 'Tahsilat', c.name, j.price_customer
+        FROM jobs j JOIN customers c ON j.customer_id=c.id WHERE j.is_collected=1 AND j.price_customer > 0
+        UNION ALL
+        SELECT j.date, 3, j.id, 'Ödeme', 'Personel (' || j.job_type || ')', -j.price_worker
+        FROM jobs j WHERE j.is_worker_paid=1 AND j.price_worker > 0
+        UNION ALL
+        SELECT sp.payment_date, 4, sp.id, 'Maaş', p.name, -sp.amount
+        FROM salary_payments sp JOIN professionals p ON sp.pro_id=p.id
+    ) l"""
+LEDGER_KINDS = ["Manuel", "Tahsilat", "Ödeme", "Maaş"]
+EXPORT_COLUMNS = ["Tarih", "Tür", "Açıklama", "Tutar"]
+CHUNK_ROWS = 5000
+# Biçim -> (uzantı, MIME)
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def ledger_where(d1=None, d2=None, kinds=None):
+    # d1/d2 dahil; sorguda yarı açık aralığa çevrilir
+    where, params = [], []
+    if d1: where.append("l.date >= %s"); params.append(d1)
+    if d2: where.append("l.date < %s"); params.append(d2 + timedelta(1))
+    if kinds: where.append("l.kind = ANY(%s)"); params.append(list(kinds))
+    return where, params
+
+
+def ledger_after(after):
+    # Yeniden eskiye sayfalama imleci (date, src, id); tarihsiz satırlar en sonda (DESC NULLS LAST)
+    d, src, i = after
+    if d is None: return "(l.date IS NULL AND (l.src, l.id) < (%s, %s))", [src, i]
+    return "((l.date, l.src, l.id) < (%s, %s, %s) OR l.date IS NULL)", [d, src, i]
+
+
+def iter_chunks(d1=None, d2=None, kinds=None, chunk=CHUNK_ROWS):
+    # Eskiden yeniye, en fazla `chunk` satırlık listeler
+    where, params = ledger_where(d1, d2, kinds)
+    q = LEDGER_SQL + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY l.date, l.src, l.id"
+    with transaction(commit=False) as c:
+        with c.connection.cursor(name=f"ledger_{uuid.uuid4().hex[:8]}") as sc:
+            sc.itersize = chunk
+            sc.execute(q, params)
+            while True:
+                rows = sc.fetchmany(chunk)
+                if not rows: break
+                yield [(r['date'], r['kind'], r['descr'], float(r['amount']) if r['amount'] is not None else None) for r in rows]
+
+
+def _write_csv(out, chunks):
+    txt = io.TextIOWrapper(out, encoding="utf-8-sig", newline="")
+    w = csv.writer(txt)
+    w.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        w.writerows((d.strftime("%d.%m.%Y") if d else "", k, s, a) for d, k, s, a in rows)
+    txt.flush()
+    txt.detach()
+
+
+def _write_parquet(out, chunks):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.schema([("Tarih", pa.date32()), ("Tür", pa.string()), ("Açıklama", pa.string()), ("Tutar", pa.float64())])
+    with pq.ParquetWriter(out, schema) as w:
+        for rows in chunks:
+            w.write_table(pa.Table.from_arrays([pa.array(col, type=f.type) for col, f in zip(zip(*rows), schema)], schema=schema))
+
+
+def _write_xlsx(out, chunks):
+    from openpyxl import Workbook
+    # write_only: satırlar diske akar, çalışma kitabı bellekte büyümez
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Defter")
+    ws.append(EXPORT_COLUMNS)
+    for rows in chunks:
+        for r in rows: ws.append(r)
+    wb.save(out)
+
+
+WRITERS = {"CSV": _write_csv, "Parquet": _write_parquet, "Excel": _write_xlsx}
+
+
+def available_formats():
+    # Opsiyonel kütüphanesi kurulu olan biçimler
+    out = ["CSV"]
+    for fmt, mod in (("Parquet", "pyarrow"), ("Excel", "openpyxl")):
+        try:
+            __import__(mod)
+            out.append(fmt)
+        except ImportError:
+            pass
+    return out
+
+
+def export(fmt, d1=None, d2=None, kinds=None):
+    # Dosya diskte parça parça oluşur; indirme için bitmiş dosya tek bytes olarak okunur
+    with tempfile.TemporaryFile() as out:
+        WRITERS[fmt](out, iter_chunks(d1, d2, kinds))
+        out.seek(0)
+        return out.read()
+
+
+def file_name(fmt, d1=None, d2=None):
+    ext = FORMATS[fmt][0]
+    span = f"_{d1:%Y%m%d}-{(d2 or d1):%Y%m%d}" if d1 else ""
+    return f"finans{span}.{ext}"
@@ -0,0 +1,77 @@
+# --- TOPLU YÜKLEYİCİLER (DataLoader) ---
+# Döngülerde satır başına sorgu yerine id'ler önce toplanır (prime), ilk okumada
+# tek "WHERE id = ANY(%s)" sorgusuyla çözülür. Her rerun yeni bir Loaders kullanır;
+# sonuçlar sadece o rerun boyunca saklanır.
+from db import run_query
+
+
+class BatchLoader:
+    def __init__(self, fetch_many):
+        # fetch_many(anahtarlar) -> {anahtar: satır}
+        self._fetch = fetch_many
+        self._cache = {}
+        self._queue = set()
+
+    def prime(self, keys):
+        self._queue.update(k for k in keys if k is not None and k not in self._cache)
+
+    def put(self, key, value):
+        self._cache[key] = value
+        self._queue.discard(key)
+
+    def _dispatch(self):
+        if not self._queue: return
+        keys = list(self._queue); self._queue.clear()
+        found = self._fetch(keys)
+        for k in keys: self._cache[k] = found.get(k)
+
+    def load(self, key):
+        if key is None: return None
+        if key not in self._cache:
+            self._queue.add(key)
+            self._dispatch()
+        return self._cache[key]
+
+    def load_many(self, keys):
+        self.prime(keys)
+        self._dispatch()
+        return [self._cache.get(k) for k in keys]
+
+
+def rows_by_id(table, cols):
+    def fetch(ids):
+        rows = run_query(f"SELECT {cols} FROM {table} WHERE id = ANY(%s)", (list(ids),), fetch=True) or []
+        return {r['id']: r for r in rows}
+    return fetch
+
+
+def paid_by_period(payment_type):
+    # {dönem: {pro_id, ...}} - o dönemde ödemesi yapılmış personel
+    def fetch(periods):
+        rows = run_query("SELECT DISTINCT month_year, pro_id FROM salary_payments WHERE payment_type=%s AND month_year = ANY(%s)", (payment_type, list(periods)), fetch=True) or []
+        out = {p: set() for p in periods}
+        for r in rows: out[r['month_year']].add(r['pro_id'])
+        return out
+    return fetch
+
+
+class Loaders:
+    def __init__(self):
+        self.students = BatchLoader(rows_by_id("students", "id, name, phone"))
+        self.pros = BatchLoader(rows_by_id("professionals", "id, name, phone, salary, weekly_salary, payment_day"))
+        self.paid_monthly = BatchLoader(paid_by_period("monthly"))
+        self.paid_weekly = BatchLoader(paid_by_period("weekly"))
+        self._staff = {}
+
+    def staff(self, kind):
+        # Atama listeleri için tüm öğrenci/pro listesi (rerun başına bir kez)
+        if kind not in self._staff:
+            if kind == 'student':
+                rows = run_query("SELECT id, name, phone FROM students ORDER BY name", fetch=True) or []
+                ld = self.students
+            else:
+                rows = run_query("SELECT id, name, phone, salary, weekly_salary, payment_day FROM professionals ORDER BY name", fetch=True) or []
+                ld = self.pros
+            for r in rows: ld.put(r['id'], r)
+            self._staff[kind] = rows
+        return self._staff[kind]
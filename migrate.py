@@ -0,0 +1,130 @@
+# --- ŞEMA GÖÇLERİ ---
+# migrations/NNNN_ad.sql ya da NNNN_ad.py (upgrade(cur) fonksiyonu) sırayla, bir kez çalışır.
+# Uygulananlar schema_version tablosunda tutulur; eşzamanlı başlatmalar advisory lock ile sıraya girer.
+# Kullanım:
+#   python migrate.py            # bekleyen göçleri uygula
+#   python migrate.py --status   # durum
+# Bağlantı: --dsn / DATABASE_URL, yoksa .streamlit/secrets.toml [supabase]
+import argparse
+import importlib.util
+import os
+import re
+import sys
+import threading
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from db import conn_kwargs, get_pool
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+LOCK_KEY = 72177001 # pg_advisory_lock anahtarı (uygulamaya özel sabit)
+NAME_RE = re.compile(r"^(\d{4})_(\w+)\.(sql|py)$")
+
+_ensured = False
+_ensure_lock = threading.Lock()
+
+
+def discover():
+    # [(sürüm, ad, yol)] sürüme göre sıralı
+    out = []
+    for fn in os.listdir(MIGRATIONS_DIR):
+        m = NAME_RE.match(fn)
+        if m: out.append((int(m.group(1)), m.group(2), os.path.join(MIGRATIONS_DIR, fn)))
+    out.sort()
+    if len({v for v, _, _ in out}) != len(out): raise RuntimeError("Aynı numaralı iki göç dosyası var")
+    return out
+
+
+def applied_versions(cur):
+    cur.execute("SELECT to_regclass('schema_version') AS t")
+    if cur.fetchone()['t'] is None: return set()
+    cur.execute("SELECT version FROM schema_version")
+    return {r['version'] for r in cur.fetchall()}
+
+
+def apply_one(cur, path):
+    if path.endswith(".sql"):
+        with open(path, encoding="utf-8") as f: cur.execute(f.read())
+    else:
+        spec = importlib.util.spec_from_file_location(f"migration_{os.path.basename(path)[:4]}", path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        mod.upgrade(cur)
+
+
+def migrate(conn, log=print):
+    # Her göç kendi transaction'ında; sürüm kaydı aynı transaction'da yazılır
+    done = []
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (LOCK_KEY,))
+    conn.commit()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TIMESTAMPTZ NOT NULL DEFAULT now())")
+            conn.commit()
+            # Kilidi bekleyen başka bir süreç işi bitirmiş olabilir: kilit altında tekrar oku
+            have = applied_versions(cur)
+        for v, name, path in discover():
+            if v in have: continue
+            try:
+                with conn.cursor() as cur:
+                    apply_one(cur, path)
+                    cur.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", (v, name))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            log(f"{v:04d}_{name} uygulandı")
+            done.append(v)
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (LOCK_KEY,))
+        conn.commit()
+    return done
+
+
+def is_current(conn):
+    with conn.cursor() as cur:
+        ok = {v for v, _, _ in discover()} <= applied_versions(cur)
+    conn.rollback()
+    return ok
+
+
+def ensure_schema():
+    # Uygulama içinden: süreç başına bir kez, güncelse kilit bile alınmaz
+    global _ensured
+    if _ensured: return
+    with _ensure_lock:
+        if _ensured: return
+        p = get_pool()
+        conn = p.getconn()
+        try:
+            if not is_current(conn): migrate(conn, log=lambda m: None)
+        finally:
+            p.putconn(conn)
+        _ensured = True
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Veritabanı şema göçlerini uygular.")
+    ap.add_argument("--dsn")
+    ap.add_argument("--status", action="store_true", help="Sadece durumu göster")
+    args = ap.parse_args(argv)
+
+    conn = psycopg2.connect(cursor_factory=RealDictCursor, **conn_kwargs(args.dsn))
+    try:
+        if args.status:
+            with conn.cursor() as cur: have = applied_versions(cur)
+            for v, name, _ in discover():
+                print(f"{'✓' if v in have else ' '} {v:04d}_{name}")
+            return 0
+        done = migrate(conn)
+        print(f"{len(done)} göç uygulandı" if done else "Şema güncel")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# --- TARİH KOLONU GÖÇÜ (TEXT 'dd.mm.yyyy' -> DATE) ---
+# Kullanım:
+#   python migrate_dates.py --check        # sadece rapor (dönüştürülemeyen satırlar)
+#   python migrate_dates.py                # dönüştür
+#   python migrate_dates.py --force        # bozuk değerleri NULL yaparak dönüştür
+# Bağlantı: --dsn / DATABASE_URL, yoksa .streamlit/secrets.toml [supabase]
+import argparse
+import sys
+
+import psycopg2
+
+from db import conn_kwargs
+
+DATE_COLUMNS = [
+    ("jobs", "date"),
+    ("transactions", "date"),
+    ("daily_notes", "date"),
+    ("salary_payments", "payment_date"),
+]
+
+# 'dd.mm.yyyy' ana format; elle girilmiş ISO değerleri de kabul edilir
+PARSE_SQL = """CASE
+    WHEN {col} ~ '^\\d{{1,2}}\\.\\d{{1,2}}\\.\\d{{4}}$' THEN to_date({col}, 'DD.MM.YYYY')
+    WHEN {col} ~ '^\\d{{4}}-\\d{{2}}-\\d{{2}}$' THEN {col}::date
+    ELSE NULL END"""
+
+
+def column_type(cur, table, col):
+    cur.execute("SELECT data_type FROM information_schema.columns WHERE table_name=%s AND column_name=%s", (table, col))
+    r = cur.fetchone()
+    return r[0] if r else None
+
+
+def bad_rows(cur, table, col):
+    # Dolu ama tarihe çevrilemeyen değerler
+    parse = PARSE_SQL.format(col=f'"{col}"')
+    cur.execute(f'SELECT "{col}", COUNT(*) FROM {table} WHERE "{col}" IS NOT NULL AND "{col}" <> \'\' AND ({parse}) IS NULL GROUP BY 1 LIMIT 20')
+    return cur.fetchall()
+
+
+def migrate_column(cur, table, col):
+    parse = PARSE_SQL.format(col=f'"{col}"')
+    cur.execute(f'ALTER TABLE {table} ALTER COLUMN "{col}" TYPE DATE USING ({parse})')
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="TEXT tarih kolonlarını DATE tipine çevirir.")
+    ap.add_argument("--dsn")
+    ap.add_argument("--check", action="store_true", help="Sadece kontrol et, değiştirme")
+    ap.add_argument("--force", action="store_true", help="Çevrilemeyen değerleri NULL yap")
+    args = ap.parse_args(argv)
+
+    conn = psycopg2.connect(**conn_kwargs(args.dsn))
+    failed = False
+    with conn.cursor() as cur:
+        for table, col in DATE_COLUMNS:
+            typ = column_type(cur, table, col)
+            if typ is None:
+                print(f"{table}.{col}: tablo/kolon yok, atlandı")
+                continue
+            if typ == "date":
+                print(f"{table}.{col}: zaten DATE")
+                continue
+            bad = bad_rows(cur, table, col)
+            if bad:
+                print(f"{table}.{col}: {sum(n for _, n in bad)}+ çevrilemeyen değer, örnekler: {[v for v, _ in bad[:5]]}")
+                if not args.force:
+                    failed = True
+                    continue
+            if args.check:
+                print(f"{table}.{col}: {typ} -> DATE dönüştürülebilir")
+                continue
+            # Her tablo kendi transaction'ında: yarıda kalırsa o tablo eski halinde kalır
+            migrate_column(cur, table, col)
+            conn.commit()
+            print(f"{table}.{col}: DATE'e çevrildi")
+    conn.close()
+    if failed:
+        print("Bozuk değerler düzeltilmeden dönüştürülmedi (--force ile NULL yapılabilir).")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
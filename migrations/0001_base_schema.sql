@@ -0,0 +1,8 @@
+-- Temel tablolar (eski kurulumlarda zaten var; sadece yoksa oluşturur)
+CREATE TABLE IF NOT EXISTS customers (id SERIAL PRIMARY KEY, name TEXT, phone TEXT, location TEXT, default_note TEXT, is_regular INTEGER DEFAULT 0, frequency TEXT);
+CREATE TABLE IF NOT EXISTS students (id SERIAL PRIMARY KEY, name TEXT, phone TEXT);
+CREATE TABLE IF NOT EXISTS jobs (id SERIAL PRIMARY KEY, group_id TEXT, date DATE, customer_id INTEGER, job_type TEXT DEFAULT 'student', status TEXT DEFAULT 'OPEN', assigned_student_id INTEGER, assigned_pro_id INTEGER, price_worker REAL DEFAULT 0, price_customer REAL DEFAULT 0, is_worker_paid INTEGER DEFAULT 0, is_collected INTEGER DEFAULT 0, is_prepaid INTEGER DEFAULT 0, job_note TEXT);
+CREATE TABLE IF NOT EXISTS daily_notes (date DATE PRIMARY KEY, note TEXT);
+CREATE TABLE IF NOT EXISTS professionals (id SERIAL PRIMARY KEY, name TEXT, phone TEXT, salary REAL DEFAULT 0, payment_day INTEGER DEFAULT 1, weekly_salary REAL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS salary_payments (id SERIAL PRIMARY KEY, pro_id INTEGER, amount REAL, payment_date DATE, month_year TEXT, payment_type TEXT DEFAULT 'monthly');
+CREATE TABLE IF NOT EXISTS transactions (id SERIAL PRIMARY KEY, date DATE, type TEXT, category TEXT, amount REAL, description TEXT, related_id INTEGER);
@@ -0,0 +1,32 @@
+# Eski kurulumlardaki TEXT 'dd.mm.yyyy' tarih kolonlarını DATE'e çevirir.
+# Çevrilemeyen değer varsa durur: önce `python migrate_dates.py --check` / `--force`.
+# Kolon listesi ve dönüşüm bu göçe sabitlenmiştir; migrate_dates.py değişse de göç değişmez.
+import psycopg2.extensions
+
+COLUMNS = [
+    ("jobs", "date"),
+    ("transactions", "date"),
+    ("daily_notes", "date"),
+    ("salary_payments", "payment_date"),
+]
+
+# 'dd.mm.yyyy' ana format; elle girilmiş ISO değerleri de kabul edilir
+PARSE = """CASE
+    WHEN "{col}" ~ '^\\d{{1,2}}\\.\\d{{1,2}}\\.\\d{{4}}$' THEN to_date("{col}", 'DD.MM.YYYY')
+    WHEN "{col}" ~ '^\\d{{4}}-\\d{{2}}-\\d{{2}}$' THEN "{col}"::date
+    ELSE NULL END"""
+
+
+def upgrade(cur):
+    c = cur.connection.cursor(cursor_factory=psycopg2.extensions.cursor)
+    for table, col in COLUMNS:
+        c.execute("SELECT data_type FROM information_schema.columns WHERE table_name=%s AND column_name=%s", (table, col))
+        r = c.fetchone()
+        if r is None or r[0] == "date": continue
+        parse = PARSE.format(col=col)
+        c.execute(f'SELECT DISTINCT "{col}" FROM {table} WHERE "{col}" IS NOT NULL AND "{col}" <> \'\' AND ({parse}) IS NULL LIMIT 5')
+        bad = [v for v, in c.fetchall()]
+        if bad:
+            raise RuntimeError(f"{table}.{col}: çevrilemeyen tarih değerleri var ({bad}); "
+                               "`python migrate_dates.py --check` ile inceleyin")
+        c.execute(f'ALTER TABLE {table} ALTER COLUMN "{col}" TYPE DATE USING ({parse})')
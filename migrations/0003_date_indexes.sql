@@ -0,0 +1,8 @@
+-- Tarih aralığı sorguları için indeksler
+CREATE INDEX IF NOT EXISTS idx_jobs_date ON jobs (date);
+CREATE INDEX IF NOT EXISTS idx_jobs_type_date ON jobs (job_type, date);
+CREATE INDEX IF NOT EXISTS idx_jobs_customer_date ON jobs (customer_id, date);
+CREATE INDEX IF NOT EXISTS idx_jobs_student_date ON jobs (assigned_student_id, date);
+CREATE INDEX IF NOT EXISTS idx_jobs_pro_date ON jobs (assigned_pro_id, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_type_date ON transactions (type, date);
+CREATE INDEX IF NOT EXISTS idx_salary_payments_date ON salary_payments (payment_date);
@@ -0,0 +1,354 @@
+-- Günlük finans özet tablosu, artımlı tetikleyiciler (statement-level, transition table) ve ilk doldurma.
+-- Tetikleyici fonksiyonları değişecekse yeni bir göçte CREATE OR REPLACE edin.
+-- Tarihsiz satırlar '-infinity' günündeki tek satırda toplanır (KPI'lara girer, ay aralıklarına girmez).
+CREATE TABLE IF NOT EXISTS daily_ledger_rollup (
+    date DATE PRIMARY KEY,
+    job_income NUMERIC(14,2) NOT NULL DEFAULT 0,
+    job_expense NUMERIC(14,2) NOT NULL DEFAULT 0,
+    collected_income NUMERIC(14,2) NOT NULL DEFAULT 0,
+    pending_income NUMERIC(14,2) NOT NULL DEFAULT 0,
+    worker_paid NUMERIC(14,2) NOT NULL DEFAULT 0,
+    worker_payable NUMERIC(14,2) NOT NULL DEFAULT 0,
+    extra_income NUMERIC(14,2) NOT NULL DEFAULT 0,
+    extra_expense NUMERIC(14,2) NOT NULL DEFAULT 0,
+    salary_paid NUMERIC(14,2) NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION daily_ledger_rollup_jobs() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO daily_ledger_rollup AS r (date, job_income, job_expense, collected_income, pending_income, worker_paid, worker_payable, extra_income, extra_expense, salary_paid)
+        SELECT date, SUM(job_income), SUM(job_expense), SUM(collected_income), SUM(pending_income), SUM(worker_paid), SUM(worker_payable), SUM(extra_income), SUM(extra_expense), SUM(salary_paid) FROM (
+            SELECT COALESCE(date, '-infinity') AS date,
+                round(COALESCE(price_customer, 0)::numeric, 2) AS job_income,
+                round(COALESCE(price_worker, 0)::numeric, 2) AS job_expense,
+                round(COALESCE(CASE WHEN is_collected=1 AND price_customer > 0 THEN price_customer ELSE 0 END, 0)::numeric, 2) AS collected_income,
+                round(COALESCE(CASE WHEN is_collected=0 THEN price_customer ELSE 0 END, 0)::numeric, 2) AS pending_income,
+                round(COALESCE(CASE WHEN is_worker_paid=1 AND price_worker > 0 THEN price_worker ELSE 0 END, 0)::numeric, 2) AS worker_paid,
+                round(COALESCE(CASE WHEN is_worker_paid=0 AND price_worker > 0 THEN price_worker ELSE 0 END, 0)::numeric, 2) AS worker_payable,
+                0::numeric AS extra_income,
+                0::numeric AS extra_expense,
+                0::numeric AS salary_paid
+            FROM new_rows
+        ) x GROUP BY date ORDER BY date
+        ON CONFLICT (date) DO UPDATE SET
+            job_income = r.job_income + EXCLUDED.job_income,
+            job_expense = r.job_expense + EXCLUDED.job_expense,
+            collected_income = r.collected_income + EXCLUDED.collected_income,
+            pending_income = r.pending_income + EXCLUDED.pending_income,
+            worker_paid = r.worker_paid + EXCLUDED.worker_paid,
+            worker_payable = r.worker_payable + EXCLUDED.worker_payable,
+            extra_income = r.extra_income + EXCLUDED.extra_income,
+            extra_expense = r.extra_expense + EXCLUDED.extra_expense,
+            salary_paid = r.salary_paid + EXCLUDED.salary_paid;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO daily_ledger_rollup AS r (date, job_income, job_expense, collected_income, pending_income, worker_paid, worker_payable, extra_income, extra_expense, salary_paid)
+        SELECT date, SUM(job_income), SUM(job_expense), SUM(collected_income), SUM(pending_income), SUM(worker_paid), SUM(worker_payable), SUM(extra_income), SUM(extra_expense), SUM(salary_paid) FROM (
+            SELECT COALESCE(date, '-infinity') AS date,
+                -round(COALESCE(price_customer, 0)::numeric, 2) AS job_income,
+                -round(COALESCE(price_worker, 0)::numeric, 2) AS job_expense,
+                -round(COALESCE(CASE WHEN is_collected=1 AND price_customer > 0 THEN price_customer ELSE 0 END, 0)::numeric, 2) AS collected_income,
+                -round(COALESCE(CASE WHEN is_collected=0 THEN price_customer ELSE 0 END, 0)::numeric, 2) AS pending_income,
+                -round(COALESCE(CASE WHEN is_worker_paid=1 AND price_worker > 0 THEN price_worker ELSE 0 END, 0)::numeric, 2) AS worker_paid,
+                -round(COALESCE(CASE WHEN is_worker_paid=0 AND price_worker > 0 THEN price_worker ELSE 0 END, 0)::numeric, 2) AS worker_payable,
+                0::numeric AS extra_income,
+                0::numeric AS extra_expense,
+                0::numeric AS salary_paid
+            FROM old_rows
+        ) x GROUP BY date ORDER BY date
+        ON CONFLICT (date) DO UPDATE SET
+            job_income = r.job_income + EXCLUDED.job_income,
+            job_expense = r.job_expense + EXCLUDED.job_expense,
+            collected_income = r.collected_income + EXCLUDED.collected_income,
+            pending_income = r.pending_income + EXCLUDED.pending_income,
+            worker_paid = r.worker_paid + EXCLUDED.worker_paid,
+            worker_payable = r.worker_payable + EXCLUDED.worker_payable,
+            extra_income = r.extra_income + EXCLUDED.extra_income,
+            extra_expense = r.extra_expense + EXCLUDED.extra_expense,
+            salary_paid = r.salary_paid + EXCLUDED.salary_paid;
+    ELSE
+        INSERT INTO daily_ledger_rollup AS r (date, job_income, job_expense, collected_income, pending_income, worker_paid, worker_payable, extra_income, extra_expense, salary_paid)
+        SELECT date, SUM(job_income), SUM(job_expense), SUM(collected_income), SUM(pending_income), SUM(worker_paid), SUM(worker_payable), SUM(extra_income), SUM(extra_expense), SUM(salary_paid) FROM (
+            SELECT COALESCE(date, '-infinity') AS date,
+                -round(COALESCE(price_customer, 0)::numeric, 2) AS job_income,
+                -round(COALESCE(price_worker, 0)::numeric, 2) AS job_expense,
+                -round(COALESCE(CASE WHEN is_collected=1 AND price_customer > 0 THEN price_customer ELSE 0 END, 0)::numeric, 2) AS collected_income,
+                -round(COALESCE(CASE WHEN is_collected=0 THEN price_customer ELSE 0 END, 0)::numeric, 2) AS pending_income,
+                -round(COALESCE(CASE WHEN is_worker_paid=1 AND price_worker > 0 THEN price_worker ELSE 0 END, 0)::numeric, 2) AS worker_paid,
+                -round(COALESCE(CASE WHEN is_worker_paid=0 AND price_worker > 0 THEN price_worker ELSE 0 END, 0)::numeric, 2) AS worker_payable,
+                0::numeric AS extra_income,
+                0::numeric AS extra_expense,
+                0::numeric AS salary_paid
+            FROM old_rows
+            UNION ALL
+            SELECT COALESCE(date, '-infinity') AS date,
+                round(COALESCE(price_customer, 0)::numeric, 2) AS job_income,
+                round(COALESCE(price_worker, 0)::numeric, 2) AS job_expense,
+                round(COALESCE(CASE WHEN is_collected=1 AND price_customer > 0 THEN price_customer ELSE 0 END, 0)::numeric, 2) AS collected_income,
+                round(COALESCE(CASE WHEN is_collected=0 THEN price_customer ELSE 0 END, 0)::numeric, 2) AS pending_income,
+                round(COALESCE(CASE WHEN is_worker_paid=1 AND price_worker > 0 THEN price_worker ELSE 0 END, 0)::numeric, 2) AS worker_paid,
+                round(COALESCE(CASE WHEN is_worker_paid=0 AND price_worker > 0 THEN price_worker ELSE 0 END, 0)::numeric, 2) AS worker_payable,
+                0::numeric AS extra_income,
+                0::numeric AS extra_expense,
+                0::numeric AS salary_paid
+            FROM new_rows
+        ) x GROUP BY date ORDER BY date
+        ON CONFLICT (date) DO UPDATE SET
+            job_income = r.job_income + EXCLUDED.job_income,
+            job_expense = r.job_expense + EXCLUDED.job_expense,
+            collected_income = r.collected_income + EXCLUDED.collected_income,
+            pending_income = r.pending_income + EXCLUDED.pending_income,
+            worker_paid = r.worker_paid + EXCLUDED.worker_paid,
+            worker_payable = r.worker_payable + EXCLUDED.worker_payable,
+            extra_income = r.extra_income + EXCLUDED.extra_income,
+            extra_expense = r.extra_expense + EXCLUDED.extra_expense,
+            salary_paid = r.salary_paid + EXCLUDED.salary_paid;
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_rollup_jobs_insert ON jobs;
+CREATE TRIGGER trg_rollup_jobs_insert AFTER INSERT ON jobs REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION daily_ledger_rollup_jobs();
+DROP TRIGGER IF EXISTS trg_rollup_jobs_update ON jobs;
+CREATE TRIGGER trg_rollup_jobs_update AFTER UPDATE ON jobs REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION daily_ledger_rollup_jobs();
+DROP TRIGGER IF EXISTS trg_rollup_jobs_delete ON jobs;
+CREATE TRIGGER trg_rollup_jobs_delete AFTER DELETE ON jobs REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION daily_ledger_rollup_jobs();
+
+CREATE OR REPLACE FUNCTION daily_ledger_rollup_transactions() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO daily_ledger_rollup AS r (date, job_income, job_expense, collected_income, pending_income, worker_paid, worker_payable, extra_income, extra_expense, salary_paid)
+        SELECT date, SUM(job_income), SUM(job_expense), SUM(collected_income), SUM(pending_income), SUM(worker_paid), SUM(worker_payable), SUM(extra_income), SUM(extra_expense), SUM(salary_paid) FROM (
+            SELECT COALESCE(date, '-infinity') AS date,
+                0::numeric AS job_income,
+                0::numeric AS job_expense,
+                0::numeric AS collected_income,
+                0::numeric AS pending_income,
+                0::numeric AS worker_paid,
+                0::numeric AS worker_payable,
+                round(COALESCE(CASE WHEN type='income' THEN amount ELSE 0 END, 0)::numeric, 2) AS extra_income,
+                round(COALESCE(CASE WHEN type IS DISTINCT FROM 'income' THEN amount ELSE 0 END, 0)::numeric, 2) AS extra_expense,
+                0::numeric AS salary_paid
+            FROM new_rows
+        ) x GROUP BY date ORDER BY date
+        ON CONFLICT (date) DO UPDATE SET
+            job_income = r.job_income + EXCLUDED.job_income,
+            job_expense = r.job_expense + EXCLUDED.job_expense,
+            collected_income = r.collected_income + EXCLUDED.collected_income,
+            pending_income = r.pending_income + EXCLUDED.pending_income,
+            worker_paid = r.worker_paid + EXCLUDED.worker_paid,
+            worker_payable = r.worker_payable + EXCLUDED.worker_payable,
+            extra_income = r.extra_income + EXCLUDED.extra_income,
+            extra_expense = r.extra_expense + EXCLUDED.extra_expense,
+            salary_paid = r.salary_paid + EXCLUDED.salary_paid;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO daily_ledger_rollup AS r (date, job_income, job_expense, collected_income, pending_income, worker_paid, worker_payable, extra_income, extra_expense, salary_paid)
+        SELECT date, SUM(job_income), SUM(job_expense), SUM(collected_income), SUM(pending_income), SUM(worker_paid), SUM(worker_payable), SUM(extra_income), SUM(extra_expense), SUM(salary_paid) FROM (
+            SELECT COALESCE(date, '-infinity') AS date,
+                0::numeric AS job_income,
+                0::numeric AS job_expense,
+                0::numeric AS collected_income,
+                0::numeric AS pending_income,
+                0::numeric AS worker_paid,
+                0::numeric AS worker_payable,
+                -round(COALESCE(CASE WHEN type='income' THEN amount ELSE 0 END, 0)::numeric, 2) AS extra_income,
+                -round(COALESCE(CASE WHEN type IS DISTINCT FROM 'income' THEN amount ELSE 0 END, 0)::numeric, 2) AS extra_expense,
+                0::numeric AS salary_paid
+            FROM old_rows
+        ) x GROUP BY date ORDER BY date
+        ON CONFLICT (date) DO UPDATE SET
+            job_income = r.job_income + EXCLUDED.job_income,
+            job_expense = r.job_expense + EXCLUDED.job_expense,
+            collected_income = r.collected_income + EXCLUDED.collected_income,
+            pending_income = r.pending_income + EXCLUDED.pending_income,
+            worker_paid = r.worker_paid + EXCLUDED.worker_paid,
+            worker_payable = r.worker_payable + EXCLUDED.worker_payable,
+            extra_income = r.extra_income + EXCLUDED.extra_income,
+            extra_expense = r.extra_expense + EXCLUDED.extra_expense,
+            salary_paid = r.salary_paid + EXCLUDED.salary_paid;
+    ELSE
+        INSERT INTO daily_ledger_rollup AS r (date, job_income, job_expense, collected_income, pending_income, worker_paid, worker_payable, extra_income, extra_expense, salary_paid)
+        SELECT date, SUM(job_income), SUM(job_expense), SUM(collected_income), SUM(pending_income), SUM(worker_paid), SUM(worker_payable), SUM(extra_income), SUM(extra_expense), SUM(salary_paid) FROM (
+            SELECT COALESCE(date, '-infinity') AS date,
+                0::numeric AS job_income,
+                0::numeric AS job_expense,
+                0::numeric AS collected_income,
+                0::numeric AS pending_income,
+                0::numeric AS worker_paid,
+                0::numeric AS worker_payable,
+                -round(COALESCE(CASE WHEN type='income' THEN amount ELSE 0 END, 0)::numeric, 2) AS extra_income,
+                -round(COALESCE(CASE WHEN type IS DISTINCT FROM 'income' THEN amount ELSE 0 END, 0)::numeric, 2) AS extra_expense,
+                0::numeric AS salary_paid
+            FROM old_rows
+            UNION ALL
+            SELECT COALESCE(date, '-infinity') AS date,
+                0::numeric AS job_income,
+                0::numeric AS job_expense,
+                0::numeric AS collected_income,
+                0::numeric AS pending_income,
+                0::numeric AS worker_paid,
+                0::numeric AS worker_payable,
+                round(COALESCE(CASE WHEN type='income' THEN amount ELSE 0 END, 0)::numeric, 2) AS extra_income,
+                round(COALESCE(CASE WHEN type IS DISTINCT FROM 'income' THEN amount ELSE 0 END, 0)::numeric, 2) AS extra_expense,
+                0::numeric AS salary_paid
+            FROM new_rows
+        ) x GROUP BY date ORDER BY date
+        ON CONFLICT (date) DO UPDATE SET
+            job_income = r.job_income + EXCLUDED.job_income,
+            job_expense = r.job_expense + EXCLUDED.job_expense,
+            collected_income = r.collected_income + EXCLUDED.collected_income,
+            pending_income = r.pending_income + EXCLUDED.pending_income,
+            worker_paid = r.worker_paid + EXCLUDED.worker_paid,
+            worker_payable = r.worker_payable + EXCLUDED.worker_payable,
+            extra_income = r.extra_income + EXCLUDED.extra_income,
+            extra_expense = r.extra_expense + EXCLUDED.extra_expense,
+            salary_paid = r.salary_paid + EXCLUDED.salary_paid;
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_rollup_transactions_insert ON transactions;
+CREATE TRIGGER trg_rollup_transactions_insert AFTER INSERT ON transactions REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION daily_ledger_rollup_transactions();
+DROP TRIGGER IF EXISTS trg_rollup_transactions_update ON transactions;
+CREATE TRIGGER trg_rollup_transactions_update AFTER UPDATE ON transactions REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION daily_ledger_rollup_transactions();
+DROP TRIGGER IF EXISTS trg_rollup_transactions_delete ON transactions;
+CREATE TRIGGER trg_rollup_transactions_delete AFTER DELETE ON transactions REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION daily_ledger_rollup_transactions();
+
+CREATE OR REPLACE FUNCTION daily_ledger_rollup_salary_payments() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO daily_ledger_rollup AS r (date, job_income, job_expense, collected_income, pending_income, worker_paid, worker_payable, extra_income, extra_expense, salary_paid)
+        SELECT date, SUM(job_income), SUM(job_expense), SUM(collected_income), SUM(pending_income), SUM(worker_paid), SUM(worker_payable), SUM(extra_income), SUM(extra_expense), SUM(salary_paid) FROM (
+            SELECT COALESCE(payment_date, '-infinity') AS date,
+                0::numeric AS job_income,
+                0::numeric AS job_expense,
+                0::numeric AS collected_income,
+                0::numeric AS pending_income,
+                0::numeric AS worker_paid,
+                0::numeric AS worker_payable,
+                0::numeric AS extra_income,
+                0::numeric AS extra_expense,
+                round(COALESCE(amount, 0)::numeric, 2) AS salary_paid
+            FROM new_rows
+        ) x GROUP BY date ORDER BY date
+        ON CONFLICT (date) DO UPDATE SET
+            job_income = r.job_income + EXCLUDED.job_income,
+            job_expense = r.job_expense + EXCLUDED.job_expense,
+            collected_income = r.collected_income + EXCLUDED.collected_income,
+            pending_income = r.pending_income + EXCLUDED.pending_income,
+            worker_paid = r.worker_paid + EXCLUDED.worker_paid,
+            worker_payable = r.worker_payable + EXCLUDED.worker_payable,
+            extra_income = r.extra_income + EXCLUDED.extra_income,
+            extra_expense = r.extra_expense + EXCLUDED.extra_expense,
+            salary_paid = r.salary_paid + EXCLUDED.salary_paid;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO daily_ledger_rollup AS r (date, job_income, job_expense, collected_income, pending_income, worker_paid, worker_payable, extra_income, extra_expense, salary_paid)
+        SELECT date, SUM(job_income), SUM(job_expense), SUM(collected_income), SUM(pending_income), SUM(worker_paid), SUM(worker_payable), SUM(extra_income), SUM(extra_expense), SUM(salary_paid) FROM (
+            SELECT COALESCE(payment_date, '-infinity') AS date,
+                0::numeric AS job_income,
+                0::numeric AS job_expense,
+                0::numeric AS collected_income,
+                0::numeric AS pending_income,
+                0::numeric AS worker_paid,
+                0::numeric AS worker_payable,
+                0::numeric AS extra_income,
+                0::numeric AS extra_expense,
+                -round(COALESCE(amount, 0)::numeric, 2) AS salary_paid
+            FROM old_rows
+        ) x GROUP BY date ORDER BY date
+        ON CONFLICT (date) DO UPDATE SET
+            job_income = r.job_income + EXCLUDED.job_income,
+            job_expense = r.job_expense + EXCLUDED.job_expense,
+            collected_income = r.collected_income + EXCLUDED.collected_income,
+            pending_income = r.pending_income + EXCLUDED.pending_income,
+            worker_paid = r.worker_paid + EXCLUDED.worker_paid,
+            worker_payable = r.worker_payable + EXCLUDED.worker_payable,
+            extra_income = r.extra_income + EXCLUDED.extra_income,
+            extra_expense = r.extra_expense + EXCLUDED.extra_expense,
+            salary_paid = r.salary_paid + EXCLUDED.salary_paid;
+    ELSE
+        INSERT INTO daily_ledger_rollup AS r (date, job_income, job_expense, collected_income, pending_income, worker_paid, worker_payable, extra_income, extra_expense, salary_paid)
+        SELECT date, SUM(job_income), SUM(job_expense), SUM(collected_income), SUM(pending_income), SUM(worker_paid), SUM(worker_payable), SUM(extra_income), SUM(extra_expense), SUM(salary_paid) FROM (
+            SELECT COALESCE(payment_date, '-infinity') AS date,
+                0::numeric AS job_income,
+                0::numeric AS job_expense,
+                0::numeric AS collected_income,
+                0::numeric AS pending_income,
+                0::numeric AS worker_paid,
+                0::numeric AS worker_payable,
+                0::numeric AS extra_income,
+                0::numeric AS extra_expense,
+                -round(COALESCE(amount, 0)::numeric, 2) AS salary_paid
+            FROM old_rows
+            UNION ALL
+            SELECT COALESCE(payment_date, '-infinity') AS date,
+                0::numeric AS job_income,
+                0::numeric AS job_expense,
+                0::numeric AS collected_income,
+                0::numeric AS pending_income,
+                0::numeric AS worker_paid,
+                0::numeric AS worker_payable,
+                0::numeric AS extra_income,
+                0::numeric AS extra_expense,
+                round(COALESCE(amount, 0)::numeric, 2) AS salary_paid
+            FROM new_rows
+        ) x GROUP BY date ORDER BY date
+        ON CONFLICT (date) DO UPDATE SET
+            job_income = r.job_income + EXCLUDED.job_income,
+            job_expense = r.job_expense + EXCLUDED.job_expense,
+            collected_income = r.collected_income + EXCLUDED.collected_income,
+            pending_income = r.pending_income + EXCLUDED.pending_income,
+            worker_paid = r.worker_paid + EXCLUDED.worker_paid,
+            worker_payable = r.worker_payable + EXCLUDED.worker_payable,
+            extra_income = r.extra_income + EXCLUDED.extra_income,
+            extra_expense = r.extra_expense + EXCLUDED.extra_expense,
+            salary_paid = r.salary_paid + EXCLUDED.salary_paid;
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_rollup_salary_payments_insert ON salary_payments;
+CREATE TRIGGER trg_rollup_salary_payments_insert AFTER INSERT ON salary_payments REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION daily_ledger_rollup_salary_payments();
+DROP TRIGGER IF EXISTS trg_rollup_salary_payments_update ON salary_payments;
+CREATE TRIGGER trg_rollup_salary_payments_update AFTER UPDATE ON salary_payments REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION daily_ledger_rollup_salary_payments();
+DROP TRIGGER IF EXISTS trg_rollup_salary_payments_delete ON salary_payments;
+CREATE TRIGGER trg_rollup_salary_payments_delete AFTER DELETE ON salary_payments REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION daily_ledger_rollup_salary_payments();
+
+-- İlk doldurma (yazmalar beklesin; tetikleyiciyle yarışmasın)
+LOCK TABLE jobs, transactions, salary_payments IN SHARE MODE;
+DELETE FROM daily_ledger_rollup;
+INSERT INTO daily_ledger_rollup (date, job_income, job_expense, collected_income, pending_income, worker_paid, worker_payable, extra_income, extra_expense, salary_paid)
+SELECT date, SUM(job_income), SUM(job_expense), SUM(collected_income), SUM(pending_income), SUM(worker_paid), SUM(worker_payable), SUM(extra_income), SUM(extra_expense), SUM(salary_paid) FROM (
+    SELECT COALESCE(date, '-infinity') AS date,
+        round(COALESCE(price_customer, 0)::numeric, 2) AS job_income,
+        round(COALESCE(price_worker, 0)::numeric, 2) AS job_expense,
+        round(COALESCE(CASE WHEN is_collected=1 AND price_customer > 0 THEN price_customer ELSE 0 END, 0)::numeric, 2) AS collected_income,
+        round(COALESCE(CASE WHEN is_collected=0 THEN price_customer ELSE 0 END, 0)::numeric, 2) AS pending_income,
+        round(COALESCE(CASE WHEN is_worker_paid=1 AND price_worker > 0 THEN price_worker ELSE 0 END, 0)::numeric, 2) AS worker_paid,
+        round(COALESCE(CASE WHEN is_worker_paid=0 AND price_worker > 0 THEN price_worker ELSE 0 END, 0)::numeric, 2) AS worker_payable,
+        0::numeric AS extra_income,
+        0::numeric AS extra_expense,
+        0::numeric AS salary_paid
+    FROM jobs
+    UNION ALL
+    SELECT COALESCE(date, '-infinity') AS date,
+        0::numeric AS job_income,
+        0::numeric AS job_expense,
+        0::numeric AS collected_income,
+        0::numeric AS pending_income,
+        0::numeric AS worker_paid,
+        0::numeric AS worker_payable,
+        round(COALESCE(CASE WHEN type='income' THEN amount ELSE 0 END, 0)::numeric, 2) AS extra_income,
+        round(COALESCE(CASE WHEN type IS DISTINCT FROM 'income' THEN amount ELSE 0 END, 0)::numeric, 2) AS extra_expense,
+        0::numeric AS salary_paid
+    FROM transactions
+    UNION ALL
+    SELECT COALESCE(payment_date, '-infinity') AS date,
+        0::numeric AS job_income,
+        0::numeric AS job_expense,
+        0::numeric AS collected_income,
+        0::numeric AS pending_income,
+        0::numeric AS worker_paid,
+        0::numeric AS worker_payable,
+        0::numeric AS extra_income,
+        0::numeric AS extra_expense,
+        round(COALESCE(amount, 0)::numeric, 2) AS salary_paid
+    FROM salary_payments
+) x GROUP BY date;
@@ -0,0 +1,2 @@
+-- Sihirbaz tekrar kontrolü ve grup işlemleri için
+CREATE INDEX IF NOT EXISTS idx_jobs_group ON jobs (group_id);
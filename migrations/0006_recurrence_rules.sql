@@ -0,0 +1,19 @@
+-- Düzenli müşteriler için tekrar kuralı (müşteri başına bir kural).
+-- İşler group_id = 'r' || id ile sadece ileriye dönük bir pencere kadar oluşturulur.
+CREATE TABLE IF NOT EXISTS recurrence_rules (
+    id SERIAL PRIMARY KEY,
+    customer_id INTEGER NOT NULL UNIQUE,
+    weekdays INTEGER[] NOT NULL,
+    n_student INTEGER NOT NULL DEFAULT 0,
+    student_price REAL NOT NULL DEFAULT 0,
+    n_pro INTEGER NOT NULL DEFAULT 0,
+    pro_price REAL NOT NULL DEFAULT 0,
+    day_price REAL NOT NULL DEFAULT 0,
+    is_prepaid INTEGER NOT NULL DEFAULT 0,
+    start_date DATE NOT NULL,
+    end_date DATE,
+    materialized_until DATE,
+    active BOOLEAN NOT NULL DEFAULT TRUE,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_recurrence_due ON recurrence_rules (materialized_until) WHERE active;
@@ -0,0 +1,8 @@
+-- Maaş tahakkuku: personel bu tarihten itibaren dönem dönem borçlanılır.
+-- Mevcut personel için geçmişe dönük borç açılmasın diye bu ayın başı.
+ALTER TABLE professionals ADD COLUMN IF NOT EXISTS pay_start DATE;
+UPDATE professionals SET pay_start = date_trunc('month', CURRENT_DATE)::date WHERE pay_start IS NULL;
+ALTER TABLE professionals ALTER COLUMN pay_start SET DEFAULT CURRENT_DATE;
+ALTER TABLE professionals ALTER COLUMN pay_start SET NOT NULL;
+-- Dönem bazında ödenen tutarlar
+CREATE INDEX IF NOT EXISTS idx_salary_payments_period ON salary_payments (pro_id, payment_type, month_year);
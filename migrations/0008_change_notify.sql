@@ -0,0 +1,182 @@
+-- Oturumlar arası önbellek geçersizleştirme: her yazma komutundan sonra vt_changes kanalına
+-- {"t": tablo, "d1", "d2"} (etkilenen tarih aralığı) gönderen statement-level tetikleyiciler.
+
+CREATE OR REPLACE FUNCTION notify_change_jobs_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT MIN(d), MAX(d), COUNT(*) INTO d1, d2, n FROM (SELECT date AS d FROM new_rows) x;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_jobs_insert ON jobs;
+CREATE TRIGGER trg_notify_change_jobs_insert AFTER INSERT ON jobs REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_jobs_insert();
+
+CREATE OR REPLACE FUNCTION notify_change_jobs_update() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT MIN(d), MAX(d), COUNT(*) INTO d1, d2, n FROM (SELECT date AS d FROM old_rows UNION ALL SELECT date AS d FROM new_rows) x;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_jobs_update ON jobs;
+CREATE TRIGGER trg_notify_change_jobs_update AFTER UPDATE ON jobs REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_jobs_update();
+
+CREATE OR REPLACE FUNCTION notify_change_jobs_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT MIN(d), MAX(d), COUNT(*) INTO d1, d2, n FROM (SELECT date AS d FROM old_rows) x;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_jobs_delete ON jobs;
+CREATE TRIGGER trg_notify_change_jobs_delete AFTER DELETE ON jobs REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_jobs_delete();
+
+CREATE OR REPLACE FUNCTION notify_change_transactions_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT MIN(d), MAX(d), COUNT(*) INTO d1, d2, n FROM (SELECT date AS d FROM new_rows) x;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_transactions_insert ON transactions;
+CREATE TRIGGER trg_notify_change_transactions_insert AFTER INSERT ON transactions REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_transactions_insert();
+
+CREATE OR REPLACE FUNCTION notify_change_transactions_update() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT MIN(d), MAX(d), COUNT(*) INTO d1, d2, n FROM (SELECT date AS d FROM old_rows UNION ALL SELECT date AS d FROM new_rows) x;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_transactions_update ON transactions;
+CREATE TRIGGER trg_notify_change_transactions_update AFTER UPDATE ON transactions REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_transactions_update();
+
+CREATE OR REPLACE FUNCTION notify_change_transactions_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT MIN(d), MAX(d), COUNT(*) INTO d1, d2, n FROM (SELECT date AS d FROM old_rows) x;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_transactions_delete ON transactions;
+CREATE TRIGGER trg_notify_change_transactions_delete AFTER DELETE ON transactions REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_transactions_delete();
+
+CREATE OR REPLACE FUNCTION notify_change_salary_payments_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT MIN(d), MAX(d), COUNT(*) INTO d1, d2, n FROM (SELECT payment_date AS d FROM new_rows) x;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_salary_payments_insert ON salary_payments;
+CREATE TRIGGER trg_notify_change_salary_payments_insert AFTER INSERT ON salary_payments REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_salary_payments_insert();
+
+CREATE OR REPLACE FUNCTION notify_change_salary_payments_update() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT MIN(d), MAX(d), COUNT(*) INTO d1, d2, n FROM (SELECT payment_date AS d FROM old_rows UNION ALL SELECT payment_date AS d FROM new_rows) x;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_salary_payments_update ON salary_payments;
+CREATE TRIGGER trg_notify_change_salary_payments_update AFTER UPDATE ON salary_payments REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_salary_payments_update();
+
+CREATE OR REPLACE FUNCTION notify_change_salary_payments_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT MIN(d), MAX(d), COUNT(*) INTO d1, d2, n FROM (SELECT payment_date AS d FROM old_rows) x;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_salary_payments_delete ON salary_payments;
+CREATE TRIGGER trg_notify_change_salary_payments_delete AFTER DELETE ON salary_payments REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_salary_payments_delete();
+
+CREATE OR REPLACE FUNCTION notify_change_customers_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO n FROM new_rows;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_customers_insert ON customers;
+CREATE TRIGGER trg_notify_change_customers_insert AFTER INSERT ON customers REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_customers_insert();
+
+CREATE OR REPLACE FUNCTION notify_change_customers_update() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO n FROM new_rows;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_customers_update ON customers;
+CREATE TRIGGER trg_notify_change_customers_update AFTER UPDATE ON customers REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_customers_update();
+
+CREATE OR REPLACE FUNCTION notify_change_customers_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO n FROM old_rows;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_customers_delete ON customers;
+CREATE TRIGGER trg_notify_change_customers_delete AFTER DELETE ON customers REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_customers_delete();
+
+CREATE OR REPLACE FUNCTION notify_change_professionals_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO n FROM new_rows;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_professionals_insert ON professionals;
+CREATE TRIGGER trg_notify_change_professionals_insert AFTER INSERT ON professionals REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_professionals_insert();
+
+CREATE OR REPLACE FUNCTION notify_change_professionals_update() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO n FROM new_rows;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_professionals_update ON professionals;
+CREATE TRIGGER trg_notify_change_professionals_update AFTER UPDATE ON professionals REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_professionals_update();
+
+CREATE OR REPLACE FUNCTION notify_change_professionals_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE d1 DATE; d2 DATE; n BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO n FROM old_rows;
+    IF n > 0 THEN
+        PERFORM pg_notify('vt_changes', json_build_object('t', TG_TABLE_NAME, 'd1', d1, 'd2', d2)::text);
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS trg_notify_change_professionals_delete ON professionals;
+CREATE TRIGGER trg_notify_change_professionals_delete AFTER DELETE ON professionals REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_change_professionals_delete();
@@ -0,0 +1,32 @@
+# Ad / telefon / konum araması için indeksler. pg_trgm varsa "içinde geçen" aramayı
+# karşılayan trigram GIN indeksleri, kurulamazsa (yetki) baştan eşleşme için btree.
+# search.has_trgm() hangi aramanın yapılacağına idx_customers_name_trgm'e bakarak karar verir.
+TRGM = """
+CREATE INDEX IF NOT EXISTS idx_customers_name_trgm ON customers USING gin (lower(name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_customers_phone_trgm ON customers USING gin (lower(phone) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_customers_location_trgm ON customers USING gin (lower(location) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_students_name_trgm ON students USING gin (lower(name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_students_phone_trgm ON students USING gin (lower(phone) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_professionals_name_trgm ON professionals USING gin (lower(name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_professionals_phone_trgm ON professionals USING gin (lower(phone) gin_trgm_ops);
+"""
+PREFIX = """
+CREATE INDEX IF NOT EXISTS idx_customers_name_prefix ON customers (lower(name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_customers_phone_prefix ON customers (lower(phone) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_customers_location_prefix ON customers (lower(location) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_students_name_prefix ON students (lower(name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_students_phone_prefix ON students (lower(phone) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_professionals_name_prefix ON professionals (lower(name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_professionals_phone_prefix ON professionals (lower(phone) text_pattern_ops);
+"""
+
+
+def upgrade(cur):
+    cur.execute("SAVEPOINT trgm")
+    try:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        trgm = True
+    except Exception:
+        cur.execute("ROLLBACK TO SAVEPOINT trgm")
+        trgm = False
+    cur.execute(TRGM if trgm else PREFIX)
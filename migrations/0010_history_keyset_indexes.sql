@@ -0,0 +1,7 @@
+-- Profil geçmişi (tarih, id) ile sayfalanır: id'yi de içeren indeksler eskilerin yerine geçer
+CREATE INDEX IF NOT EXISTS idx_jobs_customer_date_id ON jobs (customer_id, date, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_student_date_id ON jobs (assigned_student_id, date, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_pro_date_id ON jobs (assigned_pro_id, date, id);
+DROP INDEX IF EXISTS idx_jobs_customer_date;
+DROP INDEX IF EXISTS idx_jobs_student_date;
+DROP INDEX IF EXISTS idx_jobs_pro_date;
@@ -0,0 +1,26 @@
+-- Yerel analiz kopyasının artımlı eşitlemesi için rev kolonu + BEFORE UPDATE tetikleyici fonksiyonu.
+-- rev: son güncelleyen transaction'ın txid'si (ekleme NULL bırakır, id filigranı yeter)
+-- Tetikleyiciler her UPDATE'e yük bindirir; sadece kopya açıkken snapshot.install() kurar.
+CREATE OR REPLACE FUNCTION snapshot_touch() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.rev := txid_current();
+    RETURN NEW;
+END $$;
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS rev BIGINT;
+CREATE INDEX IF NOT EXISTS idx_jobs_rev ON jobs (rev) WHERE rev IS NOT NULL;
+
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS rev BIGINT;
+CREATE INDEX IF NOT EXISTS idx_transactions_rev ON transactions (rev) WHERE rev IS NOT NULL;
+
+ALTER TABLE salary_payments ADD COLUMN IF NOT EXISTS rev BIGINT;
+CREATE INDEX IF NOT EXISTS idx_salary_payments_rev ON salary_payments (rev) WHERE rev IS NOT NULL;
+
+ALTER TABLE customers ADD COLUMN IF NOT EXISTS rev BIGINT;
+CREATE INDEX IF NOT EXISTS idx_customers_rev ON customers (rev) WHERE rev IS NOT NULL;
+
+ALTER TABLE students ADD COLUMN IF NOT EXISTS rev BIGINT;
+CREATE INDEX IF NOT EXISTS idx_students_rev ON students (rev) WHERE rev IS NOT NULL;
+
+ALTER TABLE professionals ADD COLUMN IF NOT EXISTS rev BIGINT;
+CREATE INDEX IF NOT EXISTS idx_professionals_rev ON professionals (rev) WHERE rev IS NOT NULL;
@@ -0,0 +1,88 @@
+# --- MAAŞ TAHAKKUKU ---
+# Maaşlı personelin her dönemi generate_series ile üretilir (aylık: ayın payment_day'i,
+# haftalık: ISO haftanın pazartesisi) ve salary_payments ile dönem anahtarı üzerinden
+# (MM-YYYY / W{hafta}-{yıl}) gruplu birleştirilir. Personel sayısı ne olursa olsun tek sorgu.
+# Borç, personelin pay_start tarihinden itibaren vadesi gelmiş ödenmemiş dönemlerdir.
+from datetime import date, timedelta
+
+from db import run_query
+
+# Parametreler: d1 (dahil, None = pay_start'tan), d2 (hariç), from_start (pay_start öncesini alma)
+PERIODS_SQL = """
+    SELECT p.id AS pro_id, 'monthly' AS payment_type, to_char(m, 'MM-YYYY') AS period,
+           m::date + LEAST(GREATEST(COALESCE(p.payment_day, 1), 1), extract(day FROM m + interval '1 month - 1 day')::int) - 1 AS due,
+           p.salary::numeric AS amount, p.pay_start
+    FROM professionals p
+    CROSS JOIN LATERAL generate_series(date_trunc('month', GREATEST(%(d1)s::date, CASE WHEN %(from_start)s THEN p.pay_start END)::timestamp), %(d2)s::timestamp, interval '1 month') m
+    WHERE p.salary > 0
+    UNION ALL
+    SELECT p.id, 'weekly', 'W' || extract(week FROM w)::int || '-' || extract(isoyear FROM w)::int,
+           w::date, p.weekly_salary::numeric, p.pay_start
+    FROM professionals p
+    CROSS JOIN LATERAL generate_series(date_trunc('week', GREATEST(%(d1)s::date, CASE WHEN %(from_start)s THEN p.pay_start END)::timestamp), %(d2)s::timestamp, interval '1 week') w
+    WHERE p.weekly_salary > 0"""
+
+SCHEDULE_SQL = f"""
+    WITH per AS ({PERIODS_SQL}),
+    due AS (
+        SELECT * FROM per
+        WHERE due >= COALESCE(%(d1)s::date, due) AND due < %(d2)s::date AND (NOT %(from_start)s OR due >= pay_start)
+    ),
+    paid AS (
+        SELECT s.pro_id, s.payment_type, s.month_year AS period, SUM(s.amount)::numeric AS paid
+        FROM salary_payments s
+        JOIN (SELECT DISTINCT pro_id, payment_type, period FROM due) d
+          ON d.pro_id = s.pro_id AND d.payment_type = s.payment_type AND d.period = s.month_year
+        GROUP BY 1, 2, 3
+    )
+    SELECT due.pro_id, due.payment_type, due.period, due.due, due.amount,
+           COALESCE(paid.paid, 0) AS paid, GREATEST(due.amount - COALESCE(paid.paid, 0), 0) AS owed
+    FROM due LEFT JOIN paid USING (pro_id, payment_type, period)"""
+
+
+def month_key(d):
+    return f"{d.month:02d}-{d.year}"
+
+
+def week_key(d):
+    # ISO hafta + ISO yılı (PERIODS_SQL ile aynı)
+    y, w, _ = d.isocalendar()
+    return f"W{w}-{y}"
+
+
+def _params(d1, d2, from_start):
+    return {"d1": d1, "d2": d2, "from_start": from_start}
+
+
+def accruals(d1, d2, from_start=True):
+    # [d1, d2) aralığında vadesi gelen her dönem: tahakkuk, ödenen, kalan
+    return run_query(SCHEDULE_SQL + " ORDER BY due.pro_id, due.due, due.payment_type", _params(d1, d2, from_start), fetch=True) or []
+
+
+def arrears(as_of=None):
+    # Kişi bazında birikmiş maaş borcu (sadece borcu olanlar, büyükten küçüğe)
+    d2 = (as_of or date.today()) + timedelta(1)
+    return run_query(f"""SELECT x.pro_id, p.name, COUNT(*) FILTER (WHERE x.owed > 0) AS periods,
+            MIN(x.due) FILTER (WHERE x.owed > 0) AS oldest, SUM(x.owed) AS owed
+        FROM ({SCHEDULE_SQL}) x JOIN professionals p ON p.id = x.pro_id
+        GROUP BY x.pro_id, p.name HAVING SUM(x.owed) > 0 ORDER BY owed DESC, p.name""", _params(None, d2, True), fetch=True) or []
+
+
+def oldest_unpaid(as_of=None):
+    # Kişi ve ödeme tipi başına en eski borçlu dönem; arrears() satırları buradan tek tek kapatılır
+    d2 = (as_of or date.today()) + timedelta(1)
+    return run_query(f"""SELECT DISTINCT ON (x.pro_id, x.payment_type) x.pro_id, p.name, x.payment_type, x.period, x.due, x.owed
+        FROM ({SCHEDULE_SQL}) x JOIN professionals p ON p.id = x.pro_id
+        WHERE x.owed > 0 ORDER BY x.pro_id, x.payment_type, x.due""", _params(None, d2, True), fetch=True) or []
+
+def total_arrears(as_of=None):
+    # "Toplam Borç" KPI'ının maaş kısmı
+    d2 = (as_of or date.today()) + timedelta(1)
+    r = run_query(f"SELECT COALESCE(SUM(owed), 0) AS owed FROM ({SCHEDULE_SQL}) x", _params(None, d2, True), fetch=True)
+    return float(r[0]['owed']) if r else 0.0
+
+
+def cost_by_month_sql():
+    # Aylık kâr için: ay -> o ay vadesi gelen maaş tahakkuku (pay_start'tan bağımsız)
+    return f"""SELECT date_trunc('month', due)::date AS m, SUM(amount) AS sal FROM ({PERIODS_SQL}) per
+        WHERE due >= %(d1)s::date AND due < %(d2)s::date GROUP BY 1"""
@@ -0,0 +1,67 @@
+# --- İŞ PLANLAMA MOTORU (Sihirbaz) ---
+# Tarihler ve fiyat dağıtımı vektörel üretilir, işler tek transaction'da COPY ile yazılır.
+# Aynı group_id ikinci kez yazılmaz (çift tıklanan "Oluştur" mükerrer kayıt açmaz).
+import io
+
+import numpy as np
+import pandas as pd
+
+from db import copy_csv, transaction
+
+JOB_COLUMNS = ["group_id", "date", "customer_id", "job_type", "status", "price_worker", "price_customer", "is_collected", "is_prepaid"]
+WEEKDAYS = {"Pazartesi": 0, "Salı": 1, "Çarşamba": 2, "Perşembe": 3, "Cuma": 4, "Cumartesi": 5, "Pazar": 6}
+
+
+def plan_dates(d1, d2, weekdays):
+    # [d1, d2] aralığında verilen hafta günlerine (0=Pzt) düşen tarihler
+    if d1 > d2 or not weekdays: return []
+    dr = pd.date_range(d1, d2, freq="D")
+    return list(dr[dr.weekday.isin(list(weekdays))].date)
+
+
+def build_jobs(gid, cid, dates, n_student, student_price, n_pro, pro_price, day_price=None, total_price=None, is_collected=0, is_prepaid=0):
+    # Her gün önce öğrenci sonra pro satırları.
+    # Günlük fiyat: günün tutarı o günün işlerine eşit bölünür.
+    # Toplam fiyat: tutarın tamamı ilk işe yazılır (mükerrer gelir olmasın).
+    per_day = n_student + n_pro
+    n = len(dates) * per_day
+    if n == 0: return pd.DataFrame(columns=JOB_COLUMNS)
+    kinds = np.array(["student"] * n_student + ["pro"] * n_pro)
+    wages = np.array([student_price] * n_student + [pro_price] * n_pro, dtype=float)
+    if total_price is not None:
+        cust = np.zeros(n); cust[0] = total_price
+    else:
+        cust = np.full(n, (day_price or 0) / per_day)
+    return pd.DataFrame({
+        "group_id": gid,
+        "date": np.repeat(np.array(dates, dtype="datetime64[D]"), per_day),
+        "customer_id": cid,
+        "job_type": np.tile(kinds, len(dates)),
+        "status": "OPEN",
+        "price_worker": np.tile(wages, len(dates)),
+        "price_customer": cust,
+        "is_collected": is_collected,
+        "is_prepaid": is_prepaid,
+    }, columns=JOB_COLUMNS)
+
+
+def copy_jobs(c, df):
+    # Açık transaction içinde COPY ile yaz
+    if df.empty: return 0
+    buf = io.StringIO()
+    df[JOB_COLUMNS].to_csv(buf, index=False, header=False, date_format="%Y-%m-%d")
+    buf.seek(0)
+    copy_csv(c, "jobs", JOB_COLUMNS, buf)
+    return len(df)
+
+
+def insert_jobs(df):
+    # Yazılan iş sayısı; group_id zaten kayıtlıysa None
+    if df.empty: return 0
+    gids = df["group_id"].unique().tolist()
+    with transaction(writes=["jobs"]) as c:
+        # Aynı grubu eşzamanlı yazan ikinci istek ilki bitene kadar bekler, sonra kaydı görür
+        for g in sorted(gids): c.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (g,))
+        c.execute("SELECT 1 FROM jobs WHERE group_id = ANY(%s) LIMIT 1", (gids,))
+        if c.fetchone(): return None
+        return copy_jobs(c, df)
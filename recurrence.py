@@ -0,0 +1,136 @@
+# --- DÜZENLİ İŞLER (TEKRAR KURALLARI) ---
+# Her düzenli müşterinin bir kuralı var (günler, personel sayıları, ücretler). İşler yıllarca
+# önceden değil, bugünden itibaren HORIZON_WEEKS haftalık pencere kadar oluşturulur;
+# extend() pencereyi ileri kaydırır. Kural değişince sadece gelecekteki, dokunulmamış
+# (atanmamış, ödenmemiş, tahsilat durumu değişmemiş) işler silinip yeniden üretilir.
+# Kullanım (cron):
+#   python recurrence.py extend [--weeks 8]
+import argparse
+import sys
+from datetime import date, timedelta
+
+import pandas as pd
+
+from db import log_event, transaction
+from planner import build_jobs, copy_jobs, plan_dates
+
+HORIZON_WEEKS = 8
+DAY_SHORT = ["Pt", "Sa", "Ça", "Pe", "Cu", "Ct", "Pz"]
+
+# Kuraldan üretildiği gibi duran işler
+UNTOUCHED = ("status='OPEN' AND assigned_student_id IS NULL AND assigned_pro_id IS NULL "
+             "AND is_worker_paid=0 AND is_collected=is_prepaid")
+
+_last_extend = None
+
+
+def rule_gid(rule_id):
+    return f"r{rule_id}"
+
+
+def frequency_text(weekdays):
+    return ", ".join(DAY_SHORT[d] for d in sorted(weekdays))
+
+
+def get_rule(customer_id):
+    with transaction(commit=False) as c:
+        c.execute("SELECT * FROM recurrence_rules WHERE customer_id=%s", (customer_id,))
+        return c.fetchone()
+
+
+def _materialize(c, rule, until):
+    # (materialized_until, until] aralığındaki eksik işleri yaz; yazılan iş sayısı
+    start = max(rule['start_date'], (rule['materialized_until'] or date.min) + timedelta(1))
+    stop = min(until, rule['end_date'] or until)
+    gid = rule_gid(rule['id'])
+    df = build_jobs(gid, rule['customer_id'], plan_dates(start, stop, rule['weekdays']),
+                    rule['n_student'], rule['student_price'], rule['n_pro'], rule['pro_price'],
+                    day_price=rule['day_price'], is_collected=rule['is_prepaid'], is_prepaid=rule['is_prepaid'])
+    if not df.empty:
+        # Kural düzenlenirken korunmuş (atanmış vb.) işler o günün kontenjanından düşülür
+        c.execute("SELECT date, job_type, COUNT(*) AS n FROM jobs WHERE group_id=%s AND date >= %s AND date <= %s GROUP BY 1, 2", (gid, start, stop))
+        kept = pd.DataFrame(c.fetchall(), columns=["date", "job_type", "n"])
+        if not kept.empty:
+            kept["date"] = pd.to_datetime(kept["date"]).astype(df["date"].dtype)
+            df["slot"] = df.groupby(["date", "job_type"]).cumcount()
+            df = df.merge(kept, on=["date", "job_type"], how="left")
+            df = df[df["slot"] >= df["n"].fillna(0)]
+    n = copy_jobs(c, df)
+    c.execute("UPDATE recurrence_rules SET materialized_until=%s WHERE id=%s", (until, rule['id']))
+    return n
+
+
+def extend(weeks=HORIZON_WEEKS, today=None):
+    # Penceresi dolmak üzere olan tüm aktif kuralları ileri taşı; yazılan iş sayısı
+    today = today or date.today()
+    horizon = today + timedelta(weeks=weeks)
+    total = 0
+    with transaction(writes=['jobs']) as c:
+        # Eşzamanlı çalışan başka bir extend aynı kuralı atlar
+        c.execute("""SELECT * FROM recurrence_rules
+            WHERE active AND (materialized_until IS NULL OR materialized_until < %s)
+              AND (end_date IS NULL OR materialized_until IS NULL OR materialized_until < end_date)
+            ORDER BY id FOR UPDATE SKIP LOCKED""", (horizon,))
+        for rule in c.fetchall():
+            if rule['materialized_until'] is None: rule['materialized_until'] = today - timedelta(1)
+            total += _materialize(c, rule, horizon)
+    return total
+
+
+def extend_if_due(today=None):
+    # Uygulama içinden: süreç başına günde bir kez
+    global _last_extend
+    today = today or date.today()
+    if _last_extend == today: return 0
+    _last_extend = today
+    try:
+        return extend(today=today)
+    except Exception as e:
+        log_event(event="recurrence_error", error=str(e).strip())
+        return 0
+
+
+def save_rule(customer_id, weekdays, n_student, student_price, n_pro, pro_price, day_price, is_prepaid, start_date, end_date=None, weeks=HORIZON_WEEKS, today=None):
+    # Kuralı kaydet, gelecekteki dokunulmamış işleri yeniden üret; yazılan iş sayısı
+    today = today or date.today()
+    weekdays = sorted(set(weekdays))
+    with transaction(writes=['jobs', 'customers']) as c:
+        c.execute("""INSERT INTO recurrence_rules (customer_id, weekdays, n_student, student_price, n_pro, pro_price, day_price, is_prepaid, start_date, end_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (customer_id) DO UPDATE SET weekdays=EXCLUDED.weekdays, n_student=EXCLUDED.n_student, student_price=EXCLUDED.student_price,
+                n_pro=EXCLUDED.n_pro, pro_price=EXCLUDED.pro_price, day_price=EXCLUDED.day_price, is_prepaid=EXCLUDED.is_prepaid,
+                start_date=EXCLUDED.start_date, end_date=EXCLUDED.end_date, active=TRUE, updated_at=now()
+            RETURNING *""", (customer_id, weekdays, n_student, student_price, n_pro, pro_price, day_price, int(is_prepaid), start_date, end_date))
+        rule = c.fetchone()
+        c.execute(f"DELETE FROM jobs WHERE group_id=%s AND date >= %s AND {UNTOUCHED}", (rule_gid(rule['id']), today))
+        rule['materialized_until'] = today - timedelta(1)
+        n = _materialize(c, rule, today + timedelta(weeks=weeks))
+        c.execute("UPDATE customers SET is_regular=1, frequency=%s WHERE id=%s", (frequency_text(weekdays), customer_id))
+    return n
+
+
+def stop_rule(customer_id, today=None):
+    # Kuralı durdur, gelecekteki dokunulmamış işleri sil; silinen iş sayısı
+    today = today or date.today()
+    with transaction(writes=['jobs', 'customers']) as c:
+        c.execute("UPDATE recurrence_rules SET active=FALSE, updated_at=now() WHERE customer_id=%s RETURNING id", (customer_id,))
+        r = c.fetchone()
+        if not r: return 0
+        c.execute(f"DELETE FROM jobs WHERE group_id=%s AND date >= %s AND {UNTOUCHED}", (rule_gid(r['id']), today))
+        n = c.rowcount
+        c.execute("UPDATE customers SET is_regular=0 WHERE id=%s", (customer_id,))
+    return n
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Düzenli müşteri işlerini ileriye dönük pencere kadar oluşturur.")
+    ap.add_argument("cmd", choices=["extend"])
+    ap.add_argument("--weeks", type=int, default=HORIZON_WEEKS)
+    args = ap.parse_args(argv)
+    n = extend(weeks=args.weeks)
+    print(f"{n} iş oluşturuldu")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# --- GÜNLÜK FİNANS ÖZETİ (daily_ledger_rollup) ---
+# jobs / transactions / salary_payments değiştikçe tetikleyiciler (statement-level,
+# transition table) günlük toplamlara sadece farkı ekler. KPI'lar ve aylık kâr ham
+# tablolar yerine bu tablodan okunur.
+# Kullanım:
+#   python rollup.py rebuild   # tabloyu ham verilerden yeniden kur
+#   python rollup.py verify    # tablo ile ham verileri karşılaştır
+# Not: TRUNCATE tetikleyici çalıştırmaz; toplu silmeden sonra rebuild gerekir.
+# Tarihsiz satırlar UNDATED ('-infinity') günündeki tek satırda toplanır: totals() onları da
+# sayar, tarih aralığıyla okuyan aylık kâr / trendler saymaz.
+# Tablo ve tetikleyiciler migrations/0004_daily_ledger_rollup.sql'de; SOURCES değişirse
+# tetikleyici fonksiyonları yeni bir göçte de güncellenmeli.
+import argparse
+import sys
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from db import conn_kwargs, run_query
+
+TABLE = "daily_ledger_rollup"
+UNDATED = "'-infinity'::date"
+
+# Kaynak tablo -> (tarih kolonu, {özet kolonu: satır katkısı})
+SOURCES = {
+    "jobs": ("date", {
+        "job_income": "price_customer",
+        "job_expense": "price_worker",
+        "collected_income": "CASE WHEN is_collected=1 AND price_customer > 0 THEN price_customer ELSE 0 END",
+        "pending_income": "CASE WHEN is_collected=0 THEN price_customer ELSE 0 END",
+        "worker_paid": "CASE WHEN is_worker_paid=1 AND price_worker > 0 THEN price_worker ELSE 0 END",
+        "worker_payable": "CASE WHEN is_worker_paid=0 AND price_worker > 0 THEN price_worker ELSE 0 END",
+    }),
+    "transactions": ("date", {
+        "extra_income": "CASE WHEN type='income' THEN amount ELSE 0 END",
+        "extra_expense": "CASE WHEN type IS DISTINCT FROM 'income' THEN amount ELSE 0 END",
+    }),
+    "salary_payments": ("payment_date", {
+        "salary_paid": "amount",
+    }),
+}
+COLUMNS = [c for _, (_, cols) in SOURCES.items() for c in cols]
+
+
+def _contrib(table):
+    # Kaynak satırların özet kolonlarına katkısı (kuruşa yuvarlı NUMERIC: artımlı toplam kaymaz)
+    dcol, cols = SOURCES[table]
+    sel = ", ".join(f"round(COALESCE({cols[c]}, 0)::numeric, 2) AS {c}" if c in cols else f"0::numeric AS {c}" for c in COLUMNS)
+    return f"SELECT COALESCE({dcol}, {UNDATED}) AS date, {sel} FROM {table}"
+
+
+def _fresh_sql():
+    # Ham tablolardan günlük toplamlar
+    parts = " UNION ALL ".join(_contrib(t) for t in SOURCES)
+    return f"SELECT date, {', '.join(f'SUM({c}) AS {c}' for c in COLUMNS)} FROM ({parts}) x GROUP BY date"
+
+
+def rebuild(cur):
+    # Yeniden kurarken yazmalar beklesin (tetikleyiciyle yarışmasın)
+    cur.execute(f"LOCK TABLE {', '.join(SOURCES)} IN SHARE MODE")
+    cur.execute(f"DELETE FROM {TABLE}")
+    cur.execute(f"INSERT INTO {TABLE} (date, {', '.join(COLUMNS)}) {_fresh_sql()}")
+
+
+def verify(cur):
+    # [(tarih, kolon, özet, gerçek)] farklı olanlar; tarihsiz satırlar tarih=None
+    cur.execute(f"""SELECT NULLIF(COALESCE(f.date, r.date), {UNDATED}) AS date, {', '.join(f'COALESCE(r.{c}, 0) AS r_{c}, COALESCE(f.{c}, 0) AS f_{c}' for c in COLUMNS)}
+        FROM ({_fresh_sql()}) f FULL JOIN {TABLE} r ON r.date = f.date
+        WHERE {' OR '.join(f'COALESCE(r.{c}, 0) <> COALESCE(f.{c}, 0)' for c in COLUMNS)}
+        ORDER BY 1""")
+    out = []
+    for row in cur.fetchall():
+        for c in COLUMNS:
+            if row[f"r_{c}"] != row[f"f_{c}"]: out.append((row['date'], c, row[f"r_{c}"], row[f"f_{c}"]))
+    return out
+
+
+# --- OKUMA ---
+def totals():
+    # Tüm zamanlar: kasa, alacak, parça başı borç (tek satır)
+    r = run_query(f"""SELECT
+        COALESCE(SUM(collected_income + extra_income - extra_expense - worker_paid - salary_paid), 0) AS cash,
+        COALESCE(SUM(pending_income), 0) AS pending,
+        COALESCE(SUM(worker_payable), 0) AS payable
+        FROM {TABLE}""", fetch=True)
+    if not r: return None
+    return {k: float(v) for k, v in r[0].items()}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="daily_ledger_rollup tablosunu yeniden kurar / doğrular.")
+    ap.add_argument("cmd", choices=["rebuild", "verify"])
+    ap.add_argument("--dsn")
+    args = ap.parse_args(argv)
+
+    conn = psycopg2.connect(cursor_factory=RealDictCursor, **conn_kwargs(args.dsn))
+    try:
+        with conn.cursor() as cur:
+            if args.cmd == "rebuild":
+                rebuild(cur)
+                conn.commit()
+                cur.execute(f"SELECT COUNT(*) AS n FROM {TABLE}")
+                print(f"{cur.fetchone()['n']} gün yeniden hesaplandı")
+                return 0
+            diff = verify(cur)
+            conn.rollback()
+            for d, c, have, want in diff[:50]: print(f"{d or 'tarihsiz'} {c}: özet={have} gerçek={want}")
+            print("Tutarlı" if not diff else f"{len(diff)} fark")
+            return 1 if diff else 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
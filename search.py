@@ -0,0 +1,66 @@
+# --- ARAMA (TYPEAHEAD) ---
+# Müşteri / öğrenci / personel seçimleri tüm tabloyu çekmek yerine yazılan metne göre
+# ilk N eşleşmeyi id ile döndürür. pg_trgm varsa içinde geçen (trigram indeksli),
+# yoksa baştan eşleşen (text_pattern_ops indeksli) arama yapılır. İndeksler: migrations/0009.
+import threading
+
+from db import run_query
+
+# Tablo -> aranan kolonlar, sonuçta dönen kolonlar
+TABLES = {
+    "customers": (["name", "phone", "location"], "id, name, phone, location"),
+    "students": (["name", "phone"], "id, name, phone"),
+    "professionals": (["name", "phone"], "id, name, phone, salary, weekly_salary"),
+}
+LIMIT = 20
+
+_trgm = None
+_trgm_lock = threading.Lock()
+
+
+def has_trgm():
+    # Süreç başına bir kez
+    global _trgm
+    if _trgm is None:
+        with _trgm_lock:
+            if _trgm is None:
+                # Göç hangi indeksleri kurduysa o arama biçimi
+                r = run_query("SELECT to_regclass('idx_customers_name_trgm') IS NOT NULL AS x", fetch=True)
+                _trgm = bool(r and r[0]['x'])
+    return _trgm
+
+
+def _like(q):
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search(table, q="", where=None, limit=LIMIT, keep=None):
+    # En iyi `limit` eşleşme (boş metinde en yeniler); keep: sonuçta mutlaka olsun (seçili kayıt)
+    cols, out = TABLES[table]
+    q = (q or "").strip()
+    conds, params, order = [], [], "id DESC"
+    if q:
+        pat = ("%" if has_trgm() else "") + _like(q) + "%"
+        conds.append("(" + " OR ".join(f"lower({c}) LIKE lower(%s)" for c in cols) + ")")
+        params += [pat] * len(cols)
+        # Baştan eşleşen adlar önce, sonra benzerlik
+        order = "lower(name) LIKE lower(%s) DESC" + (", similarity(lower(name), lower(%s)) DESC" if has_trgm() else "") + ", name, id"
+        oparams = [_like(q) + "%"] + ([q] if has_trgm() else [])
+    else: oparams = []
+    if where: conds.append(f"({where})")
+    sql = f"SELECT {out} FROM {table}" + (" WHERE " + " AND ".join(conds) if conds else "") + f" ORDER BY {order} LIMIT %s"
+    rows = run_query(sql, params + oparams + [limit], fetch=True) or []
+    if keep is not None and all(r['id'] != keep for r in rows):
+        rows = (run_query(f"SELECT {out} FROM {table} WHERE id=%s", (keep,), fetch=True) or []) + rows
+    return rows
+
+
+def exists(table, where=None):
+    r = run_query(f"SELECT EXISTS (SELECT 1 FROM {table}" + (f" WHERE {where}" if where else "") + ") AS x", fetch=True)
+    return bool(r and r[0]['x'])
+
+
+def label(row):
+    # Seçim kutusunda gösterilen metin (aynı adlı kayıtlar telefon/konumla ayrılır)
+    extra = " · ".join(x for x in (row.get('phone'), row.get('location')) if x)
+    return f"{row['name']} ({extra})" if extra else (row['name'] or f"#{row['id']}")
@@ -0,0 +1,365 @@
+# --- YEREL ANALİZ KOPYASI (PARQUET) ---
+# Finans defteri ve trend raporları, ayar açıksa canlı veritabanı yerine yerel Parquet
+# kopyası üzerinde pandas ile hesaplanır; ay / yıl sonu analizleri yazmalarla yarışmaz.
+# Eşitleme artımlı ve tek REPEATABLE READ anlık görüntüde:
+#   yeni satırlar: id > son görülen id
+#   güncellenenler: rev >= son eşitlemedeki txid xmin (BEFORE UPDATE tetikleyicisi rev'i yazar;
+#   kolon migrations/0011_snapshot_rev.sql, tetikleyiciler sadece kopya açıkken: install())
+#   silinen / geç commit edilen: id <= son id için COUNT + SUM(id) tutmazsa id listesiyle düzeltilir
+# Ayar: analytics_snapshot (kopya dizini; yoksa kapalı), snapshot_max_age (sn, varsayılan 300)
+# Uygulama kopya eskiyse arka planda eşitler, beklemez; ilk kopya hazır olana kadar canlı sorgular.
+# Kullanım:
+#   python snapshot.py sync        # zamanlanmış görev olarak çalıştırılabilir
+#   python snapshot.py status
+#   python snapshot.py uninstall   # kopya kapatıldıktan sonra tetikleyicileri kaldır
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+import psycopg2
+
+from db import log_event, setting, transaction
+
+# Tablo -> kolonlar; tipler DTYPES (belirtilmeyenler metin)
+TABLES = {
+    "jobs": ["id", "group_id", "date", "customer_id", "job_type", "status", "assigned_student_id", "assigned_pro_id",
+             "price_worker", "price_customer", "is_worker_paid", "is_collected", "is_prepaid"],
+    "transactions": ["id", "date", "type", "category", "amount", "description"],
+    "salary_payments": ["id", "pro_id", "amount", "payment_date", "month_year", "payment_type"],
+    "customers": ["id", "name", "phone", "location"],
+    "students": ["id", "name", "phone"],
+    "professionals": ["id", "name", "phone", "salary", "weekly_salary", "payment_day", "pay_start"],
+}
+DTYPES = {
+    "id": "int64", "customer_id": "Int64", "assigned_student_id": "Int64", "assigned_pro_id": "Int64", "pro_id": "Int64",
+    "is_worker_paid": "Int64", "is_collected": "Int64", "is_prepaid": "Int64", "payment_day": "Int64",
+    "price_worker": "float64", "price_customer": "float64", "amount": "float64", "salary": "float64", "weekly_salary": "float64",
+    "date": "datetime64[ns]", "payment_date": "datetime64[ns]", "pay_start": "datetime64[ns]",
+}
+CHUNK_ROWS = 50000
+STATE_FILE = "state.json"
+TRIGGER = "trg_snapshot_touch"
+RETRY_SECONDS = 60 # Başarısız arka plan eşitlemesinden sonra bekleme
+
+_lock = threading.Lock() # _memo
+_sync_lock = threading.Lock()
+_memo = {"stamp": None, "frames": {}, "ledger": None}
+_bg = {"thread": None, "tried": 0.0}
+_bg_lock = threading.Lock()
+
+
+def install():
+    # Eksik rev tetikleyicilerini kur; kurulduysa True (o ana kadarki güncellemeler rev'siz: tam eşitleme gerekir)
+    with transaction() as c:
+        c.execute("SELECT COUNT(*) AS n FROM pg_trigger WHERE tgname = %s AND tgrelid = ANY(%s::regclass[])", (TRIGGER, list(TABLES)))
+        if c.fetchone()['n'] == len(TABLES): return False
+        for t in TABLES:
+            c.execute(f"DROP TRIGGER IF EXISTS {TRIGGER} ON {t}")
+            c.execute(f"CREATE TRIGGER {TRIGGER} BEFORE UPDATE ON {t} FOR EACH ROW EXECUTE FUNCTION snapshot_touch()")
+    log_event(event="snapshot_install")
+    return True
+
+
+def uninstall():
+    with transaction() as c:
+        for t in TABLES: c.execute(f"DROP TRIGGER IF EXISTS {TRIGGER} ON {t}")
+
+
+def directory():
+    # Kopya dizini; ayar yoksa ya da pyarrow kurulu değilse None (kapalı)
+    d = setting("analytics_snapshot")
+    if not d: return None
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return d
+
+
+def enabled():
+    return directory() is not None
+
+
+def max_age():
+    return float(setting("snapshot_max_age", 300))
+
+
+def _path(name):
+    return os.path.join(directory(), name)
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp): os.remove(tmp)
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f: json.dump(data, f)
+
+
+def read_state():
+    try:
+        with open(_path(STATE_FILE), encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _frame(table, rows):
+    df = pd.DataFrame(rows, columns=TABLES[table])
+    for c in df.columns:
+        t = DTYPES.get(c)
+        if t is None: df[c] = df[c].astype(object)
+        elif t.startswith("datetime"): df[c] = pd.to_datetime(df[c])
+        else: df[c] = df[c].astype(t)
+    return df
+
+
+def _read(c, table, where, params):
+    # Sunucu taraflı cursor ile parça parça; satırlar dict yerine tuple (büyük ilk eşitlemede hızın çoğu burada)
+    parts = []
+    with c.connection.cursor(name=f"snap_{uuid.uuid4().hex[:8]}", cursor_factory=psycopg2.extensions.cursor) as sc:
+        sc.itersize = CHUNK_ROWS
+        sc.execute(f"SELECT {', '.join(TABLES[table])} FROM {table} WHERE {where}", params)
+        while True:
+            rows = sc.fetchmany(CHUNK_ROWS)
+            if not rows: break
+            parts.append(_frame(table, rows))
+    return _concat(table, parts)
+
+
+def _concat(table, parts):
+    parts = [p for p in parts if p is not None and len(p)]
+    if not parts: return _frame(table, [])
+    return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0].reset_index(drop=True)
+
+
+def _sync_table(c, table, old, max_id, xmin):
+    # (yeni tablo, istatistik)
+    new = _read(c, table, "id > %s", (max_id,))
+    stats = {"new": len(new), "changed": 0, "removed": 0}
+    if old is None:
+        return new.sort_values("id", ignore_index=True), stats
+    changed = _read(c, table, "rev >= %s AND id <= %s", (xmin, max_id))
+    merged = _concat(table, [old[~old["id"].isin(changed["id"])], changed])
+    stats["changed"] = len(changed)
+    c.execute(f"SELECT COUNT(*) AS n, COALESCE(SUM(id), 0) AS s FROM {table} WHERE id <= %s", (max_id,))
+    chk = c.fetchone()
+    if (chk['n'], int(chk['s'])) != (len(merged), int(merged["id"].sum())):
+        # Silinmiş ya da filigrandan sonra commit edilmiş satırlar
+        c.execute(f"SELECT COALESCE(array_agg(id), '{{}}') AS ids FROM {table} WHERE id <= %s", (max_id,))
+        ids = pd.Index(c.fetchone()['ids'])
+        before = len(merged)
+        merged = merged[merged["id"].isin(ids)]
+        stats["removed"] = before - len(merged)
+        missing = ids.difference(merged["id"])
+        if len(missing): merged = _concat(table, [merged, _read(c, table, "id = ANY(%s)", (missing.tolist(),))])
+        stats["changed"] += len(missing)
+    return _concat(table, [merged, new]).sort_values("id", ignore_index=True), stats
+
+
+def sync(force=False):
+    # Artımlı eşitleme; {tablo: istatistik}. force: kopyayı baştan kur
+    d = directory()
+    if d is None: raise RuntimeError("Analiz kopyası kapalı (analytics_snapshot ayarı ya da pyarrow yok)")
+    with _sync_lock:
+        os.makedirs(d, exist_ok=True)
+        # Tetikleyiciler yeni kurulduysa eldeki kopyanın güncellemeleri izlenmemiş olabilir
+        if install(): force = True
+        state = None if force else read_state()
+        old_tables = (state or {}).get("tables", {})
+        t0 = time.perf_counter()
+        out, fresh = {}, {}
+        with transaction(commit=False) as c:
+            c.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            # Bu anda sürmekte olan transaction'lar >= xmin: güncellemeleri sonraki eşitlemede gelir
+            c.execute("SELECT txid_snapshot_xmin(txid_current_snapshot()) AS xmin")
+            xmin = c.fetchone()['xmin']
+            for t in TABLES:
+                st = old_tables.get(t)
+                old = None
+                if st and os.path.exists(_path(f"{t}.parquet")): old = pd.read_parquet(_path(f"{t}.parquet"))
+                fresh[t], out[t] = _sync_table(c, t, old, st["max_id"] if old is not None else 0, state["xmin"] if old is not None else 0)
+        tables = {}
+        for t, df in fresh.items():
+            _write_atomic(_path(f"{t}.parquet"), lambda p, df=df: df.to_parquet(p, index=False))
+            # Filigran geri gitmez: son satırlar silinse de o id'ler tekrar verilmez
+            last = old_tables.get(t, {}).get("max_id", 0) if state else 0
+            tables[t] = {"max_id": max(last, int(df["id"].max()) if len(df) else 0), "rows": len(df)}
+        state = {"synced": datetime.now().isoformat(timespec="seconds"), "xmin": xmin, "tables": tables}
+        _write_atomic(_path(STATE_FILE), lambda p: _write_json(p, state))
+        with _lock: _memo.update(stamp=None, frames={}, ledger=None)
+        log_event(event="snapshot_sync", ms=round((time.perf_counter() - t0) * 1000, 1), **{t: s for t, s in out.items()})
+        return out
+
+
+def synced_at():
+    s = read_state()
+    return datetime.fromisoformat(s["synced"]) if s else None
+
+
+def syncing():
+    t = _bg["thread"]
+    return t is not None and t.is_alive()
+
+
+def _bg_sync():
+    try:
+        sync()
+    except Exception as e:
+        log_event(event="snapshot_error", error=str(e).strip())
+
+
+def refresh():
+    # Kopya yoksa ya da max_age'den eskiyse arka planda eşitlemeyi başlat (süreçte tek thread); beklemez
+    at = synced_at()
+    if at is not None and (datetime.now() - at).total_seconds() < max_age(): return
+    with _bg_lock:
+        if syncing() or time.monotonic() - _bg["tried"] < RETRY_SECONDS: return
+        _bg["tried"] = time.monotonic()
+        _bg["thread"] = threading.Thread(target=_bg_sync, name="vt-snapshot", daemon=True)
+        _bg["thread"].start()
+
+
+def available():
+    # Açık ve bir kopya var (eskiyse arka planda yenilenir); değilse raporlar canlı veritabanından
+    if not enabled(): return False
+    refresh()
+    return read_state() is not None
+
+
+def frames():
+    # {tablo: DataFrame}; süreç içinde eşitleme damgasına göre tutulur
+    state = read_state()
+    if state is None: raise RuntimeError("Analiz kopyası henüz eşitlenmedi")
+    stamp = state["synced"]
+    with _lock:
+        if _memo["stamp"] != stamp:
+            _memo.update(stamp=stamp, frames={t: pd.read_parquet(_path(f"{t}.parquet")) for t in TABLES}, ledger=None)
+        return _memo["frames"]
+
+
+# --- RAPORLAR (ledger.LEDGER_SQL ve trends.TREND_SQL karşılıkları) ---
+def _ledger_all():
+    # Tüm defter, (date, src, id) sıralı; eşitleme başına bir kez kurulur
+    f = frames()
+    with _lock:
+        if _memo["ledger"] is not None: return _memo["ledger"]
+    j, t, sp = f["jobs"], f["transactions"], f["salary_payments"]
+    names = f["customers"].set_index("id")["name"]
+    col = j[(j["is_collected"] == 1) & (j["price_customer"] > 0) & j["customer_id"].isin(names.index)]
+    paid = j[(j["is_worker_paid"] == 1) & (j["price_worker"] > 0)]
+    sal = sp.merge(f["professionals"][["id", "name"]].rename(columns={"id": "pro_id"}), on="pro_id")
+    parts = [
+        pd.DataFrame({"date": t["date"], "src": 1, "id": t["id"], "kind": "Manuel", "descr": t["description"],
+                      "amount": t["amount"].where(t["type"] == "income", -t["amount"])}),
+        pd.DataFrame({"date": col["date"], "src": 2, "id": col["id"], "kind": "Tahsilat", "descr": col["customer_id"].map(names), "amount": col["price_customer"]}),
+        pd.DataFrame({"date": paid["date"], "src": 3, "id": paid["id"], "kind": "Ödeme", "descr": "Personel (" + paid["job_type"] + ")", "amount": -paid["price_worker"]}),
+        pd.DataFrame({"date": sal["payment_date"], "src": 4, "id": sal["id"], "kind": "Maaş", "descr": sal["name"], "amount": -sal["amount"]}),
+    ]
+    out = pd.concat([p for p in parts if len(p)], ignore_index=True) if any(len(p) for p in parts) else pd.DataFrame(columns=["date", "src", "id", "kind", "descr", "amount"])
+    # Tarihsiz satırlar başta: ters çevrilince en sonda (LEDGER_SQL ... DESC NULLS LAST)
+    out = out.sort_values(["date", "src", "id"], na_position="first", ignore_index=True)
+    with _lock: _memo["ledger"] = out
+    return out
+
+
+def ledger_page(d1=None, d2=None, kinds=None, after=None, limit=50):
+    # app.get_report ile aynı satırlar: yeniden eskiye, (date, src, id) imleciyle
+    df = _ledger_all()
+    m = pd.Series(True, index=df.index)
+    if d1: m &= df["date"] >= pd.Timestamp(d1)
+    if d2: m &= df["date"] < pd.Timestamp(d2 + timedelta(1))
+    if kinds: m &= df["kind"].isin(list(kinds))
+    if after:
+        asrc, aid = after[1], after[2]
+        before = (df["src"] < asrc) | ((df["src"] == asrc) & (df["id"] < aid))
+        if after[0] is None: m &= df["date"].isna() & before
+        else:
+            ad = pd.Timestamp(after[0])
+            m &= (df["date"] < ad) | ((df["date"] == ad) & before) | df["date"].isna()
+    sel = df[m].iloc[::-1]
+    if limit: sel = sel.head(limit + 1)
+    sel = sel.assign(date=sel["date"].dt.date.astype(object).where(sel["date"].notna(), None))
+    return sel.to_dict("records")
+
+
+def salary_cost(d1, d2):
+    # payroll.cost_by_month_sql karşılığı: ay -> [d1, d2) içinde vadesi gelen maaş tahakkuku
+    p = frames()["professionals"]
+    d1, d2 = pd.Timestamp(d1), pd.Timestamp(d2)
+    parts = []
+    mp = p[p["salary"] > 0]
+    if len(mp):
+        months = pd.date_range(d1.replace(day=1), d2, freq="MS")
+        x = mp[["payment_day", "salary"]].merge(pd.DataFrame({"m": months}), how="cross")
+        day = x["payment_day"].fillna(1).clip(lower=1).astype(int).clip(upper=x["m"].dt.days_in_month)
+        parts.append(pd.DataFrame({"due": x["m"] + pd.to_timedelta(day - 1, unit="D"), "amount": x["salary"]}))
+    wp = p[p["weekly_salary"] > 0]
+    if len(wp):
+        weeks = pd.date_range(d1 - pd.Timedelta(days=d1.weekday()), d2, freq="W-MON")
+        x = wp[["weekly_salary"]].merge(pd.DataFrame({"due": weeks}), how="cross")
+        parts.append(pd.DataFrame({"due": x["due"], "amount": x["weekly_salary"]}))
+    if not parts: return pd.Series(dtype=float)
+    due = pd.concat(parts, ignore_index=True)
+    due = due[(due["due"] >= d1) & (due["due"] < d2)]
+    return due.groupby(due["due"].dt.to_period("M").dt.to_timestamp())["amount"].sum()
+
+
+def trend(d1, d2):
+    # trends.fetch ile aynı uzun format: ay, tür, müşteri, ad, gelir, gider
+    f = frames()
+    lo, hi = pd.Timestamp(d1), pd.Timestamp(d2)
+    j = f["jobs"]; j = j[(j["date"] >= lo) & (j["date"] < hi)]
+    jg = j.groupby([j["date"].dt.to_period("M").dt.to_timestamp().rename("m"), j["job_type"].rename("kind"), "customer_id"], dropna=False) \
+        .agg(inc=("price_customer", "sum"), exp=("price_worker", "sum")).reset_index()
+    t = f["transactions"]; t = t[(t["date"] >= lo) & (t["date"] < hi)]
+    inc = t["type"] == "income"
+    tg = t.assign(inc=t["amount"].where(inc, 0.0), exp=t["amount"].where(~inc, 0.0)) \
+        .groupby(t["date"].dt.to_period("M").dt.to_timestamp().rename("m"))[["inc", "exp"]].sum().reset_index().assign(kind="extra")
+    sal = salary_cost(d1, d2)
+    sg = pd.DataFrame({"m": sal.index, "kind": "salary", "inc": 0.0, "exp": sal.values})
+    df = pd.concat([x for x in (jg, tg, sg) if len(x)], ignore_index=True) if len(jg) or len(tg) or len(sg) else pd.DataFrame(columns=["m", "kind", "customer_id", "inc", "exp"])
+    if "customer_id" not in df: df["customer_id"] = pd.NA
+    df["name"] = df["customer_id"].map(f["customers"].set_index("id")["name"])
+    df = df[["m", "kind", "customer_id", "name", "inc", "exp"]].sort_values("m", ignore_index=True)
+    df["inc"] = df["inc"].astype(float); df["exp"] = df["exp"].astype(float); df["m"] = pd.to_datetime(df["m"])
+    return df
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Yerel analiz kopyasını eşitler.")
+    ap.add_argument("cmd", choices=["sync", "status", "uninstall"])
+    ap.add_argument("--full", action="store_true", help="Kopyayı baştan kur")
+    args = ap.parse_args(argv)
+    if args.cmd == "uninstall":
+        uninstall()
+        print("rev tetikleyicileri kaldırıldı")
+        return 0
+    if not enabled():
+        print("Kapalı: analytics_snapshot ayarı (DB_ANALYTICS_SNAPSHOT) ya da pyarrow yok")
+        return 1
+    if args.cmd == "sync":
+        t0 = time.perf_counter()
+        for t, s in sync(force=args.full).items(): print(f"{t}: +{s['new']} yeni, {s['changed']} güncel, -{s['removed']} silinen")
+        print(f"{time.perf_counter() - t0:.1f} sn")
+        return 0
+    s = read_state()
+    if not s:
+        print("Henüz eşitlenmedi"); return 1
+    print(f"Son eşitleme: {s['synced']}")
+    for t, v in s["tables"].items(): print(f"{t}: {v['rows']} satır (son id {v['max_id']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# --- ÇOK AYLIK TREND ANALİZİ ---
+# Seçilen aralığın ay ay gelir/gideri tek sorguda, iş tipi ve müşteri kırılımıyla
+# (uzun format) gelir; pivot ve grafikler istemci tarafında pandas ile yapılır.
+from datetime import date
+
+import pandas as pd
+
+from db import run_query
+import payroll
+
+KIND_LABELS = {"student": "Öğrenci", "pro": "Pro", "extra": "Ekstra", "salary": "Maaş"}
+
+TREND_SQL = f"""
+    WITH j AS (
+        SELECT date_trunc('month', date)::date AS m, job_type AS kind, customer_id,
+               SUM(price_customer)::numeric AS inc, SUM(price_worker)::numeric AS exp
+        FROM jobs WHERE date >= %(d1)s AND date < %(d2)s GROUP BY 1, 2, 3
+    ),
+    t AS (
+        SELECT date_trunc('month', date)::date AS m, 'extra' AS kind, NULL::int AS customer_id,
+               SUM(CASE WHEN type='income' THEN amount ELSE 0 END)::numeric AS inc,
+               SUM(CASE WHEN type IS DISTINCT FROM 'income' THEN amount ELSE 0 END)::numeric AS exp
+        FROM transactions WHERE date >= %(d1)s AND date < %(d2)s GROUP BY 1
+    ),
+    s AS (
+        SELECT m, 'salary' AS kind, NULL::int AS customer_id, 0::numeric AS inc, sal::numeric AS exp
+        FROM ({payroll.cost_by_month_sql()}) x
+    )
+    SELECT x.m, x.kind, x.customer_id, c.name, x.inc, x.exp
+    FROM (SELECT * FROM j UNION ALL SELECT * FROM t UNION ALL SELECT * FROM s) x
+    LEFT JOIN customers c ON c.id = x.customer_id
+    ORDER BY x.m"""
+
+
+def month_range(y1, m1, y2, m2):
+    # [y1-m1 ayının 1'i, y2-m2'den sonraki ayın 1'i)
+    return date(y1, m1, 1), date(y2 + m2 // 12, m2 % 12 + 1, 1)
+
+
+def fetch(d1, d2):
+    # Uzun format: ay, tür, müşteri, gelir, gider
+    rows = run_query(TREND_SQL, {"d1": d1, "d2": d2, "from_start": False}, fetch=True) or []
+    df = pd.DataFrame(rows, columns=["m", "kind", "customer_id", "name", "inc", "exp"])
+    df["inc"] = df["inc"].astype(float); df["exp"] = df["exp"].astype(float)
+    df["m"] = pd.to_datetime(df["m"])
+    return df
+
+
+def data_years():
+    # Verideki ilk ve son yıl (günlük özetin birincil anahtarından, tarihsiz satır hariç)
+    r = run_query("SELECT MIN(date) AS lo, MAX(date) AS hi FROM daily_ledger_rollup WHERE isfinite(date)", fetch=True)
+    ny = date.today().year
+    lo = r[0]['lo'].year if r and r[0]['lo'] else ny
+    hi = r[0]['hi'].year if r and r[0]['hi'] else ny
+    return list(range(min(lo, ny), max(hi, ny) + 1))
+
+
+def monthly(df, d1, d2):
+    # Ay -> gelir / gider / net (boş aylar 0)
+    idx = pd.date_range(d1, d2, freq="MS", inclusive="left")
+    out = df.groupby("m")[["inc", "exp"]].sum().reindex(idx, fill_value=0.0)
+    out["net"] = out["inc"] - out["exp"]
+    return out
+
+
+def by_kind(df, d1, d2, value="net"):
+    # Ay x tür (öğrenci / pro / ekstra / maaş)
+    idx = pd.date_range(d1, d2, freq="MS", inclusive="left")
+    df = df.assign(net=df["inc"] - df["exp"], kind=df["kind"].map(KIND_LABELS))
+    return df.pivot_table(index="m", columns="kind", values=value, aggfunc="sum").reindex(idx).fillna(0.0)
+
+
+def by_customer(df, d1, d2, value="inc", top=10):
+    # Ay x müşteri; en büyük `top` müşteri, kalanlar "Diğer"
+    idx = pd.date_range(d1, d2, freq="MS", inclusive="left")
+    jobs = df[df["customer_id"].notna()].assign(net=lambda x: x["inc"] - x["exp"])
+    if jobs.empty: return pd.DataFrame(index=idx)
+    names = jobs["name"].fillna("?")
+    lead = jobs.groupby(names)[value].sum().nlargest(top).index
+    jobs = jobs.assign(name=names.where(names.isin(lead), "Diğer"))
+    return jobs.pivot_table(index="m", columns="name", values=value, aggfunc="sum").reindex(idx).fillna(0.0)